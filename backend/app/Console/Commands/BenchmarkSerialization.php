@@ -0,0 +1,227 @@
+<?php
+
+namespace App\Console\Commands;
+
+use App\Contracts\BudgetRepositoryInterface;
+use App\Models\Budget;
+use App\Models\User;
+use Closure;
+use Illuminate\Console\Command;
+use Illuminate\Http\JsonResponse;
+use Illuminate\Support\Facades\DB;
+use Illuminate\Support\Facades\Hash;
+use Illuminate\Support\Str;
+
+class BenchmarkSerialization extends Command
+{
+    /**
+     * The name and signature of the console command.
+     *
+     * @var string
+     */
+    protected $signature = 'bench:serialization
+                            {--expenses=5000 : Number of expenses in the benchmark budget}
+                            {--per-page=50 : Page size of the paginated expense list}
+                            {--iterations=5 : Runs per payload and strategy}';
+
+    /**
+     * The console command description.
+     *
+     * @var string
+     */
+    protected $description = 'Compare CPU time and peak memory of the camelCase JSON serialization against the former decode/re-encode middleware';
+
+    /**
+     * Execute the console command.
+     */
+    public function handle(BudgetRepositoryInterface $budgetRepository)
+    {
+        $iterations = max(1, (int) $this->option('iterations'));
+
+        // Seeded data is rolled back at the end: nothing is left in the database
+        DB::beginTransaction();
+
+        try {
+            $budget = $this->seedBudget(max(1, (int) $this->option('expenses')));
+
+            $payloads = [
+                'BudgetController::show' => fn () => $budgetRepository->findWithRelations($budget->id, [
+                    'categories.subcategories.expenses',
+                    'expenses',
+                ]),
+                'ExpenseController::index' => fn () => $budget->expenses()
+                    ->with('budgetSubcategory.budgetCategory', 'tags')
+                    ->orderBy('date', 'desc')
+                    ->paginate((int) $this->option('per-page')),
+            ];
+
+            $rows = [];
+
+            foreach ($payloads as $name => $loadPayload) {
+                $payload = $loadPayload();
+
+                $legacy = $this->measure($iterations, fn () => $this->legacyResponse($payload));
+                $direct = $this->measure($iterations, fn () => response()->json($payload)->getContent());
+
+                $rows[] = [
+                    $name,
+                    'decode/re-encode (before)',
+                    number_format($legacy['cpu_ms'], 1),
+                    number_format($legacy['peak_kb']),
+                    number_format($legacy['bytes']),
+                    '',
+                ];
+                $rows[] = [
+                    $name,
+                    'direct camelCase (after)',
+                    number_format($direct['cpu_ms'], 1),
+                    number_format($direct['peak_kb']),
+                    number_format($direct['bytes']),
+                    $legacy['content'] === $direct['content'] ? 'yes' : 'NO',
+                ];
+            }
+
+            $this->table(
+                ['Payload', 'Strategy', 'CPU ms (median)', 'Peak KB (median)', 'Bytes', 'Same JSON'],
+                $rows
+            );
+        } finally {
+            DB::rollBack();
+        }
+
+        return Command::SUCCESS;
+    }
+
+    /**
+     * Create a budget with 10 categories x 5 subcategories and the requested number of expenses
+     */
+    private function seedBudget(int $expenseCount): Budget
+    {
+        $user = User::create([
+            'name' => 'Benchmark',
+            'email' => 'bench-' . Str::uuid() . '@example.test',
+            'password' => Hash::make(Str::random(32)),
+        ]);
+
+        $budget = $user->budgets()->create([
+            'month' => now()->startOfMonth(),
+            'name' => 'Benchmark',
+            'revenue_cents' => 500000,
+        ]);
+
+        $subcategoryIds = [];
+
+        for ($c = 1; $c <= 10; $c++) {
+            $category = $budget->categories()->create([
+                'name' => "Catégorie {$c}",
+                'planned_amount_cents' => 50000,
+                'sort_order' => $c,
+            ]);
+
+            for ($s = 1; $s <= 5; $s++) {
+                $subcategoryIds[] = $category->subcategories()->create([
+                    'name' => "Sous-catégorie {$c}.{$s}",
+                    'planned_amount_cents' => 10000,
+                    'sort_order' => $s,
+                ])->id;
+            }
+        }
+
+        $now = now();
+        $rows = [];
+
+        for ($i = 1; $i <= $expenseCount; $i++) {
+            $rows[] = [
+                'budget_id' => $budget->id,
+                'budget_subcategory_id' => $subcategoryIds[$i % count($subcategoryIds)],
+                'date' => $now->copy()->startOfMonth()->addDays($i % 28)->toDateString(),
+                'label' => "Dépense {$i}",
+                'amount_cents' => 100 + $i % 10000,
+                'payment_method' => 'CB',
+                'notes' => $i % 3 === 0 ? 'Note de test' : null,
+                'created_at' => $now,
+                'updated_at' => $now,
+            ];
+
+            if (count($rows) === 1000) {
+                DB::table('expenses')->insert($rows);
+                $rows = [];
+            }
+        }
+
+        if ($rows) {
+            DB::table('expenses')->insert($rows);
+        }
+
+        return $budget;
+    }
+
+    /**
+     * Former pipeline: encode, decode, convert every key, re-encode
+     */
+    private function legacyResponse(mixed $payload): string
+    {
+        $response = new JsonResponse($payload);
+        $response->setData($this->legacyConvert($response->getData(true)));
+
+        return $response->getContent();
+    }
+
+    private function legacyConvert($data)
+    {
+        if (! is_array($data)) {
+            return $data;
+        }
+
+        $result = [];
+
+        foreach ($data as $key => $value) {
+            $result[lcfirst(str_replace('_', '', ucwords($key, '_')))] = is_array($value)
+                ? $this->legacyConvert($value)
+                : $value;
+        }
+
+        return $result;
+    }
+
+    /**
+     * Median CPU time (user + system) and peak memory over several runs
+     *
+     * @return array{cpu_ms: float, peak_kb: int, bytes: int, content: string}
+     */
+    private function measure(int $iterations, Closure $serialize): array
+    {
+        $cpu = [];
+        $peak = [];
+        $content = '';
+
+        for ($i = 0; $i < $iterations; $i++) {
+            gc_collect_cycles();
+            memory_reset_peak_usage();
+            $baseline = memory_get_usage();
+            $before = getrusage();
+
+            $content = $serialize();
+
+            $after = getrusage();
+            $peak[] = (int) ((memory_get_peak_usage() - $baseline) / 1024);
+            $cpu[] = $this->cpuMicroseconds($after) - $this->cpuMicroseconds($before);
+        }
+
+        sort($cpu);
+        sort($peak);
+
+        return [
+            'cpu_ms' => $cpu[intdiv($iterations, 2)] / 1000,
+            'peak_kb' => $peak[intdiv($iterations, 2)],
+            'bytes' => strlen($content),
+            'content' => $content,
+        ];
+    }
+
+    private function cpuMicroseconds(array $usage): int
+    {
+        return ($usage['ru_utime.tv_sec'] + $usage['ru_stime.tv_sec']) * 1000000
+            + $usage['ru_utime.tv_usec'] + $usage['ru_stime.tv_usec'];
+    }
+}
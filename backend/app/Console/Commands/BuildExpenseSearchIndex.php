@@ -0,0 +1,62 @@
+<?php
+
+namespace App\Console\Commands;
+
+use App\Models\Expense;
+use Illuminate\Console\Command;
+use Illuminate\Support\Facades\DB;
+use Illuminate\Support\Facades\Schema;
+
+class BuildExpenseSearchIndex extends Command
+{
+    /**
+     * The name and signature of the console command.
+     *
+     * @var string
+     */
+    protected $signature = 'expenses:search-index
+                            {--rebuild : Drop and rebuild the index even if it already exists}';
+
+    /**
+     * The console command description.
+     *
+     * @var string
+     */
+    protected $description = 'Build the full-text search index on expense labels and notes and backfill existing rows';
+
+    /**
+     * Execute the console command.
+     */
+    public function handle()
+    {
+        if (! in_array(DB::connection()->getDriverName(), ['mysql', 'mariadb'], true)) {
+            $this->warn('Full-text indexes require MySQL or MariaDB. Expense search falls back to LIKE on this connection.');
+
+            return Command::SUCCESS;
+        }
+
+        $exists = Schema::hasIndex('expenses', Expense::SEARCH_INDEX);
+
+        if ($exists && $this->option('rebuild')) {
+            $this->info('Dropping existing search index...');
+            DB::statement('ALTER TABLE expenses DROP INDEX ' . Expense::SEARCH_INDEX);
+            $exists = false;
+        }
+
+        if (! $exists) {
+            $this->info('Building search index on ' . DB::table('expenses')->count() . ' expenses...');
+            $start = microtime(true);
+
+            // InnoDB indexe toutes les lignes existantes lors de la création ; les lectures restent possibles
+            DB::statement(
+                'ALTER TABLE expenses ADD FULLTEXT INDEX ' . Expense::SEARCH_INDEX . ' (label, notes), ALGORITHM=INPLACE, LOCK=SHARED'
+            );
+
+            $this->info(sprintf('Search index built in %.1fs.', microtime(true) - $start));
+        } else {
+            $this->info('Search index already exists. Use --rebuild to rebuild it.');
+        }
+
+        return Command::SUCCESS;
+    }
+}
@@ -2,7 +2,6 @@
 
 namespace App\Console\Commands;
 
-use App\Models\SavingsGoal;
 use App\Services\SavingsGoalService;
 use Illuminate\Console\Command;
 
@@ -13,7 +12,8 @@ class CheckSavingsGoalsStatus extends Command
      *
      * @var string
      */
-    protected $signature = 'savings-goals:check-status';
+    protected $signature = 'savings-goals:check-status
+                            {--chunk=500 : Number of goals processed per chunk}';
 
     /**
      * The console command description.
@@ -29,22 +29,24 @@ class CheckSavingsGoalsStatus extends Command
     {
         $this->info('Checking savings goals status...');
 
-        // Vérifier les risques pour tous les objectifs actifs
-        $activeGoals = SavingsGoal::where('status', 'active')
-            ->whereNotNull('target_date')
-            ->where('notify_risk', true)
-            ->get();
-
-        $this->info("Found {$activeGoals->count()} active goals with risk notifications enabled");
-
-        foreach ($activeGoals as $goal) {
-            $service->checkRiskNotifications($goal);
+        $chunkSize = max(1, (int) $this->option('chunk'));
+        $rows = [];
+
+        // Vérifier les risques pour tous les objectifs actifs, puis envoyer les rappels mensuels
+        foreach (['Risk checks' => 'sendRiskNotifications', 'Monthly reminders' => 'sendMonthlyReminders'] as $label => $method) {
+            $start = microtime(true);
+            $stats = $service->{$method}(now(), $chunkSize);
+
+            $rows[] = [
+                $label,
+                $stats['goals'],
+                $stats['created'],
+                $stats['chunks'],
+                sprintf('%.0f ms', (microtime(true) - $start) * 1000),
+            ];
         }
 
-        // Envoyer les rappels mensuels
-        $remindersSent = $service->sendMonthlyReminders();
-
-        $this->info("Risk checks completed. {$remindersSent} reminders sent.");
+        $this->table(['Phase', 'Goals matched', 'Notifications created', 'Chunks', 'Duration'], $rows);
 
         return Command::SUCCESS;
     }
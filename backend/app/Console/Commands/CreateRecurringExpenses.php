@@ -2,7 +2,11 @@
 
 namespace App\Console\Commands;
 
+use App\Jobs\GenerateMonthlyBudgets;
+use App\Models\User;
+use Carbon\Carbon;
 use Illuminate\Console\Command;
+use Illuminate\Support\Facades\Bus;
 
 class CreateRecurringExpenses extends Command
 {
@@ -11,20 +15,81 @@ class CreateRecurringExpenses extends Command
      *
      * @var string
      */
-    protected $signature = 'app:create-recurring-expenses';
+    protected $signature = 'app:create-recurring-expenses
+                            {--month= : First month to generate (Y-m), defaults to the month starting today or next}
+                            {--months=1 : Number of consecutive months to generate}
+                            {--chunk=200 : Number of users per queued job}
+                            {--sync : Generate in the current process instead of dispatching a batch}';
 
     /**
      * The console command description.
      *
      * @var string
      */
-    protected $description = 'Command description';
+    protected $description = 'Generate monthly budgets and their recurring expenses from the default template of every user';
 
     /**
      * Execute the console command.
      */
     public function handle()
     {
-        //
+        $month = $this->option('month')
+            ? Carbon::createFromFormat('Y-m-d', $this->option('month') . '-01')->startOfDay()
+            : $this->upcomingMonth();
+        $months = max(1, (int) $this->option('months'));
+        $chunkSize = max(1, (int) $this->option('chunk'));
+        $lastMonth = $month->copy()->addMonthsNoOverflow($months - 1);
+
+        // Seuls les utilisateurs avec un template par défaut et un mois manquant sont repris
+        $users = User::query()
+            ->whereHas('budgetTemplates', fn ($query) => $query->where('is_default', true))
+            ->whereHas(
+                'budgets',
+                fn ($query) => $query->whereBetween('month', [$month->toDateString(), $lastMonth->toDateString()]),
+                '<',
+                $months
+            );
+
+        $jobs = [];
+        $users->select('id')->chunkById($chunkSize, function ($chunk) use (&$jobs, $month, $months) {
+            $jobs[] = new GenerateMonthlyBudgets($chunk->pluck('id')->all(), $month->format('Y-m'), $months);
+        });
+
+        if (empty($jobs)) {
+            $this->info("No budget to generate for {$month->format('Y-m')}.");
+
+            return Command::SUCCESS;
+        }
+
+        if ($this->option('sync')) {
+            foreach ($jobs as $job) {
+                Bus::dispatchSync($job);
+            }
+
+            $this->info(count($jobs) . " chunk(s) generated for {$month->format('Y-m')}.");
+
+            return Command::SUCCESS;
+        }
+
+        $batch = Bus::batch($jobs)
+            ->name("budgets:generate:{$month->format('Y-m')}")
+            ->allowFailures()
+            ->dispatch();
+
+        $this->info(count($jobs) . " job(s) dispatched for {$month->format('Y-m')} (batch {$batch->id}).");
+
+        return Command::SUCCESS;
+    }
+
+    /**
+     * The month starting today on the 1st, otherwise next month
+     */
+    private function upcomingMonth(): Carbon
+    {
+        $today = now()->startOfDay();
+
+        return $today->day === 1
+            ? $today
+            : $today->startOfMonth()->addMonthNoOverflow();
     }
 }
@@ -0,0 +1,59 @@
+<?php
+
+namespace App\Console\Commands;
+
+use App\Services\SpendRollupService;
+use Illuminate\Console\Command;
+
+class RebuildSpendRollups extends Command
+{
+    /**
+     * The name and signature of the console command.
+     *
+     * @var string
+     */
+    protected $signature = 'budgets:rollups
+                            {--budget= : Limit to a single budget ID}
+                            {--verify : Only report drift between stored rollups and expenses, without rebuilding}';
+
+    /**
+     * The console command description.
+     *
+     * @var string
+     */
+    protected $description = 'Rebuild or verify the spend rollups stored on budgets, categories and subcategories';
+
+    /**
+     * Execute the console command.
+     */
+    public function handle(SpendRollupService $service)
+    {
+        $budgetId = $this->option('budget') ? (int) $this->option('budget') : null;
+
+        if ($this->option('verify')) {
+            $drifts = $service->verify($budgetId);
+
+            if (empty($drifts)) {
+                $this->info('Spend rollups are consistent.');
+
+                return Command::SUCCESS;
+            }
+
+            $this->table(
+                ['Level', 'ID', 'Stored cents', 'Actual cents', 'Stored count', 'Actual count'],
+                $drifts
+            );
+            $this->error(count($drifts) . ' rollup(s) out of sync. Run without --verify to rebuild.');
+
+            return Command::FAILURE;
+        }
+
+        $this->info('Rebuilding spend rollups...');
+
+        $service->rebuild($budgetId);
+
+        $this->info('Spend rollups rebuilt.');
+
+        return Command::SUCCESS;
+    }
+}
@@ -0,0 +1,58 @@
+<?php
+
+namespace App\Http\Controllers;
+
+use App\Services\QueryProfiler;
+use Illuminate\Http\Request;
+
+class AdminQueryProfileController extends Controller
+{
+    protected QueryProfiler $profiler;
+
+    public function __construct(QueryProfiler $profiler)
+    {
+        $this->profiler = $profiler;
+    }
+
+    /**
+     * Liste les profils SQL récents des requêtes échantillonnées
+     */
+    public function index(Request $request)
+    {
+        $validated = $request->validate([
+            'limit' => 'nullable|integer|min:1|max:200',
+            'path' => 'nullable|string|max:255',
+            'repeated_only' => 'nullable|boolean',
+        ]);
+
+        $profiles = collect($this->profiler->recent((int) config('profiling.history_size', 200)));
+
+        // Filtre par chemin (contient)
+        if (! empty($validated['path'])) {
+            $profiles = $profiles->filter(fn ($profile) => str_contains($profile['path'], $validated['path']));
+        }
+
+        // Uniquement les requêtes avec des requêtes SQL répétées (N+1)
+        if (! empty($validated['repeated_only'])) {
+            $profiles = $profiles->filter(fn ($profile) => ! empty($profile['repeated']));
+        }
+
+        return response()->json([
+            'enabled' => (bool) config('profiling.enabled'),
+            'sample_rate' => (float) config('profiling.sample_rate'),
+            'profiles' => $profiles->take($validated['limit'] ?? 50)->values(),
+        ]);
+    }
+
+    /**
+     * Supprimer les profils conservés
+     */
+    public function destroy()
+    {
+        $this->profiler->clear();
+
+        return response()->json([
+            'message' => 'Profils supprimés avec succès',
+        ]);
+    }
+}
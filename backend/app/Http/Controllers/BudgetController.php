@@ -4,12 +4,11 @@ namespace App\Http\Controllers;
 
 use App\Contracts\BudgetRepositoryInterface;
 use App\Models\Budget;
-use App\Models\SavingsPlan;
-use App\Services\RecurringExpenseService;
+use App\Services\BudgetComparisonService;
+use App\Services\BudgetGenerationService;
 use Barryvdh\DomPDF\Facade\Pdf as PDF;
 use Carbon\Carbon;
 use Illuminate\Http\Request;
-use Illuminate\Support\Facades\Log;
 
 class BudgetController extends Controller
 {
@@ -44,7 +43,7 @@ class BudgetController extends Controller
         ]);
     }
 
-    public function generate(Request $request)
+    public function generate(Request $request, BudgetGenerationService $generator)
     {
         $validated = $request->validate([
             'month' => 'required|date_format:Y-m',
@@ -69,83 +68,16 @@ class BudgetController extends Controller
             ], 404);
         }
 
-        // Déterminer le revenu à utiliser
-        $revenueCents = $template->revenue_cents;
+        // Catégories, sous-catégories, dépenses par défaut et récurrentes en une transaction
+        $budget = $generator->generateMonths($request->user(), $template, $month)->first();
 
-        // Si le template n'a pas de revenu, prendre celui du dernier budget
-        if (! $revenueCents) {
-            $lastBudget = $request->user()->budgets()
-                ->whereNotNull('revenue_cents')
-                ->orderBy('month', 'desc')
-                ->first();
-            $revenueCents = $lastBudget?->revenue_cents;
-        }
-
-        // Create budget from template
-        $budget = $request->user()->budgets()->create([
-            'month' => $month,
-            'name' => 'Budget ' . $month->isoFormat('MMMM YYYY'),
-            'generated_from_template_id' => $template->id,
-            'revenue_cents' => $revenueCents,
-        ]);
-
-        // Copy categories from template
-        foreach ($template->categories as $templateCat) {
-            $budgetCat = $budget->categories()->create([
-                'name' => $templateCat->name,
-                'planned_amount_cents' => $templateCat->planned_amount_cents,
-                'sort_order' => $templateCat->sort_order,
-            ]);
-
-            // Copy subcategories
-            foreach ($templateCat->subcategories as $templateSubcat) {
-                $budgetSubcat = $budgetCat->subcategories()->create([
-                    'name' => $templateSubcat->name,
-                    'planned_amount_cents' => $templateSubcat->planned_amount_cents,
-                    'sort_order' => $templateSubcat->sort_order,
-                    'default_spent_cents' => $templateSubcat->default_spent_cents ?? 0,
-                ]);
-
-                // Create default expense if default_spent_cents is set
-                if (($templateSubcat->default_spent_cents ?? 0) > 0) {
-                    $budgetSubcat->expenses()->create([
-                        'budget_id' => $budget->id,
-                        'label' => $templateSubcat->name,
-                        'amount_cents' => $templateSubcat->default_spent_cents,
-                        'date' => $month,
-                    ]);
-                }
-            }
-        }
-
-        // Create or update SavingsPlan for this month
-        // Calculate planned savings from "Épargne" category if exists
-        $savingsCategory = $budget->categories()->where('name', 'Épargne')->first();
-        $plannedCents = 0;
-
-        if ($savingsCategory) {
-            $plannedCents = $savingsCategory->subcategories->sum('planned_amount_cents');
+        if (! $budget) {
+            return response()->json([
+                'message' => 'Un budget existe déjà pour ce mois',
+                'budget' => $request->user()->budgets()->where('month', $month)->first(),
+            ], 409);
         }
 
-        SavingsPlan::updateOrCreate(
-            [
-                'user_id' => $request->user()->id,
-                'month' => $month,
-            ],
-            [
-                'planned_cents' => $plannedCents,
-            ]
-        );
-
-        // Create recurring expenses for this budget
-        $recurringExpensesCreated = app(RecurringExpenseService::class)
-            ->createRecurringExpensesForBudget($budget);
-
-        Log::info('Budget generated with recurring expenses', [
-            'budget_id' => $budget->id,
-            'recurring_expenses_created' => $recurringExpensesCreated,
-        ]);
-
         return response()->json($budget->load('categories.subcategories'), 201);
     }
 
@@ -184,14 +116,13 @@ class BudgetController extends Controller
         return response()->json(null, 204);
     }
 
-    public function compare(Request $request)
+    public function compare(Request $request, BudgetComparisonService $comparisonService)
     {
         $validated = $request->validate([
-            'months' => 'required|array|min:2|max:3',
+            'months' => 'required|array|min:2|max:' . BudgetComparisonService::MAX_MONTHS,
             'months.*' => 'required|date_format:Y-m',
         ]);
 
-        $comparisonService = new \App\Services\BudgetComparisonService();
         $result = $comparisonService->compare($request->user(), $validated['months']);
 
         return response()->json($result);
@@ -202,8 +133,7 @@ class BudgetController extends Controller
         $this->authorize('view', $budget);
 
         $budget = $this->budgetRepository->findWithRelations($budget->id, [
-            'categories.subcategories.expenses',
-            'expenses',
+            'categories.subcategories',
         ]);
 
         // Calculate statistics
@@ -234,7 +164,6 @@ class BudgetController extends Controller
         $totalPlanned = 0;
         $totalActual = 0;
         $byCategory = [];
-        $allExpenses = [];
 
         foreach ($budget->categories as $category) {
             $categoryPlanned = 0;
@@ -242,7 +171,7 @@ class BudgetController extends Controller
             $bySubcategory = [];
 
             foreach ($category->subcategories as $subcategory) {
-                $subcategoryActual = $subcategory->expenses->sum('amount_cents');
+                $subcategoryActual = $subcategory->spent_cents;
                 $categoryPlanned += $subcategory->planned_amount_cents;
                 $categoryActual += $subcategoryActual;
 
@@ -258,18 +187,6 @@ class BudgetController extends Controller
                     'variance_cents' => $subcategoryVariance,
                     'variance_percent' => $subcategoryVariancePercent,
                 ];
-
-                // Collect all expenses for top 10
-                foreach ($subcategory->expenses as $expense) {
-                    $allExpenses[] = [
-                        'date' => $expense->date,
-                        'label' => $expense->label,
-                        'amount_cents' => $expense->amount_cents,
-                        'category' => $category->name,
-                        'subcategory' => $subcategory->name,
-                        'payment_method' => $expense->payment_method,
-                    ];
-                }
             }
 
             $totalPlanned += $categoryPlanned;
@@ -290,9 +207,21 @@ class BudgetController extends Controller
             ];
         }
 
-        // Sort expenses by amount descending and take top 10
-        usort($allExpenses, fn ($a, $b) => $b['amount_cents'] <=> $a['amount_cents']);
-        $topExpenses = array_slice($allExpenses, 0, 10);
+        // Top 10 expenses fetched directly from the database instead of loading every expense
+        $topExpenses = $budget->expenses()
+            ->with('budgetSubcategory.budgetCategory')
+            ->orderBy('amount_cents', 'desc')
+            ->limit(10)
+            ->get()
+            ->map(fn ($expense) => [
+                'date' => $expense->date,
+                'label' => $expense->label,
+                'amount_cents' => $expense->amount_cents,
+                'category' => $expense->budgetSubcategory->budgetCategory->name,
+                'subcategory' => $expense->budgetSubcategory->name,
+                'payment_method' => $expense->payment_method,
+            ])
+            ->all();
 
         return [
             'total_planned_cents' => $totalPlanned,
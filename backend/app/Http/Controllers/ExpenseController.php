@@ -3,11 +3,15 @@
 namespace App\Http\Controllers;
 
 use App\Contracts\ExpenseRepositoryInterface;
+use App\Jobs\ImportExpensesCsv;
 use App\Models\Budget;
 use App\Models\Expense;
+use App\Models\ExpenseImport;
 use App\Services\CsvImportService;
+use App\Services\ExpenseSearchService;
 use App\Services\NotificationService;
 use Illuminate\Http\Request;
+use Illuminate\Support\Facades\DB;
 
 class ExpenseController extends Controller
 {
@@ -36,10 +40,9 @@ class ExpenseController extends Controller
             });
         }
 
-        // Search (case-insensitive, MySQL compatible)
+        // Search in label and notes (full-text index when available)
         if ($request->has('q') && !empty($request->q)) {
-            $searchTerm = '%' . str_replace(['%', '_'], ['\%', '\_'], $request->q) . '%';
-            $query->whereRaw('LOWER(label) LIKE LOWER(?)', [$searchTerm]);
+            $query->search((string) $request->q);
         }
 
         // Date range
@@ -55,6 +58,32 @@ class ExpenseController extends Controller
         return response()->json($expenses);
     }
 
+    /**
+     * Search the user's expenses across all budgets, with cursor pagination on (date, id)
+     */
+    public function search(Request $request, ExpenseSearchService $searchService)
+    {
+        $validated = $request->validate([
+            'q' => 'nullable|string|max:255',
+            'budget_id' => 'nullable|integer',
+            'from' => 'nullable|date',
+            'to' => 'nullable|date|after_or_equal:from',
+            'min_amount_cents' => 'nullable|integer|min:0',
+            'max_amount_cents' => 'nullable|integer|min:0',
+            'tag_id' => 'nullable|integer',
+            'payment_method' => 'nullable|string|max:100',
+            'per_page' => 'nullable|integer|min:1|max:' . ExpenseSearchService::MAX_PER_PAGE,
+        ]);
+
+        $expenses = $searchService->search(
+            $request->user(),
+            $validated,
+            (int) ($validated['per_page'] ?? ExpenseSearchService::DEFAULT_PER_PAGE)
+        );
+
+        return response()->json($expenses);
+    }
+
     public function store(Request $request, Budget $budget)
     {
         $this->authorize('update', $budget);
@@ -87,8 +116,8 @@ class ExpenseController extends Controller
 
         $expense = $this->expenseRepository->create($validated);
 
-        // Check for budget exceeded notification
-        app(NotificationService::class)->checkBudgetExceeded($expense);
+        // Budget exceeded alerts are evaluated asynchronously (debounced per subcategory)
+        app(NotificationService::class)->scheduleBudgetAlertCheck($expense->budget_id, $expense->budget_subcategory_id);
 
         return response()->json($expense, 201);
     }
@@ -123,8 +152,8 @@ class ExpenseController extends Controller
 
         $expense = $this->expenseRepository->update($expense, $validated);
 
-        // Check for budget exceeded notification
-        app(NotificationService::class)->checkBudgetExceeded($expense);
+        // Budget exceeded alerts are evaluated asynchronously (debounced per subcategory)
+        app(NotificationService::class)->scheduleBudgetAlertCheck($expense->budget_id, $expense->budget_subcategory_id);
 
         return response()->json($expense);
     }
@@ -150,56 +179,9 @@ class ExpenseController extends Controller
         $csvService = new CsvImportService();
 
         try {
-            // Valider le fichier
+            // Valider le fichier et son en-tête avant de le mettre en file d'attente
             $csvService->validate($file);
-
-            // Parser et valider le contenu
-            $result = $csvService->parse($file);
-            $csvData = $result['data'];
-            $errors = $result['errors'];
-
-            $imported = 0;
-
-            // Précharger toutes les sous-catégories pour éviter N+1
-            $budget->loadMissing('categories.subcategories');
-
-            foreach ($csvData as $index => $data) {
-                try {
-                    // Trouver la sous-catégorie par nom
-                    $subcategory = null;
-                    foreach ($budget->categories as $category) {
-                        $found = $category->subcategories->firstWhere('name', $data['subcategory']);
-                        if ($found) {
-                            $subcategory = $found;
-                            break;
-                        }
-                    }
-
-                    if (!$subcategory) {
-                        $errors[] = 'Ligne ' . ($index + 2) . ": Sous-catégorie '{$data['subcategory']}' non trouvée";
-                        continue;
-                    }
-
-                    $budget->expenses()->create([
-                        'budget_subcategory_id' => $subcategory->id,
-                        'date' => $data['date'],
-                        'label' => $data['label'],
-                        'amount_cents' => $data['amount_cents'],
-                        'payment_method' => $data['payment_method'],
-                        'notes' => $data['notes'],
-                    ]);
-
-                    $imported++;
-                } catch (\Exception $e) {
-                    $errors[] = 'Ligne ' . ($index + 2) . ': ' . $e->getMessage();
-                }
-            }
-
-            return response()->json([
-                'imported' => $imported,
-                'errors' => $errors,
-                'total_rows' => count($csvData),
-            ]);
+            $csvService->validateHeaderOf($file->getRealPath());
         } catch (\Exception $e) {
             return response()->json([
                 'imported' => 0,
@@ -207,30 +189,71 @@ class ExpenseController extends Controller
                 'total_rows' => 0,
             ], 422);
         }
+
+        $import = ExpenseImport::create([
+            'user_id' => $request->user()->id,
+            'budget_id' => $budget->id,
+            'status' => ExpenseImport::STATUS_PENDING,
+            'file_path' => $file->store('imports', 'local'),
+        ]);
+
+        ImportExpensesCsv::dispatch($import);
+
+        return response()->json($import->fresh(), 202);
+    }
+
+    public function importStatus(Request $request, Budget $budget, ExpenseImport $expenseImport)
+    {
+        $this->authorize('view', $budget);
+
+        if ($expenseImport->budget_id !== $budget->id) {
+            return response()->json(['message' => 'Import non trouvé pour ce budget'], 404);
+        }
+
+        return response()->json($expenseImport);
     }
 
     public function exportCsv(Request $request, Budget $budget)
     {
         $this->authorize('view', $budget);
 
-        $expenses = $budget->expenses()->with('budgetSubcategory.budgetCategory')->get();
-
-        $csv = "date,label,amount_cents,category,subcategory,payment_method,notes\n";
+        $query = DB::table('expenses')
+            ->join('budget_subcategories', 'budget_subcategories.id', '=', 'expenses.budget_subcategory_id')
+            ->join('budget_categories', 'budget_categories.id', '=', 'budget_subcategories.budget_category_id')
+            ->where('expenses.budget_id', $budget->id)
+            ->select([
+                'expenses.id',
+                'expenses.date',
+                'expenses.label',
+                'expenses.amount_cents',
+                'budget_categories.name as category',
+                'budget_subcategories.name as subcategory',
+                'expenses.payment_method',
+                'expenses.notes',
+            ]);
 
-        foreach ($expenses as $expense) {
-            $csv .= implode(',', [
-                $expense->date->format('Y-m-d'),
-                '"' . str_replace('"', '""', $expense->label) . '"',
-                $expense->amount_cents,
-                '"' . str_replace('"', '""', $expense->budgetSubcategory->budgetCategory->name) . '"',
-                '"' . str_replace('"', '""', $expense->budgetSubcategory->name) . '"',
-                '"' . str_replace('"', '""', $expense->payment_method ?? '') . '"',
-                '"' . str_replace('"', '""', $expense->notes ?? '') . '"',
-            ]) . "\n";
-        }
+        $quote = fn (?string $value) => '"' . str_replace('"', '""', $value ?? '') . '"';
+
+        // Écrire la réponse au fil de la lecture par lots : mémoire constante
+        return response()->streamDownload(function () use ($query, $quote) {
+            $output = fopen('php://output', 'w');
+            fwrite($output, "date,label,amount_cents,category,subcategory,payment_method,notes\n");
+
+            foreach ($query->lazyById(1000, 'expenses.id', 'id') as $expense) {
+                fwrite($output, implode(',', [
+                    substr($expense->date, 0, 10),
+                    $quote($expense->label),
+                    $expense->amount_cents,
+                    $quote($expense->category),
+                    $quote($expense->subcategory),
+                    $quote($expense->payment_method),
+                    $quote($expense->notes),
+                ]) . "\n");
+            }
 
-        return response($csv, 200)
-            ->header('Content-Type', 'text/csv')
-            ->header('Content-Disposition', 'attachment; filename="expenses-' . $budget->month->format('Y-m') . '.csv"');
+            fclose($output);
+        }, 'expenses-' . $budget->month->format('Y-m') . '.csv', [
+            'Content-Type' => 'text/csv',
+        ]);
     }
 }
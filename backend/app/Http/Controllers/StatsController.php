@@ -3,103 +3,49 @@
 namespace App\Http\Controllers;
 
 use App\Models\Budget;
-use App\Models\WealthHistory;
+use App\Services\DashboardStatsService;
+use App\Services\StatsService;
+use App\Services\TimeSeriesAnalyticsService;
+use Carbon\Carbon;
 use Illuminate\Http\Request;
+use Illuminate\Validation\ValidationException;
 
+/**
+ * Les statistiques sont construites directement en camelCase :
+ * les réponses utilisent camelJson() et ne sont pas converties.
+ */
 class StatsController extends Controller
 {
+    protected StatsService $statsService;
+
+    public function __construct(StatsService $statsService)
+    {
+        $this->statsService = $statsService;
+    }
+
     public function summary(Request $request, Budget $budget)
     {
         $this->authorize('view', $budget);
 
-        // Charger les relations en une seule requête pour éviter N+1
-        $budget->loadMissing(['categories', 'expenses']);
-
-        $totalPlanned = $budget->categories->sum('planned_amount_cents');
-        $totalActual = $budget->expenses->sum('amount_cents');
-        $variance = $totalActual - $totalPlanned;
-        $variancePercentage = $totalPlanned > 0 ? (($totalActual / $totalPlanned - 1) * 100) : null;
-
-        return response()->json([
-            'totalPlannedCents' => $totalPlanned,
-            'totalActualCents' => $totalActual,
-            'varianceCents' => $variance,
-            'variancePercentage' => $variancePercentage,
-            'expenseCount' => $budget->expenses->count(),
-        ]);
+        return response()->camelJson($this->statsService->summary($budget));
     }
 
     public function byCategory(Request $request, Budget $budget)
     {
         $this->authorize('view', $budget);
 
-        // Charger toutes les relations nécessaires en une seule requête
-        $budget->loadMissing('categories.subcategories.expenses');
-
-        $stats = $budget->categories->map(function ($category) {
-            $actualCents = $category->subcategories->sum(function ($subcat) {
-                return $subcat->expenses->sum('amount_cents');
-            });
-
-            $varianceCents = $actualCents - $category->planned_amount_cents;
-            $variancePercentage = $category->planned_amount_cents > 0
-                ? (($actualCents / $category->planned_amount_cents - 1) * 100)
-                : null;
-
-            return [
-                'id' => $category->id,
-                'name' => $category->name,
-                'plannedAmountCents' => $category->planned_amount_cents,
-                'actualAmountCents' => $actualCents,
-                'varianceCents' => $varianceCents,
-                'variancePercentage' => $variancePercentage,
-                'expenseCount' => $category->subcategories->sum(function ($subcat) {
-                    return $subcat->expenses->count();
-                }),
-            ];
-        });
-
-        return response()->json($stats);
+        return response()->camelJson($this->statsService->byCategory($budget));
     }
 
     public function bySubcategory(Request $request, Budget $budget)
     {
         $this->authorize('view', $budget);
 
-        // Charger toutes les relations nécessaires en une seule requête
-        $budget->loadMissing('categories.subcategories.expenses');
-
         $categoryId = $request->query('categoryId');
 
-        $categories = $categoryId
-            ? $budget->categories->where('id', $categoryId)
-            : $budget->categories;
-
-        $stats = [];
-
-        foreach ($categories as $category) {
-            foreach ($category->subcategories as $subcategory) {
-                $actualCents = $subcategory->expenses->sum('amount_cents');
-                $varianceCents = $actualCents - $subcategory->planned_amount_cents;
-                $variancePercentage = $subcategory->planned_amount_cents > 0
-                    ? (($actualCents / $subcategory->planned_amount_cents - 1) * 100)
-                    : null;
-
-                $stats[] = [
-                    'id' => $subcategory->id,
-                    'name' => $subcategory->name,
-                    'categoryId' => $category->id,
-                    'categoryName' => $category->name,
-                    'plannedAmountCents' => $subcategory->planned_amount_cents,
-                    'actualAmountCents' => $actualCents,
-                    'varianceCents' => $varianceCents,
-                    'variancePercentage' => $variancePercentage,
-                    'expenseCount' => $subcategory->expenses->count(),
-                ];
-            }
-        }
-
-        return response()->json($stats);
+        return response()->camelJson(
+            $this->statsService->bySubcategory($budget, $categoryId ? (int) $categoryId : null)
+        );
     }
 
     /**
@@ -107,36 +53,9 @@ class StatsController extends Controller
      */
     public function wealthEvolution(Request $request)
     {
-        $query = WealthHistory::where('user_id', $request->user()->id)
-            ->orderBy('recorded_at', 'asc');
-
-        if ($request->has('from')) {
-            $query->where('recorded_at', '>=', $request->from);
-        }
-
-        if ($request->has('to')) {
-            $query->where('recorded_at', '<=', $request->to);
-        }
-
-        $history = $query->get();
-
-        return response()->json([
-            'labels' => $history->pluck('recorded_at')->map(fn ($date) => $date->format('Y-m-d')),
-            'datasets' => [
-                [
-                    'label' => 'Actifs',
-                    'data' => $history->pluck('total_assets_cents'),
-                ],
-                [
-                    'label' => 'Passifs',
-                    'data' => $history->pluck('total_liabilities_cents'),
-                ],
-                [
-                    'label' => 'Patrimoine Net',
-                    'data' => $history->pluck('net_worth_cents'),
-                ],
-            ],
-        ]);
+        return response()->camelJson(
+            $this->statsService->wealthEvolution($request->user(), $request->from, $request->to)
+        );
     }
 
     /**
@@ -146,23 +65,7 @@ class StatsController extends Controller
     {
         $this->authorize('view', $budget);
 
-        // Charger toutes les relations nécessaires en une seule requête
-        $budget->loadMissing('categories.subcategories.expenses');
-
-        $distribution = $budget->categories->map(function ($category) {
-            $actualCents = $category->subcategories->sum(function ($subcat) {
-                return $subcat->expenses->sum('amount_cents');
-            });
-
-            return [
-                'label' => $category->name,
-                'value' => $actualCents,
-            ];
-        })->filter(function ($item) {
-            return $item['value'] > 0; // Only include categories with expenses
-        })->values();
-
-        return response()->json($distribution);
+        return response()->camelJson($this->statsService->expenseDistribution($budget));
     }
 
     /**
@@ -200,7 +103,7 @@ class StatsController extends Controller
         // Sort by total amount descending
         $tagStats = collect($tagStats)->sortByDesc('totalAmountCents')->values();
 
-        return response()->json($tagStats);
+        return response()->camelJson($tagStats);
     }
 
     /**
@@ -210,30 +113,9 @@ class StatsController extends Controller
     {
         $this->authorize('view', $budget);
 
-        $limit = $request->query('limit', 5);
-
-        $budget->loadMissing('categories.subcategories.expenses');
-
-        $categoryTotals = $budget->categories->map(function ($category) {
-            $actualCents = $category->subcategories->sum(function ($subcat) {
-                return $subcat->expenses->sum('amount_cents');
-            });
-
-            return [
-                'id' => $category->id,
-                'name' => $category->name,
-                'actualCents' => $actualCents,
-                'plannedCents' => $category->planned_amount_cents,
-                'varianceCents' => $actualCents - $category->planned_amount_cents,
-                'expenseCount' => $category->subcategories->sum(fn ($s) => $s->expenses->count()),
-            ];
-        })
-            ->filter(fn ($cat) => $cat['actualCents'] > 0)
-            ->sortByDesc('actualCents')
-            ->take($limit)
-            ->values();
-
-        return response()->json($categoryTotals);
+        $limit = (int) $request->query('limit', 5);
+
+        return response()->camelJson($this->statsService->topCategories($budget, $limit));
     }
 
     /**
@@ -244,49 +126,71 @@ class StatsController extends Controller
         $validated = $request->validate([
             'from' => 'sometimes|date_format:Y-m',
             'to' => 'sometimes|date_format:Y-m',
-            'months' => 'sometimes|integer|min:1|max:24',
+            'months' => 'sometimes|integer|min:1|max:' . TimeSeriesAnalyticsService::MAX_MONTHS,
         ]);
 
-        $user = $request->user();
-        $months = $validated['months'] ?? 12;
+        return response()->camelJson($this->statsService->savingsRateEvolution(
+            $request->user(),
+            $validated['from'] ?? null,
+            $validated['to'] ?? null,
+            (int) ($validated['months'] ?? 12)
+        ));
+    }
+
+    /**
+     * Get monthly totals per category, tag or payment method over a range of months,
+     * with year-over-year and rolling-average series
+     */
+    public function timeSeries(Request $request, TimeSeriesAnalyticsService $analytics)
+    {
+        $validated = $request->validate([
+            'from' => 'required|date_format:Y-m',
+            'to' => 'required|date_format:Y-m|after_or_equal:from',
+            'dimension' => 'sometimes|in:' . implode(',', TimeSeriesAnalyticsService::DIMENSIONS),
+            'rolling_window' => 'sometimes|integer|min:1|max:24',
+        ]);
 
-        $query = $user->budgets()
-            ->orderBy('month', 'desc')
-            ->whereNotNull('revenue_cents')
-            ->with('expenses');
+        $from = Carbon::parse($validated['from'] . '-01');
+        $to = Carbon::parse($validated['to'] . '-01');
 
-        if (isset($validated['from'])) {
-            $fromDate = \Carbon\Carbon::parse($validated['from'] . '-01');
-            $query->where('month', '>=', $fromDate);
-        }
-        if (isset($validated['to'])) {
-            $toDate = \Carbon\Carbon::parse($validated['to'] . '-01');
-            $query->where('month', '<=', $toDate);
+        if ($from->diffInMonths($to) + 1 > TimeSeriesAnalyticsService::MAX_MONTHS) {
+            throw ValidationException::withMessages([
+                'to' => 'La période ne peut pas dépasser ' . TimeSeriesAnalyticsService::MAX_MONTHS . ' mois.',
+            ]);
         }
 
-        if (! isset($validated['from']) && ! isset($validated['to'])) {
-            $query->take($months);
-        }
+        $months = $analytics->months($from, $to);
+
+        return response()->camelJson($analytics->series(
+            $request->user(),
+            $months,
+            $validated['dimension'] ?? 'total',
+            (int) ($validated['rolling_window'] ?? TimeSeriesAnalyticsService::DEFAULT_ROLLING_WINDOW)
+        ));
+    }
+
+    /**
+     * Get every dashboard widget's data in one cached response
+     * (conditional requests are handled by the stats.etag middleware)
+     */
+    public function dashboard(Request $request, DashboardStatsService $dashboardStats)
+    {
+        $validated = $request->validate([
+            'budget_id' => 'sometimes|nullable|integer',
+            'top_limit' => 'sometimes|integer|min:1|max:20',
+            'savings_months' => 'sometimes|integer|min:1|max:24',
+            'wealth_from' => 'sometimes|nullable|date',
+            'wealth_to' => 'sometimes|nullable|date',
+        ]);
+
+        $params = [
+            'budget_id' => isset($validated['budget_id']) ? (int) $validated['budget_id'] : null,
+            'top_limit' => (int) ($validated['top_limit'] ?? 5),
+            'savings_months' => (int) ($validated['savings_months'] ?? 12),
+            'wealth_from' => $validated['wealth_from'] ?? null,
+            'wealth_to' => $validated['wealth_to'] ?? null,
+        ];
 
-        $budgets = $query->get()->sortBy('month');
-
-        $data = $budgets->map(function ($budget) {
-            $totalExpenses = $budget->expenses->sum('amount_cents');
-            $savings = $budget->revenue_cents - $totalExpenses;
-            $savingsRate = $budget->revenue_cents > 0
-                ? round(($savings / $budget->revenue_cents) * 100, 2)
-                : null;
-
-            return [
-                'month' => $budget->month->format('Y-m'),
-                'monthLabel' => $budget->month->translatedFormat('F Y'),
-                'revenueCents' => $budget->revenue_cents,
-                'expensesCents' => $totalExpenses,
-                'savingsCents' => $savings,
-                'savingsRatePercent' => $savingsRate,
-            ];
-        });
-
-        return response()->json($data);
+        return response()->camelJson($dashboardStats->get($request->user(), $params));
     }
 }
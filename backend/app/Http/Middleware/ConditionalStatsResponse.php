@@ -0,0 +1,53 @@
+<?php
+
+namespace App\Http\Middleware;
+
+use App\Services\DashboardStatsService;
+use Closure;
+use Illuminate\Http\Request;
+use Symfony\Component\HttpFoundation\Response;
+
+class ConditionalStatsResponse
+{
+    protected DashboardStatsService $dashboardStats;
+
+    public function __construct(DashboardStatsService $dashboardStats)
+    {
+        $this->dashboardStats = $dashboardStats;
+    }
+
+    /**
+     * Handle an incoming request.
+     *
+     * Ajoute un ETag basé sur la version des statistiques de l'utilisateur.
+     * Si le client renvoie un ETag toujours valide (If-None-Match), répond 304
+     * sans exécuter le contrôleur.
+     *
+     * @param \Closure(\Illuminate\Http\Request): (\Symfony\Component\HttpFoundation\Response) $next
+     */
+    public function handle(Request $request, Closure $next): Response
+    {
+        $user = $request->user();
+
+        if (! $user || ! $request->isMethod('GET')) {
+            return $next($request);
+        }
+
+        $etag = $this->dashboardStats->etag($user->id, $request->path(), $request->query());
+
+        if (in_array('"' . $etag . '"', $request->getETags(), true)) {
+            return response(null, 304)
+                ->setEtag($etag)
+                ->header('Cache-Control', 'private, no-cache');
+        }
+
+        $response = $next($request);
+
+        if ($response->isSuccessful()) {
+            $response->setEtag($etag);
+            $response->headers->set('Cache-Control', 'private, no-cache');
+        }
+
+        return $response;
+    }
+}
@@ -2,6 +2,7 @@
 
 namespace App\Http\Middleware;
 
+use App\Http\Serialization\KeyCase;
 use Closure;
 use Illuminate\Http\Request;
 use Symfony\Component\HttpFoundation\Response;
@@ -13,48 +14,19 @@ class ConvertRequestToSnakeCase
      *
      * Convertit les clés des données de la requête de camelCase en snake_case
      * pour correspondre aux conventions de Laravel et de la base de données.
+     * Les données ne sont remplacées que si au moins une clé a changé.
      *
      * @param \Closure(\Illuminate\Http\Request): (\Symfony\Component\HttpFoundation\Response) $next
      */
     public function handle(Request $request, Closure $next): Response
     {
-        // Convertir les données de la requête
-        $input = $request->all();
-        $snakeCaseInput = $this->convertKeysToSnakeCase($input);
-        $request->replace($snakeCaseInput);
+        $changed = false;
+        $snakeCaseInput = KeyCase::snakeKeys($request->all(), $changed);
 
-        return $next($request);
-    }
-
-    /**
-     * Convertit récursivement les clés d'un tableau de camelCase en snake_case
-     */
-    private function convertKeysToSnakeCase($data)
-    {
-        if (! is_array($data)) {
-            return $data;
-        }
-
-        $result = [];
-
-        foreach ($data as $key => $value) {
-            $snakeKey = $this->camelToSnake($key);
-
-            if (is_array($value)) {
-                $result[$snakeKey] = $this->convertKeysToSnakeCase($value);
-            } else {
-                $result[$snakeKey] = $value;
-            }
+        if ($changed) {
+            $request->replace($snakeCaseInput);
         }
 
-        return $result;
-    }
-
-    /**
-     * Convertit une chaîne camelCase en snake_case
-     */
-    private function camelToSnake(string $string): string
-    {
-        return strtolower(preg_replace('/(?<!^)[A-Z]/', '_$0', $string));
+        return $next($request);
     }
 }
@@ -2,6 +2,8 @@
 
 namespace App\Http\Middleware;
 
+use App\Http\Serialization\CamelCaseJsonResponse;
+use App\Http\Serialization\KeyCase;
 use Closure;
 use Illuminate\Http\JsonResponse;
 use Illuminate\Http\Request;
@@ -12,51 +14,21 @@ class ConvertResponseToCamelCase
     /**
      * Handle an incoming request.
      *
+     * Les réponses créées par response()->json() sont déjà en camelCase
+     * (CamelCaseResponseFactory) ; seules les JsonResponse construites
+     * directement sont encore décodées et converties ici.
+     *
      * @param \Closure(\Illuminate\Http\Request): (\Symfony\Component\HttpFoundation\Response) $next
      */
     public function handle(Request $request, Closure $next): Response
     {
         $response = $next($request);
 
-        // Transformer seulement les réponses JSON
-        if ($response instanceof JsonResponse) {
-            $data = $response->getData(true);
-            $camelCaseData = $this->convertKeysToCamelCase($data);
-            $response->setData($camelCaseData);
+        // Transformer seulement les réponses JSON pas encore converties
+        if ($response instanceof JsonResponse && ! $response instanceof CamelCaseJsonResponse) {
+            $response->setData(KeyCase::camelize($response->getData(true)));
         }
 
         return $response;
     }
-
-    /**
-     * Convertit récursivement les clés d'un tableau de snake_case en camelCase
-     */
-    private function convertKeysToCamelCase($data)
-    {
-        if (! is_array($data)) {
-            return $data;
-        }
-
-        $result = [];
-
-        foreach ($data as $key => $value) {
-            $camelKey = $this->snakeToCamel($key);
-
-            if (is_array($value)) {
-                $result[$camelKey] = $this->convertKeysToCamelCase($value);
-            } else {
-                $result[$camelKey] = $value;
-            }
-        }
-
-        return $result;
-    }
-
-    /**
-     * Convertit une chaîne snake_case en camelCase
-     */
-    private function snakeToCamel(string $string): string
-    {
-        return lcfirst(str_replace('_', '', ucwords($string, '_')));
-    }
 }
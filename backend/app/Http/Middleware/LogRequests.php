@@ -2,30 +2,93 @@
 
 namespace App\Http\Middleware;
 
+use App\Services\QueryProfiler;
 use Closure;
 use Illuminate\Http\Request;
 use Illuminate\Support\Facades\Log;
 use Symfony\Component\HttpFoundation\Response;
+use Symfony\Component\HttpFoundation\StreamedResponse;
 
 class LogRequests
 {
+    protected QueryProfiler $profiler;
+
+    public function __construct(QueryProfiler $profiler)
+    {
+        $this->profiler = $profiler;
+    }
+
     public function handle(Request $request, Closure $next): Response
     {
+        $loggable = ! str_contains($request->path(), 'health');
+
+        // Profil SQL sur un échantillon des requêtes (config/profiling.php)
+        $profiling = $loggable && $this->profiler->shouldSample();
+
+        if ($profiling) {
+            $this->profiler->start();
+        }
+
         $startTime = microtime(true);
         $response = $next($request);
-        $duration = round((microtime(true) - $startTime) * 1000, 2);
-
-        if (! str_contains($request->path(), 'health')) {
-            Log::info('HTTP Request', [
-                'method' => $request->method(),
-                'path' => $request->path(),
-                'status' => $response->getStatusCode(),
-                'duration_ms' => $duration,
-                'ip' => $request->ip(),
-                'user_id' => $request->user()?->id,
-            ]);
+
+        if (! $loggable) {
+            return $response;
+        }
+
+        // Réponses en flux (export CSV) : les requêtes SQL sont exécutées pendant
+        // l'envoi du corps, la journalisation a donc lieu une fois le flux terminé
+        if ($response instanceof StreamedResponse && $response->getCallback()) {
+            $callback = $response->getCallback();
+
+            return $response->setCallback(function () use ($callback, $request, $response, $startTime, $profiling) {
+                try {
+                    $callback();
+                } finally {
+                    $this->log($request, $response, $startTime, $profiling);
+                }
+            });
         }
 
+        $this->log($request, $response, $startTime, $profiling);
+
         return $response;
     }
+
+    /**
+     * Journaliser la requête et, si elle est échantillonnée, son profil SQL
+     */
+    protected function log(Request $request, Response $response, float $startTime, bool $profiling): void
+    {
+        $context = [
+            'method' => $request->method(),
+            'path' => $request->path(),
+            'status' => $response->getStatusCode(),
+            'duration_ms' => round((microtime(true) - $startTime) * 1000, 2),
+            'ip' => $request->ip(),
+            'user_id' => $request->user()?->id,
+        ];
+
+        if ($profiling) {
+            $profile = $this->profiler->stop();
+
+            $context['query_count'] = $profile['query_count'];
+            $context['query_time_ms'] = $profile['query_time_ms'];
+
+            if (! empty($profile['repeated'])) {
+                Log::warning('Repeated queries detected', [
+                    'method' => $context['method'],
+                    'path' => $context['path'],
+                    'repeated' => $profile['repeated'],
+                ]);
+            }
+
+            $this->profiler->store(array_merge($context, $profile, [
+                'route' => $request->route()?->uri(),
+                'recorded_at' => now()->toIso8601String(),
+            ]));
+        }
+
+        Log::info('HTTP Request', $context);
+    }
 }
@@ -0,0 +1,13 @@
+<?php
+
+namespace App\Http\Serialization;
+
+use Illuminate\Http\JsonResponse;
+
+/**
+ * Réponse JSON dont les clés sont déjà en camelCase.
+ * ConvertResponseToCamelCase la laisse passer sans la décoder.
+ */
+class CamelCaseJsonResponse extends JsonResponse
+{
+}
@@ -0,0 +1,43 @@
+<?php
+
+namespace App\Http\Serialization;
+
+use Illuminate\Routing\ResponseFactory;
+
+/**
+ * Fabrique de réponses qui émet les clés JSON en camelCase au moment de la
+ * sérialisation, au lieu de décoder puis ré-encoder la réponse dans un middleware.
+ */
+class CamelCaseResponseFactory extends ResponseFactory
+{
+    /**
+     * Réponse JSON dont les clés sont converties en camelCase pendant la sérialisation
+     *
+     * @param mixed $data
+     * @param int $status
+     * @param array $headers
+     * @param int $options
+     *
+     * @return CamelCaseJsonResponse
+     */
+    public function json($data = [], $status = 200, array $headers = [], $options = 0)
+    {
+        return new CamelCaseJsonResponse(KeyCase::camelize($data), $status, $headers, $options);
+    }
+
+    /**
+     * Réponse JSON pour des données déjà en camelCase (statistiques
+     * construites à la main) : aucune conversion
+     *
+     * @param mixed $data
+     * @param int $status
+     * @param array $headers
+     * @param int $options
+     *
+     * @return CamelCaseJsonResponse
+     */
+    public function camelJson($data = [], $status = 200, array $headers = [], $options = 0)
+    {
+        return new CamelCaseJsonResponse($data, $status, $headers, $options);
+    }
+}
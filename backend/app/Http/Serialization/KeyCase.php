@@ -0,0 +1,124 @@
+<?php
+
+namespace App\Http\Serialization;
+
+use Illuminate\Contracts\Support\Arrayable;
+use JsonSerializable;
+use stdClass;
+
+/**
+ * Conversion des clés entre snake_case (Laravel, base de données) et
+ * camelCase (API). Les conversions sont mémorisées dans des caches bornés :
+ * le nombre de clés distinctes d'une API est faible, une clé n'est donc
+ * transformée qu'une seule fois par processus.
+ */
+final class KeyCase
+{
+    public const CACHE_LIMIT = 4096;
+
+    /** @var array<string, string> */
+    private static array $camelCache = [];
+
+    /** @var array<string, string> */
+    private static array $snakeCache = [];
+
+    /**
+     * Convertit une chaîne snake_case en camelCase
+     */
+    public static function camel(string $key): string
+    {
+        if (isset(self::$camelCache[$key])) {
+            return self::$camelCache[$key];
+        }
+
+        if (count(self::$camelCache) >= self::CACHE_LIMIT) {
+            self::$camelCache = [];
+        }
+
+        return self::$camelCache[$key] = str_contains($key, '_')
+            ? lcfirst(str_replace('_', '', ucwords($key, '_')))
+            : lcfirst($key);
+    }
+
+    /**
+     * Convertit une chaîne camelCase en snake_case
+     */
+    public static function snake(string $key): string
+    {
+        if (isset(self::$snakeCache[$key])) {
+            return self::$snakeCache[$key];
+        }
+
+        if (count(self::$snakeCache) >= self::CACHE_LIMIT) {
+            self::$snakeCache = [];
+        }
+
+        return self::$snakeCache[$key] = strtolower(preg_replace('/(?<!^)[A-Z]/', '_$0', $key));
+    }
+
+    /**
+     * Normalise une valeur pour l'encodage JSON en convertissant ses clés en camelCase.
+     *
+     * Modèles, collections et paginateurs sont sérialisés comme le ferait
+     * json_encode (JsonSerializable, puis Arrayable) : la réponse n'est encodée
+     * qu'une fois, sans décodage ni second parcours.
+     *
+     * @param mixed $value
+     *
+     * @return mixed
+     */
+    public static function camelize(mixed $value): mixed
+    {
+        if (is_array($value)) {
+            $result = [];
+
+            foreach ($value as $key => $item) {
+                $result[is_string($key) ? self::camel($key) : $key] = is_array($item) || is_object($item)
+                    ? self::camelize($item)
+                    : $item;
+            }
+
+            return $result;
+        }
+
+        if ($value instanceof JsonSerializable) {
+            return self::camelize($value->jsonSerialize());
+        }
+
+        if ($value instanceof Arrayable) {
+            return self::camelize($value->toArray());
+        }
+
+        if ($value instanceof stdClass) {
+            return self::camelize(get_object_vars($value));
+        }
+
+        return $value;
+    }
+
+    /**
+     * Convertit récursivement les clés d'un tableau de camelCase en snake_case.
+     * $changed indique si au moins une clé a été modifiée.
+     *
+     * @param array $data
+     * @param bool $changed
+     *
+     * @return array
+     */
+    public static function snakeKeys(array $data, bool &$changed = false): array
+    {
+        $result = [];
+
+        foreach ($data as $key => $value) {
+            if (is_string($key)) {
+                $snakeKey = self::snake($key);
+                $changed = $changed || $snakeKey !== $key;
+                $key = $snakeKey;
+            }
+
+            $result[$key] = is_array($value) ? self::snakeKeys($value, $changed) : $value;
+        }
+
+        return $result;
+    }
+}
@@ -0,0 +1,48 @@
+<?php
+
+namespace App\Jobs;
+
+use App\Services\NotificationService;
+use Illuminate\Bus\Queueable;
+use Illuminate\Contracts\Queue\ShouldBeUniqueUntilProcessing;
+use Illuminate\Contracts\Queue\ShouldQueue;
+use Illuminate\Foundation\Bus\Dispatchable;
+use Illuminate\Queue\InteractsWithQueue;
+use Illuminate\Queue\SerializesModels;
+
+/**
+ * Évalue les alertes de dépassement d'un budget (une sous-catégorie ou tout
+ * le budget). Le job est unique par (budget, sous-catégorie) jusqu'à son
+ * exécution : les écritures reçues pendant le délai d'attente sont regroupées
+ * en une seule évaluation.
+ */
+class EvaluateBudgetAlerts implements ShouldQueue, ShouldBeUniqueUntilProcessing
+{
+    use Dispatchable;
+    use InteractsWithQueue;
+    use Queueable;
+    use SerializesModels;
+
+    public const DEBOUNCE_SECONDS = 10;
+
+    public int $uniqueFor = 300;
+
+    public function __construct(
+        public int $budgetId,
+        public ?int $subcategoryId = null
+    ) {
+    }
+
+    public function uniqueId(): string
+    {
+        return $this->budgetId . ':' . ($this->subcategoryId ?? 'all');
+    }
+
+    public function handle(NotificationService $notificationService): void
+    {
+        $notificationService->checkBudgetAlerts(
+            $this->budgetId,
+            $this->subcategoryId ? [$this->subcategoryId] : null
+        );
+    }
+}
@@ -0,0 +1,94 @@
+<?php
+
+namespace App\Jobs;
+
+use App\Models\BudgetTemplate;
+use App\Models\User;
+use App\Services\BudgetGenerationService;
+use App\Services\RecurringExpenseService;
+use Carbon\Carbon;
+use Illuminate\Bus\Batchable;
+use Illuminate\Bus\Queueable;
+use Illuminate\Contracts\Queue\ShouldQueue;
+use Illuminate\Foundation\Bus\Dispatchable;
+use Illuminate\Queue\InteractsWithQueue;
+use Illuminate\Queue\SerializesModels;
+use Illuminate\Support\Facades\Log;
+use Throwable;
+
+/**
+ * Génère les budgets d'un lot d'utilisateurs pour un ou plusieurs mois.
+ * Templates et dépenses récurrentes sont chargés en une requête pour tout le
+ * lot ; les mois déjà générés sont ignorés, le job peut donc être rejoué.
+ */
+class GenerateMonthlyBudgets implements ShouldQueue
+{
+    use Batchable;
+    use Dispatchable;
+    use InteractsWithQueue;
+    use Queueable;
+    use SerializesModels;
+
+    public int $tries = 3;
+
+    public int $timeout = 600;
+
+    /**
+     * @param array<int> $userIds
+     * @param string $month Premier mois à générer (Y-m)
+     * @param int $months Nombre de mois consécutifs
+     */
+    public function __construct(
+        public array $userIds,
+        public string $month,
+        public int $months = 1
+    ) {
+    }
+
+    public function handle(BudgetGenerationService $generator, RecurringExpenseService $recurringService): void
+    {
+        if ($this->batch()?->cancelled()) {
+            return;
+        }
+
+        $from = Carbon::parse($this->month . '-01');
+
+        $templates = BudgetTemplate::whereIn('user_id', $this->userIds)
+            ->where('is_default', true)
+            ->with('categories.subcategories')
+            ->get()
+            ->keyBy('user_id');
+        $recurringByUser = $recurringService->activeForUsers($this->userIds);
+
+        $generated = 0;
+        $failed = 0;
+
+        foreach (User::whereIn('id', $templates->keys())->get() as $user) {
+            try {
+                $generated += $generator->generateMonths(
+                    $user,
+                    $templates[$user->id],
+                    $from,
+                    $this->months,
+                    $recurringByUser->get($user->id, collect())
+                )->count();
+            } catch (Throwable $e) {
+                // Un utilisateur en erreur ne bloque pas le reste du lot
+                $failed++;
+                Log::error('Budget generation failed', [
+                    'user_id' => $user->id,
+                    'month' => $this->month,
+                    'error' => $e->getMessage(),
+                ]);
+            }
+        }
+
+        Log::info('Monthly budgets generated', [
+            'month' => $this->month,
+            'months' => $this->months,
+            'users' => count($this->userIds),
+            'budgets_created' => $generated,
+            'failed' => $failed,
+        ]);
+    }
+}
@@ -0,0 +1,203 @@
+<?php
+
+namespace App\Jobs;
+
+use App\Models\ExpenseImport;
+use App\Services\CsvImportService;
+use App\Services\DashboardStatsService;
+use App\Services\NotificationService;
+use App\Services\SpendRollupService;
+use Illuminate\Bus\Queueable;
+use Illuminate\Contracts\Queue\ShouldQueue;
+use Illuminate\Foundation\Bus\Dispatchable;
+use Illuminate\Queue\InteractsWithQueue;
+use Illuminate\Queue\SerializesModels;
+use Illuminate\Support\Facades\DB;
+use Illuminate\Support\Facades\Log;
+use Illuminate\Support\Facades\Storage;
+use Throwable;
+
+/**
+ * Importe un fichier CSV de dépenses en arrière-plan : lecture en flux,
+ * résolution des sous-catégories par table de hachage et insertions
+ * multi-lignes par lots, chaque lot dans une transaction avec ses agrégats.
+ */
+class ImportExpensesCsv implements ShouldQueue
+{
+    use Dispatchable;
+    use InteractsWithQueue;
+    use Queueable;
+    use SerializesModels;
+
+    public const BATCH_SIZE = 500;
+
+    public int $tries = 1;
+
+    public int $timeout = 1800;
+
+    private array $errors = [];
+
+    private int $errorCount = 0;
+
+    public function __construct(public ExpenseImport $import)
+    {
+    }
+
+    public function handle(
+        CsvImportService $csvService,
+        SpendRollupService $rollupService,
+        DashboardStatsService $dashboardStats,
+        NotificationService $notificationService
+    ): void {
+        $import = $this->import;
+        $import->update([
+            'status' => ExpenseImport::STATUS_PROCESSING,
+            'started_at' => now(),
+        ]);
+
+        $subcategoryIds = $this->subcategoryIndex($import->budget_id);
+        $batch = [];
+        $processed = 0;
+        $imported = 0;
+
+        foreach ($csvService->rows(Storage::disk('local')->path($import->file_path)) as $row) {
+            $processed++;
+
+            if (isset($row['error'])) {
+                $this->recordError($row['row'], $row['error']);
+                continue;
+            }
+
+            $data = $row['data'];
+            $subcategoryId = $subcategoryIds[$data['subcategory']] ?? null;
+
+            if (! $subcategoryId) {
+                $this->recordError($row['row'], "Sous-catégorie '{$data['subcategory']}' non trouvée");
+                continue;
+            }
+
+            $batch[] = [
+                'budget_id' => $import->budget_id,
+                'budget_subcategory_id' => $subcategoryId,
+                'date' => $data['date'],
+                'label' => $data['label'],
+                'amount_cents' => $data['amount_cents'],
+                'payment_method' => $data['payment_method'],
+                'notes' => $data['notes'],
+            ];
+
+            if (count($batch) >= self::BATCH_SIZE) {
+                $imported += $this->insertBatch($batch, $rollupService);
+                $batch = [];
+                $this->reportProgress($processed, $imported);
+            }
+        }
+
+        if (! empty($batch)) {
+            $imported += $this->insertBatch($batch, $rollupService);
+        }
+
+        // Alertes de dépassement évaluées une seule fois pour tout le budget, dans
+        // un job séparé : un échec de l'évaluation ne doit pas marquer comme échoué
+        // un import dont les lignes sont déjà enregistrées
+        if ($imported > 0) {
+            $notificationService->scheduleBudgetAlertCheck($import->budget_id);
+        }
+
+        $this->reportProgress($processed, $imported, [
+            'status' => ExpenseImport::STATUS_COMPLETED,
+            'finished_at' => now(),
+        ]);
+
+        $dashboardStats->bumpVersion($import->user_id);
+        Storage::disk('local')->delete($import->file_path);
+
+        Log::info('CSV import completed', [
+            'import_id' => $import->id,
+            'budget_id' => $import->budget_id,
+            'processed_rows' => $processed,
+            'imported_rows' => $imported,
+            'error_count' => $this->errorCount,
+        ]);
+    }
+
+    /**
+     * Marquer l'import comme échoué
+     */
+    public function failed(Throwable $exception): void
+    {
+        $this->import->update([
+            'status' => ExpenseImport::STATUS_FAILED,
+            'errors' => array_merge($this->import->errors ?? [], [$exception->getMessage()]),
+            'finished_at' => now(),
+        ]);
+
+        Storage::disk('local')->delete($this->import->file_path);
+    }
+
+    /**
+     * Table nom de sous-catégorie => id pour le budget
+     * (en cas de doublon, la première sous-catégorie dans l'ordre d'affichage l'emporte)
+     */
+    private function subcategoryIndex(int $budgetId): array
+    {
+        $index = [];
+
+        DB::table('budget_subcategories')
+            ->join('budget_categories', 'budget_categories.id', '=', 'budget_subcategories.budget_category_id')
+            ->where('budget_categories.budget_id', $budgetId)
+            ->orderBy('budget_categories.sort_order')
+            ->orderBy('budget_subcategories.sort_order')
+            ->select('budget_subcategories.id', 'budget_subcategories.name')
+            ->get()
+            ->each(function ($subcategory) use (&$index) {
+                $index[$subcategory->name] ??= $subcategory->id;
+            });
+
+        return $index;
+    }
+
+    /**
+     * Insérer un lot en une requête et mettre à jour les agrégats dans la même transaction
+     */
+    private function insertBatch(array $batch, SpendRollupService $rollupService): int
+    {
+        $now = now();
+        $rows = array_map(fn ($row) => $row + ['created_at' => $now, 'updated_at' => $now], $batch);
+
+        DB::transaction(function () use ($rows, $rollupService) {
+            DB::table('expenses')->insert($rows);
+
+            $totals = [];
+            foreach ($rows as $row) {
+                $totals[$row['budget_subcategory_id']]['amount'] = ($totals[$row['budget_subcategory_id']]['amount'] ?? 0) + $row['amount_cents'];
+                $totals[$row['budget_subcategory_id']]['count'] = ($totals[$row['budget_subcategory_id']]['count'] ?? 0) + 1;
+            }
+
+            foreach ($totals as $subcategoryId => $total) {
+                $rollupService->applyDelta($this->import->budget_id, $subcategoryId, $total['amount'], $total['count']);
+            }
+        });
+
+        return count($rows);
+    }
+
+    private function recordError(int $rowNumber, string $message): void
+    {
+        $this->errorCount++;
+
+        if (count($this->errors) < ExpenseImport::MAX_REPORTED_ERRORS) {
+            $this->errors[] = "Ligne {$rowNumber}: {$message}";
+        }
+    }
+
+    private function reportProgress(int $processed, int $imported, array $extra = []): void
+    {
+        $this->import->update(array_merge([
+            'processed_rows' => $processed,
+            'imported_rows' => $imported,
+            'error_count' => $this->errorCount,
+            'errors' => $this->errors,
+        ], $extra));
+    }
+}
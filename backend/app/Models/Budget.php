@@ -22,6 +22,8 @@ class Budget extends Model
     protected $casts = [
         'month' => 'date',
         'revenue_cents' => 'integer',
+        'spent_cents' => 'integer',
+        'expense_count' => 'integer',
     ];
 
     public function user(): BelongsTo
@@ -49,9 +51,12 @@ class Budget extends Model
         return $this->categories->sum('planned_amount_cents');
     }
 
+    /**
+     * Montant réel des dépenses, lu depuis l'agrégat maintenu par SpendRollupService
+     */
     public function getTotalActualCentsAttribute(): int
     {
-        return $this->expenses->sum('amount_cents');
+        return (int) $this->spent_cents;
     }
 
     public function getVarianceCentsAttribute(): int
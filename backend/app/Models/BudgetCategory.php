@@ -21,6 +21,8 @@ class BudgetCategory extends Model
     protected $casts = [
         'planned_amount_cents' => 'integer',
         'sort_order' => 'integer',
+        'spent_cents' => 'integer',
+        'expense_count' => 'integer',
     ];
 
     public function budget(): BelongsTo
@@ -34,14 +36,11 @@ class BudgetCategory extends Model
     }
 
     /**
-     * Calculer le montant réel des dépenses.
-     * ATTENTION: Nécessite que la relation 'subcategories.expenses' soit chargée pour éviter N+1
+     * Montant réel des dépenses, lu depuis l'agrégat maintenu par SpendRollupService
      */
     public function getActualAmountCentsAttribute(): int
     {
-        return $this->subcategories->sum(function ($subcat) {
-            return $subcat->expenses->sum('amount_cents');
-        });
+        return (int) $this->spent_cents;
     }
 
     public function getVarianceCentsAttribute(): int
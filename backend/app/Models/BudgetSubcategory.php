@@ -23,6 +23,8 @@ class BudgetSubcategory extends Model
         'planned_amount_cents' => 'integer',
         'default_spent_cents' => 'integer',
         'sort_order' => 'integer',
+        'spent_cents' => 'integer',
+        'expense_count' => 'integer',
     ];
 
     public function budgetCategory(): BelongsTo
@@ -35,9 +37,12 @@ class BudgetSubcategory extends Model
         return $this->hasMany(Expense::class);
     }
 
+    /**
+     * Montant réel des dépenses, lu depuis l'agrégat maintenu par SpendRollupService
+     */
     public function getActualAmountCentsAttribute(): int
     {
-        return $this->expenses->sum('amount_cents');
+        return (int) $this->spent_cents;
     }
 
     public function getVarianceCentsAttribute(): int
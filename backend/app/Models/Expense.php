@@ -2,6 +2,7 @@
 
 namespace App\Models;
 
+use Illuminate\Database\Eloquent\Builder;
 use Illuminate\Database\Eloquent\Factories\HasFactory;
 use Illuminate\Database\Eloquent\Model;
 use Illuminate\Database\Eloquent\Relations\BelongsTo;
@@ -11,6 +12,16 @@ class Expense extends Model
 {
     use HasFactory;
 
+    /**
+     * Index plein texte sur (label, notes)
+     */
+    public const SEARCH_INDEX = 'expenses_label_notes_fulltext';
+
+    /**
+     * Taille minimale d'un mot indexé (innodb_ft_min_token_size)
+     */
+    public const SEARCH_MIN_TOKEN_LENGTH = 3;
+
     protected $fillable = [
         'budget_id',
         'budget_subcategory_id',
@@ -40,4 +51,37 @@ class Expense extends Model
     {
         return $this->belongsToMany(Tag::class);
     }
+
+    /**
+     * Recherche dans le libellé et les notes.
+     * Utilise l'index plein texte (mots préfixés, tous requis) quand il est
+     * disponible ; sinon, ou si aucun mot n'est assez long pour être indexé,
+     * se replie sur un LIKE.
+     */
+    public function scopeSearch(Builder $query, string $term): Builder
+    {
+        $term = trim($term);
+
+        if ($term === '') {
+            return $query;
+        }
+
+        $words = collect(preg_split('/[^\p{L}\p{N}]+/u', $term, -1, PREG_SPLIT_NO_EMPTY))
+            ->filter(fn ($word) => mb_strlen($word) >= self::SEARCH_MIN_TOKEN_LENGTH);
+
+        if ($words->isNotEmpty() && in_array($query->getConnection()->getDriverName(), ['mysql', 'mariadb'], true)) {
+            return $query->whereFullText(
+                [$this->qualifyColumn('label'), $this->qualifyColumn('notes')],
+                $words->map(fn ($word) => '+' . $word . '*')->implode(' '),
+                ['mode' => 'boolean']
+            );
+        }
+
+        $like = '%' . str_replace(['\\', '%', '_'], ['\\\\', '\\%', '\\_'], $term) . '%';
+
+        return $query->where(function ($q) use ($like) {
+            $q->where($this->qualifyColumn('label'), 'like', $like)
+                ->orWhere($this->qualifyColumn('notes'), 'like', $like);
+        });
+    }
 }
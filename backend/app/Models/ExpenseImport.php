@@ -0,0 +1,53 @@
+<?php
+
+namespace App\Models;
+
+use Illuminate\Database\Eloquent\Model;
+use Illuminate\Database\Eloquent\Relations\BelongsTo;
+
+class ExpenseImport extends Model
+{
+    public const STATUS_PENDING = 'pending';
+    public const STATUS_PROCESSING = 'processing';
+    public const STATUS_COMPLETED = 'completed';
+    public const STATUS_FAILED = 'failed';
+
+    // Nombre maximum de messages d'erreur conservés (error_count reste exact)
+    public const MAX_REPORTED_ERRORS = 100;
+
+    protected $fillable = [
+        'user_id',
+        'budget_id',
+        'status',
+        'file_path',
+        'processed_rows',
+        'imported_rows',
+        'error_count',
+        'errors',
+        'started_at',
+        'finished_at',
+    ];
+
+    protected $casts = [
+        'processed_rows' => 'integer',
+        'imported_rows' => 'integer',
+        'error_count' => 'integer',
+        'errors' => 'array',
+        'started_at' => 'datetime',
+        'finished_at' => 'datetime',
+    ];
+
+    protected $hidden = [
+        'file_path',
+    ];
+
+    public function user(): BelongsTo
+    {
+        return $this->belongsTo(User::class);
+    }
+
+    public function budget(): BelongsTo
+    {
+        return $this->belongsTo(Budget::class);
+    }
+}
@@ -13,6 +13,7 @@ class Notification extends Model
     protected $fillable = [
         'user_id',
         'type',
+        'dedup_key',
         'title',
         'message',
         'data',
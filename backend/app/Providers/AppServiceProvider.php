@@ -2,8 +2,21 @@
 
 namespace App\Providers;
 
+use App\Http\Serialization\CamelCaseResponseFactory;
+use App\Models\Asset;
+use App\Models\Budget;
+use App\Models\BudgetCategory;
+use App\Models\BudgetSubcategory;
+use App\Models\Expense;
 use App\Models\NotificationSetting;
+use App\Models\Tag;
 use App\Models\User;
+use App\Models\WealthHistory;
+use App\Services\DashboardStatsService;
+use App\Services\QueryProfiler;
+use App\Services\SpendRollupService;
+use Illuminate\Contracts\Routing\ResponseFactory as ResponseFactoryContract;
+use Illuminate\Contracts\View\Factory as ViewFactoryContract;
 use Illuminate\Support\Facades\Schema;
 use Illuminate\Support\ServiceProvider;
 
@@ -14,7 +27,13 @@ class AppServiceProvider extends ServiceProvider
      */
     public function register(): void
     {
-        //
+        // response()->json() émet directement les clés en camelCase
+        $this->app->singleton(ResponseFactoryContract::class, function ($app) {
+            return new CamelCaseResponseFactory($app[ViewFactoryContract::class], $app['redirect']);
+        });
+
+        // Une seule instance : l'écouteur de requêtes SQL n'est enregistré qu'une fois
+        $this->app->singleton(QueryProfiler::class);
     }
 
     /**
@@ -33,5 +52,34 @@ class AppServiceProvider extends ServiceProvider
                 'savings_goal_enabled' => true,
             ]);
         });
+
+        // Maintenir les agrégats de dépenses des budgets, catégories et sous-catégories
+        Expense::created(fn (Expense $expense) => app(SpendRollupService::class)->recordCreated($expense));
+        Expense::updated(fn (Expense $expense) => app(SpendRollupService::class)->recordUpdated($expense));
+        Expense::deleted(fn (Expense $expense) => app(SpendRollupService::class)->recordDeleted($expense));
+        BudgetSubcategory::deleting(fn (BudgetSubcategory $subcategory) => app(SpendRollupService::class)->forgetSubcategory($subcategory));
+        BudgetCategory::deleting(fn (BudgetCategory $category) => app(SpendRollupService::class)->forgetCategory($category));
+
+        // Invalider le cache des statistiques du tableau de bord
+        $this->invalidateDashboardStatsOnChange();
+    }
+
+    /**
+     * Incrémenter la version des statistiques du tableau de bord de l'utilisateur
+     * concerné à chaque écriture sur une donnée qui les alimente
+     */
+    private function invalidateDashboardStatsOnChange(): void
+    {
+        $dashboardStats = fn () => app(DashboardStatsService::class);
+
+        foreach (['saved', 'deleted'] as $event) {
+            Expense::$event(fn (Expense $expense) => $dashboardStats()->bumpVersionForBudget($expense->budget_id));
+            BudgetCategory::$event(fn (BudgetCategory $category) => $dashboardStats()->bumpVersionForBudget($category->budget_id));
+            BudgetSubcategory::$event(fn (BudgetSubcategory $subcategory) => $dashboardStats()->bumpVersionForCategory($subcategory->budget_category_id));
+            Budget::$event(fn (Budget $budget) => $dashboardStats()->bumpVersion($budget->user_id));
+            Asset::$event(fn (Asset $asset) => $dashboardStats()->bumpVersion($asset->user_id));
+            WealthHistory::$event(fn (WealthHistory $history) => $dashboardStats()->bumpVersion($history->user_id));
+            Tag::$event(fn (Tag $tag) => $dashboardStats()->bumpVersion($tag->user_id));
+        }
     }
 }
@@ -6,6 +6,7 @@ use App\Contracts\ExpenseRepositoryInterface;
 use App\Models\Budget;
 use App\Models\Expense;
 use Illuminate\Database\Eloquent\Collection;
+use Illuminate\Support\Facades\DB;
 
 class ExpenseRepository implements ExpenseRepositoryInterface
 {
@@ -26,23 +27,30 @@ class ExpenseRepository implements ExpenseRepositoryInterface
 
     /**
      * Create an expense
+     *
+     * Runs in a transaction so the spend rollups updated by the model events
+     * are committed together with the expense row.
      */
     public function create(array $data): Expense
     {
-        $expense = Expense::create([
-            'budget_id' => $data['budget_id'],
-            'budget_subcategory_id' => $data['budget_subcategory_id'],
-            'date' => $data['date'],
-            'label' => $data['label'],
-            'amount_cents' => $data['amount_cents'],
-            'payment_method' => $data['payment_method'] ?? null,
-            'notes' => $data['notes'] ?? null,
-        ]);
-
-        // Attach tags if provided
-        if (isset($data['tag_ids']) && is_array($data['tag_ids'])) {
-            $expense->tags()->attach($data['tag_ids']);
-        }
+        $expense = DB::transaction(function () use ($data) {
+            $expense = Expense::create([
+                'budget_id' => $data['budget_id'],
+                'budget_subcategory_id' => $data['budget_subcategory_id'],
+                'date' => $data['date'],
+                'label' => $data['label'],
+                'amount_cents' => $data['amount_cents'],
+                'payment_method' => $data['payment_method'] ?? null,
+                'notes' => $data['notes'] ?? null,
+            ]);
+
+            // Attach tags if provided
+            if (isset($data['tag_ids']) && is_array($data['tag_ids'])) {
+                $expense->tags()->attach($data['tag_ids']);
+            }
+
+            return $expense;
+        });
 
         return $expense->load(['budgetSubcategory', 'tags']);
     }
@@ -52,21 +60,23 @@ class ExpenseRepository implements ExpenseRepositoryInterface
      */
     public function update(Expense $expense, array $data): Expense
     {
-        $expense->fill([
-            'budget_subcategory_id' => $data['budget_subcategory_id'] ?? $expense->budget_subcategory_id,
-            'date' => $data['date'] ?? $expense->date,
-            'label' => $data['label'] ?? $expense->label,
-            'amount_cents' => $data['amount_cents'] ?? $expense->amount_cents,
-            'payment_method' => $data['payment_method'] ?? $expense->payment_method,
-            'notes' => $data['notes'] ?? $expense->notes,
-        ]);
-
-        $expense->save();
-
-        // Sync tags if provided
-        if (isset($data['tag_ids'])) {
-            $expense->tags()->sync($data['tag_ids']);
-        }
+        DB::transaction(function () use ($expense, $data) {
+            $expense->fill([
+                'budget_subcategory_id' => $data['budget_subcategory_id'] ?? $expense->budget_subcategory_id,
+                'date' => $data['date'] ?? $expense->date,
+                'label' => $data['label'] ?? $expense->label,
+                'amount_cents' => $data['amount_cents'] ?? $expense->amount_cents,
+                'payment_method' => $data['payment_method'] ?? $expense->payment_method,
+                'notes' => $data['notes'] ?? $expense->notes,
+            ]);
+
+            $expense->save();
+
+            // Sync tags if provided
+            if (isset($data['tag_ids'])) {
+                $expense->tags()->sync($data['tag_ids']);
+            }
+        });
 
         return $expense->refresh()->load(['budgetSubcategory', 'tags']);
     }
@@ -76,7 +86,7 @@ class ExpenseRepository implements ExpenseRepositoryInterface
      */
     public function delete(Expense $expense): bool
     {
-        return $expense->delete();
+        return DB::transaction(fn () => $expense->delete());
     }
 
     /**
@@ -2,12 +2,20 @@
 
 namespace App\Services;
 
-use App\Models\Budget;
 use App\Models\User;
 use Carbon\Carbon;
 
 class BudgetComparisonService
 {
+    public const MAX_MONTHS = 24;
+
+    protected TimeSeriesAnalyticsService $analytics;
+
+    public function __construct(TimeSeriesAnalyticsService $analytics)
+    {
+        $this->analytics = $analytics;
+    }
+
     /**
      * Compare multiple budgets across different months
      *
@@ -30,7 +38,9 @@ class BudgetComparisonService
     }
 
     /**
-     * Load budgets for given months with calculated stats
+     * Load budgets for given months with calculated stats.
+     * Two queries whatever the number of months: the budgets, then the
+     * per-category totals grouped in SQL from the stored spend rollups.
      *
      * @param User $user
      * @param array $months
@@ -39,49 +49,48 @@ class BudgetComparisonService
      */
     private function loadBudgetsWithStats(User $user, array $months): array
     {
-        $budgets = [];
-
-        foreach ($months as $month) {
-            $monthDate = Carbon::parse($month . '-01');
-            $budget = $user->budgets()
-                ->where('month', $monthDate)
-                ->with(['categories.subcategories.expenses'])
-                ->first();
-
-            if ($budget) {
-                $budget->stats = $this->calculateBudgetStats($budget);
-                $budgets[] = $budget;
-            }
-        }
+        $months = collect($months)->unique()->sort()->values()->all();
+
+        $budgets = $user->budgets()
+            ->whereIn('month', array_map(fn ($month) => Carbon::parse($month . '-01')->toDateString(), $months))
+            ->orderBy('month')
+            ->get();
+
+        $categoriesByBudget = $this->analytics->categoryBreakdown($user, $months)->groupBy('budget_id');
 
-        return $budgets;
+        return $budgets->map(function ($budget) use ($categoriesByBudget) {
+            $budget->stats = $this->calculateBudgetStats($categoriesByBudget->get($budget->id, collect())->all());
+
+            return $budget;
+        })->all();
     }
 
     /**
-     * Calculate statistics for a single budget
+     * Calculate statistics for a single budget from its category totals
      *
-     * @param Budget $budget
+     * @param array $categories Rows (name, planned_cents, actual_cents)
      *
      * @return array
      */
-    private function calculateBudgetStats(Budget $budget): array
+    private function calculateBudgetStats(array $categories): array
     {
         $totalPlanned = 0;
         $totalActual = 0;
         $byCategory = [];
 
-        foreach ($budget->categories as $category) {
-            $categoryStats = $this->calculateCategoryStats($category);
+        foreach ($categories as $category) {
+            $plannedCents = (int) $category->planned_cents;
+            $actualCents = (int) $category->actual_cents;
 
-            $totalPlanned += $categoryStats['planned_cents'];
-            $totalActual += $categoryStats['actual_cents'];
+            $totalPlanned += $plannedCents;
+            $totalActual += $actualCents;
 
             $byCategory[] = [
                 'name' => $category->name,
-                'planned_cents' => $categoryStats['planned_cents'],
-                'actual_cents' => $categoryStats['actual_cents'],
-                'variance_cents' => $categoryStats['variance_cents'],
-                'variance_percent' => $categoryStats['variance_percent'],
+                'planned_cents' => $plannedCents,
+                'actual_cents' => $actualCents,
+                'variance_cents' => $actualCents - $plannedCents,
+                'variance_percent' => $this->calculateVariancePercent($actualCents, $plannedCents),
             ];
         }
 
@@ -94,31 +103,6 @@ class BudgetComparisonService
         ];
     }
 
-    /**
-     * Calculate statistics for a single category
-     *
-     * @param \App\Models\BudgetCategory $category
-     *
-     * @return array
-     */
-    private function calculateCategoryStats($category): array
-    {
-        $categoryPlanned = $category->planned_amount_cents;
-        $categoryActual = 0;
-
-        foreach ($category->subcategories as $subcategory) {
-            $categoryActual += $subcategory->expenses->sum('amount_cents');
-        }
-
-        return [
-            'name' => $category->name,
-            'planned_cents' => $categoryPlanned,
-            'actual_cents' => $categoryActual,
-            'variance_cents' => $categoryActual - $categoryPlanned,
-            'variance_percent' => $this->calculateVariancePercent($categoryActual, $categoryPlanned),
-        ];
-    }
-
     /**
      * Calculate variance percentage
      *
@@ -0,0 +1,242 @@
+<?php
+
+namespace App\Services;
+
+use App\Models\Budget;
+use App\Models\BudgetTemplate;
+use App\Models\SavingsPlan;
+use App\Models\User;
+use Carbon\Carbon;
+use Illuminate\Database\UniqueConstraintViolationException;
+use Illuminate\Support\Collection;
+use Illuminate\Support\Facades\DB;
+use Illuminate\Support\Facades\Log;
+
+/**
+ * Génère les budgets mensuels à partir d'un template : une transaction par
+ * mois, une insertion multi-lignes par niveau (catégories, sous-catégories,
+ * dépenses) et un index (catégorie, sous-catégorie) calculé en mémoire pour
+ * rattacher les dépenses récurrentes sans recharger le budget.
+ */
+class BudgetGenerationService
+{
+    public const INSERT_CHUNK_SIZE = 500;
+
+    protected RecurringExpenseService $recurringExpenseService;
+
+    protected SpendRollupService $rollupService;
+
+    protected DashboardStatsService $dashboardStats;
+
+    protected NotificationService $notificationService;
+
+    public function __construct(
+        RecurringExpenseService $recurringExpenseService,
+        SpendRollupService $rollupService,
+        DashboardStatsService $dashboardStats,
+        NotificationService $notificationService
+    ) {
+        $this->recurringExpenseService = $recurringExpenseService;
+        $this->rollupService = $rollupService;
+        $this->dashboardStats = $dashboardStats;
+        $this->notificationService = $notificationService;
+    }
+
+    /**
+     * Générer les budgets de plusieurs mois consécutifs.
+     * Les mois qui ont déjà un budget sont ignorés, ce qui rend l'appel idempotent.
+     *
+     * @param User $user
+     * @param BudgetTemplate $template
+     * @param Carbon $from Premier mois à générer
+     * @param int $count Nombre de mois consécutifs
+     * @param Collection|null $recurringExpenses Dépenses récurrentes actives de l'utilisateur (chargées si null)
+     *
+     * @return Collection<int, Budget> Budgets créés
+     */
+    public function generateMonths(
+        User $user,
+        BudgetTemplate $template,
+        Carbon $from,
+        int $count = 1,
+        ?Collection $recurringExpenses = null
+    ): Collection {
+        $months = collect(range(0, max(1, $count) - 1))
+            ->map(fn ($offset) => $from->copy()->startOfMonth()->addMonthsNoOverflow($offset));
+
+        $existing = $user->budgets()
+            ->whereIn('month', $months->map(fn ($month) => $month->toDateString())->all())
+            ->pluck('month')
+            ->map(fn ($month) => $month->format('Y-m'))
+            ->all();
+
+        $months = $months->reject(fn ($month) => in_array($month->format('Y-m'), $existing, true));
+
+        if ($months->isEmpty()) {
+            return collect();
+        }
+
+        $template->loadMissing('categories.subcategories');
+        $recurringExpenses ??= $this->recurringExpenseService
+            ->activeForUsers([$user->id])
+            ->get($user->id, collect());
+        $revenueCents = $this->revenueFor($user, $template);
+
+        $budgets = collect();
+
+        foreach ($months as $month) {
+            try {
+                $budgets->push($this->generateMonth($user, $template, $month, $revenueCents, $recurringExpenses));
+            } catch (UniqueConstraintViolationException) {
+                // Budget créé entre-temps par une autre requête ou un autre worker
+                continue;
+            }
+        }
+
+        if ($budgets->isNotEmpty()) {
+            // Les insertions groupées ne déclenchent pas les événements des modèles
+            $this->dashboardStats->bumpVersion($user->id);
+
+            // Dépenses par défaut et récurrentes : une évaluation des alertes par budget
+            foreach ($budgets as $budget) {
+                $this->notificationService->scheduleBudgetAlertCheck($budget->id);
+            }
+        }
+
+        return $budgets;
+    }
+
+    /**
+     * Générer le budget d'un mois dans une seule transaction
+     */
+    private function generateMonth(
+        User $user,
+        BudgetTemplate $template,
+        Carbon $month,
+        ?int $revenueCents,
+        Collection $recurringExpenses
+    ): Budget {
+        return DB::transaction(function () use ($user, $template, $month, $revenueCents, $recurringExpenses) {
+            $now = now();
+
+            $budget = $user->budgets()->create([
+                'month' => $month,
+                'name' => 'Budget ' . $month->isoFormat('MMMM YYYY'),
+                'generated_from_template_id' => $template->id,
+                'revenue_cents' => $revenueCents,
+            ]);
+
+            // Catégories : une insertion, puis lecture des IDs dans l'ordre d'insertion
+            DB::table('budget_categories')->insert($template->categories->map(fn ($templateCat) => [
+                'budget_id' => $budget->id,
+                'name' => $templateCat->name,
+                'planned_amount_cents' => $templateCat->planned_amount_cents,
+                'sort_order' => $templateCat->sort_order,
+                'created_at' => $now,
+                'updated_at' => $now,
+            ])->all());
+
+            $categoryIds = DB::table('budget_categories')
+                ->where('budget_id', $budget->id)
+                ->orderBy('id')
+                ->pluck('id')
+                ->all();
+
+            // Sous-catégories de toutes les catégories en une insertion
+            $subcategoryRows = [];
+            $templateSubcats = [];
+
+            foreach ($template->categories->values() as $position => $templateCat) {
+                foreach ($templateCat->subcategories as $templateSubcat) {
+                    $subcategoryRows[] = [
+                        'budget_category_id' => $categoryIds[$position],
+                        'name' => $templateSubcat->name,
+                        'planned_amount_cents' => $templateSubcat->planned_amount_cents,
+                        'sort_order' => $templateSubcat->sort_order,
+                        'default_spent_cents' => $templateSubcat->default_spent_cents ?? 0,
+                        'created_at' => $now,
+                        'updated_at' => $now,
+                    ];
+                    $templateSubcats[] = [$templateCat->name, $templateSubcat];
+                }
+            }
+
+            foreach (array_chunk($subcategoryRows, self::INSERT_CHUNK_SIZE) as $chunk) {
+                DB::table('budget_subcategories')->insert($chunk);
+            }
+
+            $subcategoryIds = empty($categoryIds) ? [] : DB::table('budget_subcategories')
+                ->whereIn('budget_category_id', $categoryIds)
+                ->orderBy('id')
+                ->pluck('id')
+                ->all();
+
+            // Dépenses par défaut et index (catégorie, sous-catégorie) => ID
+            $expenseRows = [];
+            $index = RecurringExpenseService::emptyIndex();
+
+            foreach ($templateSubcats as $position => [$categoryName, $templateSubcat]) {
+                $subcategoryId = $subcategoryIds[$position];
+                RecurringExpenseService::addToIndex($index, $categoryName, $templateSubcat->name, $subcategoryId);
+
+                if (($templateSubcat->default_spent_cents ?? 0) > 0) {
+                    $expenseRows[] = [
+                        'budget_id' => $budget->id,
+                        'budget_subcategory_id' => $subcategoryId,
+                        'date' => $month->toDateString(),
+                        'label' => $templateSubcat->name,
+                        'amount_cents' => $templateSubcat->default_spent_cents,
+                        'payment_method' => null,
+                        'notes' => null,
+                        'created_at' => $now,
+                        'updated_at' => $now,
+                    ];
+                }
+            }
+
+            $recurringRows = $this->recurringExpenseService
+                ->expenseRowsForMonth($recurringExpenses, $budget->id, $month, $index);
+
+            foreach (array_chunk(array_merge($expenseRows, $recurringRows), self::INSERT_CHUNK_SIZE) as $chunk) {
+                DB::table('expenses')->insert($chunk);
+            }
+
+            $this->rollupService->rebuild($budget->id);
+
+            // Épargne prévue du mois : sous-catégories de la catégorie "Épargne"
+            $savingsCategory = $template->categories->firstWhere('name', 'Épargne');
+
+            SavingsPlan::updateOrCreate(
+                [
+                    'user_id' => $user->id,
+                    'month' => $month,
+                ],
+                [
+                    'planned_cents' => $savingsCategory ? $savingsCategory->subcategories->sum('planned_amount_cents') : 0,
+                ]
+            );
+
+            Log::info('Budget generated with recurring expenses', [
+                'budget_id' => $budget->id,
+                'recurring_expenses_created' => count($recurringRows),
+            ]);
+
+            return $budget;
+        });
+    }
+
+    /**
+     * Revenu du template, sinon celui du dernier budget renseigné
+     */
+    private function revenueFor(User $user, BudgetTemplate $template): ?int
+    {
+        if ($template->revenue_cents) {
+            return $template->revenue_cents;
+        }
+
+        return $user->budgets()
+            ->whereNotNull('revenue_cents')
+            ->orderBy('month', 'desc')
+            ->value('revenue_cents');
+    }
+}
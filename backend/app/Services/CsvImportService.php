@@ -3,11 +3,9 @@
 namespace App\Services;
 
 use Illuminate\Http\UploadedFile;
-use Illuminate\Support\Facades\Log;
 
 class CsvImportService
 {
-    public const MAX_ROWS = 1000;
     public const MAX_FILE_SIZE_KB = 2048;
     public const EXPECTED_HEADERS = ['date', 'label', 'amount_cents', 'subcategory', 'payment_method', 'notes'];
 
@@ -36,73 +34,90 @@ class CsvImportService
     }
 
     /**
-     * Parser et valider le contenu CSV
-     *
-     * @return array ['data' => [...], 'errors' => [...]]
+     * Vérifier uniquement l'en-tête, pour rejeter un fichier invalide dès l'envoi
      */
-    public function parse(UploadedFile $file): array
+    public function validateHeaderOf(string $path): void
     {
-        $handle = fopen($file->getRealPath(), 'r');
+        $handle = fopen($path, 'r');
         if (!$handle) {
             throw new \Exception("Impossible d'ouvrir le fichier CSV");
         }
 
         $header = fgetcsv($handle);
+        fclose($handle);
+
         if ($header === false) {
-            fclose($handle);
             throw new \Exception('Le fichier CSV est vide');
         }
 
-        // Valider l'en-tête
         $this->validateHeader($header);
+    }
 
-        $data = [];
-        $errors = [];
-        $rowNumber = 1; // Ligne 1 est l'en-tête
-
-        while (($row = fgetcsv($handle)) !== false) {
-            $rowNumber++;
-
-            // Limite de lignes
-            if ($rowNumber > self::MAX_ROWS + 1) {
-                $errors[] = 'Limite de ' . self::MAX_ROWS . ' lignes atteinte. Les lignes suivantes ont été ignorées.';
-                break;
-            }
+    /**
+     * Lire le fichier CSV ligne par ligne sans le charger en mémoire
+     *
+     * Chaque élément produit est soit ['row' => n, 'data' => [...]] pour une
+     * ligne valide, soit ['row' => n, 'error' => '...'] pour une ligne rejetée.
+     *
+     * @return \Generator<int, array>
+     */
+    public function rows(string $path): \Generator
+    {
+        $handle = fopen($path, 'r');
+        if (!$handle) {
+            throw new \Exception("Impossible d'ouvrir le fichier CSV");
+        }
 
-            // Vérifier que le nombre de colonnes correspond
-            if (count($row) !== count($header)) {
-                $errors[] = "Ligne {$rowNumber}: Nombre de colonnes incorrect (attendu: " . count($header) . ', trouvé: ' . count($row) . ')';
-                continue;
+        try {
+            $header = fgetcsv($handle);
+            if ($header === false) {
+                throw new \Exception('Le fichier CSV est vide');
             }
 
-            try {
-                $rowData = array_combine($header, $row);
-                $validated = $this->validateRow($rowData, $rowNumber);
-                $data[] = $validated;
-            } catch (\Exception $e) {
-                $errors[] = "Ligne {$rowNumber}: " . $e->getMessage();
-                Log::warning("CSV import error on line {$rowNumber}", [
-                    'error' => $e->getMessage(),
-                    'row' => $row,
-                ]);
+            // Valider l'en-tête
+            $header = $this->validateHeader($header);
+
+            $rowNumber = 1; // Ligne 1 est l'en-tête
+
+            while (($row = fgetcsv($handle)) !== false) {
+                $rowNumber++;
+
+                // Ignorer les lignes vides
+                if ($row === [null]) {
+                    continue;
+                }
+
+                // Vérifier que le nombre de colonnes correspond
+                if (count($row) !== count($header)) {
+                    yield [
+                        'row' => $rowNumber,
+                        'error' => 'Nombre de colonnes incorrect (attendu: ' . count($header) . ', trouvé: ' . count($row) . ')',
+                    ];
+                    continue;
+                }
+
+                try {
+                    yield [
+                        'row' => $rowNumber,
+                        'data' => $this->validateRow(array_combine($header, $row), $rowNumber),
+                    ];
+                } catch (\Exception $e) {
+                    yield ['row' => $rowNumber, 'error' => $e->getMessage()];
+                }
             }
+        } finally {
+            fclose($handle);
         }
-
-        fclose($handle);
-
-        return [
-            'data' => $data,
-            'errors' => $errors,
-        ];
     }
 
     /**
-     * Valider l'en-tête du CSV
+     * Valider l'en-tête du CSV et le retourner normalisé
      */
-    private function validateHeader(array $header): void
+    private function validateHeader(array $header): array
     {
-        // Normaliser les en-têtes (trim et minuscules)
-        $normalized = array_map(fn ($h) => strtolower(trim($h)), $header);
+        // Normaliser les en-têtes (BOM UTF-8, trim et minuscules)
+        $header[0] = preg_replace('/^\xEF\xBB\xBF/', '', (string) $header[0]);
+        $normalized = array_map(fn ($h) => strtolower(trim((string) $h)), $header);
 
         // Vérifier que les colonnes obligatoires sont présentes
         $required = ['date', 'label', 'amount_cents', 'subcategory'];
@@ -114,6 +129,8 @@ class CsvImportService
                 '. En-tête attendu : ' . implode(', ', self::EXPECTED_HEADERS)
             );
         }
+
+        return $normalized;
     }
 
     /**
@@ -0,0 +1,166 @@
+<?php
+
+namespace App\Services;
+
+use App\Models\Budget;
+use App\Models\BudgetCategory;
+use App\Models\User;
+use Illuminate\Support\Facades\Cache;
+use Illuminate\Support\Facades\DB;
+
+/**
+ * Construit en une seule passe les données de tous les widgets du tableau
+ * de bord et les met en cache par utilisateur et par budget.
+ *
+ * Les clés de cache incluent un numéro de version par utilisateur, incrémenté
+ * à chaque modification d'une dépense, catégorie, budget, tag, actif ou
+ * historique de patrimoine : les anciennes entrées deviennent inaccessibles
+ * et expirent. Cette version sert aussi à calculer les ETag des statistiques.
+ * Les clés et les ETag incluent aussi le mois courant : les widgets sur les
+ * derniers mois sont recalculés au changement de mois, même sans écriture.
+ */
+class DashboardStatsService
+{
+    public const CACHE_TTL_SECONDS = 3600;
+
+    protected StatsService $statsService;
+
+    public function __construct(StatsService $statsService)
+    {
+        $this->statsService = $statsService;
+    }
+
+    /**
+     * Version courante des statistiques d'un utilisateur
+     */
+    public function version(int $userId): int
+    {
+        return (int) Cache::rememberForever($this->versionKey($userId), fn () => 1);
+    }
+
+    /**
+     * Invalider les statistiques en cache d'un utilisateur.
+     * Dans une transaction, la version n'est incrémentée qu'après le commit :
+     * une lecture concurrente ne peut pas mettre en cache, sous la nouvelle
+     * version, des statistiques calculées avant le commit.
+     */
+    public function bumpVersion(int $userId): void
+    {
+        DB::afterCommit(function () use ($userId) {
+            Cache::add($this->versionKey($userId), 1);
+            Cache::increment($this->versionKey($userId));
+        });
+    }
+
+    /**
+     * Invalider les statistiques du propriétaire d'un budget
+     */
+    public function bumpVersionForBudget(?int $budgetId): void
+    {
+        $userId = $budgetId ? Budget::whereKey($budgetId)->value('user_id') : null;
+
+        if ($userId) {
+            $this->bumpVersion($userId);
+        }
+    }
+
+    /**
+     * Invalider les statistiques du propriétaire d'une catégorie
+     */
+    public function bumpVersionForCategory(?int $categoryId): void
+    {
+        $this->bumpVersionForBudget(
+            $categoryId ? BudgetCategory::whereKey($categoryId)->value('budget_id') : null
+        );
+    }
+
+    /**
+     * ETag d'une requête de statistiques, calculé sans accès à la base de données.
+     * Signé avec la clé de l'application pour ne pas être prédictible.
+     */
+    public function etag(int $userId, string $path, array $query = []): string
+    {
+        ksort($query);
+
+        return hash_hmac(
+            'sha256',
+            $userId . '|' . $this->version($userId) . '|' . $this->period() . '|' . $path . '|' . json_encode($query),
+            (string) config('app.key')
+        );
+    }
+
+    /**
+     * Données de tous les widgets, depuis le cache ou calculées en une passe
+     *
+     * @param User $user
+     * @param array $params ['budget_id', 'top_limit', 'savings_months', 'wealth_from', 'wealth_to']
+     *
+     * @return array
+     */
+    public function get(User $user, array $params): array
+    {
+        return Cache::remember(
+            $this->cacheKey($user->id, $params),
+            self::CACHE_TTL_SECONDS,
+            fn () => $this->build($user, $params)
+        );
+    }
+
+    /**
+     * Calculer les données des widgets à partir d'un seul chargement du budget
+     */
+    private function build(User $user, array $params): array
+    {
+        $budget = ! empty($params['budget_id'])
+            ? $user->budgets()->with('categories')->findOrFail($params['budget_id'])
+            : null;
+
+        return [
+            'budgetId' => $budget?->id,
+            'summary' => $budget ? $this->statsService->summary($budget) : null,
+            'byCategory' => $budget ? $this->statsService->byCategory($budget) : [],
+            'topCategories' => $budget
+                ? $this->statsService->topCategories($budget, $params['top_limit'] ?? 5)
+                : [],
+            'expenseDistribution' => $budget ? $this->statsService->expenseDistribution($budget) : [],
+            'savingsRate' => $this->statsService->savingsRateEvolution(
+                $user,
+                null,
+                null,
+                $params['savings_months'] ?? 12
+            ),
+            'wealthEvolution' => $this->statsService->wealthEvolution(
+                $user,
+                $params['wealth_from'] ?? null,
+                $params['wealth_to'] ?? null
+            ),
+        ];
+    }
+
+    /**
+     * Mois courant, dont dépendent les widgets sur les derniers mois
+     */
+    private function period(): string
+    {
+        return now()->format('Y-m');
+    }
+
+    private function versionKey(int $userId): string
+    {
+        return "dashboard-stats-version:{$userId}";
+    }
+
+    private function cacheKey(int $userId, array $params): string
+    {
+        ksort($params);
+
+        return sprintf(
+            'dashboard-stats:%d:%s:v%d:%s:%s',
+            $userId,
+            $params['budget_id'] ?? 'none',
+            $this->version($userId),
+            $this->period(),
+            md5(json_encode($params))
+        );
+    }
+}
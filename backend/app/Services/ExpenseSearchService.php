@@ -0,0 +1,148 @@
+<?php
+
+namespace App\Services;
+
+use App\Models\Expense;
+use App\Models\User;
+use Illuminate\Contracts\Pagination\CursorPaginator;
+use Illuminate\Database\Eloquent\Builder;
+use Illuminate\Database\MySqlConnection;
+use Illuminate\Pagination\AbstractCursorPaginator;
+use Illuminate\Support\Facades\DB;
+
+/**
+ * Recherche des dépenses d'un utilisateur sur l'ensemble de ses budgets.
+ *
+ * Le texte est cherché via l'index plein texte (label, notes) et les
+ * résultats sont paginés par curseur sur (date, id), sans OFFSET ni COUNT(*).
+ * Sans texte, chaque budget de l'utilisateur fournit au plus une page lue
+ * dans l'index (budget_id, date, id) à partir du curseur (jointure LATERAL) :
+ * le tri ne porte que sur ces lignes, quelle que soit la taille de l'historique.
+ * Les serveurs sans LATERAL (MySQL < 8.0.14, MariaDB) utilisent la jointure simple.
+ */
+class ExpenseSearchService
+{
+    public const DEFAULT_PER_PAGE = 50;
+
+    public const MAX_PER_PAGE = 100;
+
+    /**
+     * Rechercher les dépenses d'un utilisateur
+     *
+     * @param User $user
+     * @param array $filters q, budget_id, from, to, min_amount_cents, max_amount_cents, tag_id, payment_method
+     * @param int $perPage
+     *
+     * @return CursorPaginator
+     */
+    public function search(User $user, array $filters, int $perPage = self::DEFAULT_PER_PAGE): CursorPaginator
+    {
+        $perPage = min(max(1, $perPage), self::MAX_PER_PAGE);
+
+        if (empty($filters['q']) && $this->supportsLateralJoins()) {
+            // Pour chaque budget de l'utilisateur, au plus une page lue dans l'index
+            // (budget_id, date, id) à partir du curseur ; seules ces lignes sont triées
+            $query = Expense::query()
+                ->from('budgets')
+                ->joinLateral($this->pageOfBudget($filters, $perPage), 'expenses');
+        } else {
+            // Recherche texte : l'index plein texte sélectionne les lignes à trier
+            $query = Expense::query()
+                ->join('budgets', 'budgets.id', '=', 'expenses.budget_id')
+                ->when(! empty($filters['q']), fn ($query) => $query->search($filters['q']));
+
+            $this->applyFilters($query, $filters);
+        }
+
+        $query->where('budgets.user_id', $user->id);
+
+        if (! empty($filters['budget_id'])) {
+            $query->where('budgets.id', $filters['budget_id']);
+        }
+
+        return $query
+            ->with(['budget:id,month,name', 'budgetSubcategory.budgetCategory', 'tags'])
+            ->orderByDesc('expenses.date')
+            ->orderByDesc('expenses.id')
+            ->cursorPaginate($perPage, ['expenses.*']);
+    }
+
+    /**
+     * Page de dépenses d'un budget (corrélée à budgets.id) après le curseur courant,
+     * dans l'ordre de l'index (budget_id, date, id)
+     */
+    protected function pageOfBudget(array $filters, int $perPage): Builder
+    {
+        $query = Expense::query()
+            ->select('expenses.*')
+            ->whereColumn('expenses.budget_id', 'budgets.id');
+
+        $this->applyFilters($query, $filters);
+
+        $cursor = AbstractCursorPaginator::resolveCurrentCursor();
+        $direction = $cursor?->pointsToPreviousItems() ? 'asc' : 'desc';
+
+        if ($cursor) {
+            $operator = $direction === 'desc' ? '<' : '>';
+            $date = $cursor->parameter('expenses.date');
+            $id = $cursor->parameter('expenses.id');
+
+            $query->where(function ($q) use ($operator, $date, $id) {
+                $q->where('expenses.date', $operator, $date)
+                    ->orWhere(function ($q) use ($operator, $date, $id) {
+                        $q->where('expenses.date', $date)->where('expenses.id', $operator, $id);
+                    });
+            });
+        }
+
+        return $query
+            ->orderBy('expenses.date', $direction)
+            ->orderBy('expenses.id', $direction)
+            ->limit($perPage + 1);
+    }
+
+    /**
+     * Filtres portant sur les colonnes des dépenses
+     */
+    protected function applyFilters(Builder $query, array $filters): void
+    {
+        if (! empty($filters['from'])) {
+            $query->where('expenses.date', '>=', $filters['from']);
+        }
+        if (! empty($filters['to'])) {
+            $query->where('expenses.date', '<=', $filters['to']);
+        }
+
+        if (isset($filters['min_amount_cents'])) {
+            $query->where('expenses.amount_cents', '>=', (int) $filters['min_amount_cents']);
+        }
+        if (isset($filters['max_amount_cents'])) {
+            $query->where('expenses.amount_cents', '<=', (int) $filters['max_amount_cents']);
+        }
+
+        if (! empty($filters['payment_method'])) {
+            $query->where('expenses.payment_method', $filters['payment_method']);
+        }
+
+        if (! empty($filters['tag_id'])) {
+            $query->whereExists(function ($subquery) use ($filters) {
+                $subquery->select(DB::raw(1))
+                    ->from('expense_tag')
+                    ->whereColumn('expense_tag.expense_id', 'expenses.id')
+                    ->where('expense_tag.tag_id', $filters['tag_id']);
+            });
+        }
+    }
+
+    /**
+     * Jointures LATERAL disponibles (MySQL 8.0.14+, pas MariaDB)
+     */
+    protected function supportsLateralJoins(): bool
+    {
+        $connection = DB::connection();
+
+        return $connection instanceof MySqlConnection
+            && ! $connection->isMaria()
+            && version_compare($connection->getServerVersion(), '8.0.14', '>=');
+    }
+}
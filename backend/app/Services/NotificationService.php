@@ -2,23 +2,48 @@
 
 namespace App\Services;
 
-use App\Models\Expense;
+use App\Jobs\EvaluateBudgetAlerts;
+use App\Models\Budget;
 use App\Models\Notification;
 use App\Models\User;
+use Illuminate\Support\Facades\Cache;
+use Illuminate\Support\Facades\DB;
 use Illuminate\Support\Facades\Log;
 
 class NotificationService
 {
     /**
-     * Check if budget exceeded after expense creation/update
+     * Queue a debounced budget alert evaluation.
+     * Writes on the same (budget, subcategory) within the debounce delay are
+     * coalesced into a single evaluation; without subcategory, the whole budget
+     * is evaluated (bulk paths).
      */
-    public function checkBudgetExceeded(Expense $expense): void
+    public function scheduleBudgetAlertCheck(int $budgetId, ?int $subcategoryId = null): void
     {
-        // Load necessary relationships
-        $expense->load('budget.user', 'budgetSubcategory.budgetCategory');
+        EvaluateBudgetAlerts::dispatch($budgetId, $subcategoryId)
+            ->delay(now()->addSeconds(EvaluateBudgetAlerts::DEBOUNCE_SECONDS))
+            ->afterCommit();
+    }
+
+    /**
+     * Evaluate budget exceeded alerts for a budget, set-based:
+     * one query for the subcategories over the threshold (from the spend rollups),
+     * one indexed lookup for their unread alerts, one bulk insert for the new ones.
+     *
+     * @param int $budgetId
+     * @param array|null $subcategoryIds Limit to these subcategories (null = whole budget)
+     *
+     * @return int Number of notifications created
+     */
+    public function checkBudgetAlerts(int $budgetId, ?array $subcategoryIds = null): int
+    {
+        $budget = Budget::with('user.notificationSettings')->find($budgetId);
 
-        $user = $expense->budget->user;
-        $subcategory = $expense->budgetSubcategory;
+        if (! $budget) {
+            return 0;
+        }
+
+        $user = $budget->user;
 
         // Get user's notification settings
         $settings = $user->notificationSettings;
@@ -34,84 +59,111 @@ class NotificationService
 
         // Check if budget exceeded alerts are enabled
         if (!$settings->budget_exceeded_enabled) {
-            return;
-        }
-
-        // Calculate actual vs planned
-        $plannedCents = $subcategory->planned_amount_cents;
-
-        // Avoid division by zero
-        if ($plannedCents === 0) {
-            return;
-        }
-
-        // Get actual amount (sum of all expenses in this subcategory)
-        $actualCents = $subcategory->expenses()->sum('amount_cents');
-
-        $percentageUsed = ($actualCents / $plannedCents) * 100;
-
-        // Check if threshold is reached
-        if ($percentageUsed < $settings->budget_exceeded_threshold_percent) {
-            return;
+            return 0;
         }
 
-        // Check for duplicate notification
-        // Avoid spam: Only create if no similar unread notification exists
-        $existingNotification = Notification::where('user_id', $user->id)
-            ->where('type', 'budget_exceeded')
-            ->where('read', false)
-            ->whereJsonContains('data->budget_id', $expense->budget_id)
-            ->whereJsonContains('data->subcategory_id', $subcategory->id)
-            ->first();
-
-        if ($existingNotification) {
-            // Update existing notification with new percentage
-            $existingNotification->update([
-                'data' => array_merge($existingNotification->data, [
-                    'percentage_used' => round($percentageUsed, 1),
-                    'actual_cents' => $actualCents,
-                    'updated_at' => now()->toIso8601String(),
-                ]),
-                'message' => $this->buildBudgetExceededMessage(
-                    $subcategory->name,
-                    $actualCents,
-                    $plannedCents,
-                    $percentageUsed
-                ),
+        $threshold = (int) $settings->budget_exceeded_threshold_percent;
+
+        // Subcategories with a planned amount whose actual amount reaches the threshold
+        $subcategories = DB::table('budget_subcategories')
+            ->join('budget_categories', 'budget_categories.id', '=', 'budget_subcategories.budget_category_id')
+            ->where('budget_categories.budget_id', $budgetId)
+            ->where('budget_subcategories.planned_amount_cents', '>', 0)
+            ->whereRaw('budget_subcategories.spent_cents * 100 >= budget_subcategories.planned_amount_cents * ?', [$threshold])
+            ->when($subcategoryIds !== null, fn ($query) => $query->whereIn('budget_subcategories.id', $subcategoryIds))
+            ->get([
+                'budget_subcategories.id',
+                'budget_subcategories.name',
+                'budget_subcategories.planned_amount_cents',
+                'budget_subcategories.spent_cents',
+                'budget_categories.name as category_name',
             ]);
-            return;
+
+        if ($subcategories->isEmpty()) {
+            return 0;
         }
 
-        // Create new notification
-        $this->createNotification(
-            $user,
-            'budget_exceeded',
-            'Dépassement de budget détecté',
-            $this->buildBudgetExceededMessage(
-                $subcategory->name,
-                $actualCents,
-                $plannedCents,
-                $percentageUsed
-            ),
-            [
-                'budget_id' => $expense->budget_id,
-                'budget_month' => $expense->budget->month->format('Y-m'),
-                'subcategory_id' => $subcategory->id,
-                'subcategory_name' => $subcategory->name,
-                'category_name' => $subcategory->budgetCategory->name,
-                'planned_cents' => $plannedCents,
-                'actual_cents' => $actualCents,
-                'percentage_used' => round($percentageUsed, 1),
-                'threshold_percent' => $settings->budget_exceeded_threshold_percent,
-            ]
-        );
+        // Serialize evaluations of the same budget so that an alert is never created twice
+        return Cache::lock("budget-alerts:{$budgetId}", 30)->block(10, function () use ($budget, $user, $settings, $subcategories) {
+            // Avoid spam: only one unread notification per (budget, subcategory)
+            $existing = Notification::where('user_id', $user->id)
+                ->where('read', false)
+                ->whereIn('dedup_key', $subcategories->map(
+                    fn ($subcategory) => self::budgetExceededKey($budget->id, $subcategory->id)
+                )->all())
+                ->get()
+                ->keyBy('dedup_key');
+
+            $now = now();
+            $rows = [];
+
+            foreach ($subcategories as $subcategory) {
+                $plannedCents = (int) $subcategory->planned_amount_cents;
+                $actualCents = (int) $subcategory->spent_cents;
+                $percentageUsed = ($actualCents / $plannedCents) * 100;
+                $dedupKey = self::budgetExceededKey($budget->id, $subcategory->id);
+                $message = $this->buildBudgetExceededMessage($subcategory->name, $actualCents, $plannedCents, $percentageUsed);
+
+                $existingNotification = $existing->get($dedupKey);
+
+                if ($existingNotification) {
+                    // Update existing notification with new percentage
+                    if (($existingNotification->data['actual_cents'] ?? null) !== $actualCents) {
+                        $existingNotification->update([
+                            'data' => array_merge($existingNotification->data ?? [], [
+                                'percentage_used' => round($percentageUsed, 1),
+                                'actual_cents' => $actualCents,
+                                'updated_at' => $now->toIso8601String(),
+                            ]),
+                            'message' => $message,
+                        ]);
+                    }
+                    continue;
+                }
+
+                $rows[] = [
+                    'user_id' => $user->id,
+                    'type' => 'budget_exceeded',
+                    'dedup_key' => $dedupKey,
+                    'title' => 'Dépassement de budget détecté',
+                    'message' => $message,
+                    'data' => json_encode([
+                        'budget_id' => $budget->id,
+                        'budget_month' => $budget->month->format('Y-m'),
+                        'subcategory_id' => $subcategory->id,
+                        'subcategory_name' => $subcategory->name,
+                        'category_name' => $subcategory->category_name,
+                        'planned_cents' => $plannedCents,
+                        'actual_cents' => $actualCents,
+                        'percentage_used' => round($percentageUsed, 1),
+                        'threshold_percent' => $settings->budget_exceeded_threshold_percent,
+                    ]),
+                    'read' => false,
+                    'created_at' => $now,
+                    'updated_at' => $now,
+                ];
+            }
+
+            if (! empty($rows)) {
+                DB::table('notifications')->insert($rows);
+
+                Log::info('Budget exceeded notifications created', [
+                    'user_id' => $user->id,
+                    'budget_id' => $budget->id,
+                    'dedup_keys' => array_column($rows, 'dedup_key'),
+                ]);
+            }
+
+            return count($rows);
+        });
+    }
 
-        Log::info('Budget exceeded notification created', [
-            'user_id' => $user->id,
-            'budget_id' => $expense->budget_id,
-            'subcategory_id' => $subcategory->id,
-            'percentage_used' => round($percentageUsed, 1),
-        ]);
+    /**
+     * Deduplication key of a budget exceeded alert
+     */
+    public static function budgetExceededKey(int $budgetId, int $subcategoryId): string
+    {
+        return "budget_exceeded:{$budgetId}:{$subcategoryId}";
     }
 
     /**
@@ -144,11 +196,13 @@ class NotificationService
         string $type,
         string $title,
         string $message,
-        array $data = []
+        array $data = [],
+        ?string $dedupKey = null
     ): Notification {
         return Notification::create([
             'user_id' => $user->id,
             'type' => $type,
+            'dedup_key' => $dedupKey,
             'title' => $title,
             'message' => $message,
             'data' => $data,
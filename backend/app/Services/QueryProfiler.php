@@ -0,0 +1,207 @@
+<?php
+
+namespace App\Services;
+
+use Illuminate\Cache\RedisStore;
+use Illuminate\Contracts\Cache\LockTimeoutException;
+use Illuminate\Database\Events\QueryExecuted;
+use Illuminate\Support\Facades\Cache;
+use Illuminate\Support\Facades\DB;
+
+/**
+ * Profil SQL d'une requête HTTP (ou d'un bloc de code) : nombre de requêtes,
+ * temps SQL cumulé, requêtes les plus lentes et requêtes répétées à
+ * l'identique hors paramètres, signe habituel d'un N+1.
+ *
+ * Les requêtes ne sont enregistrées qu'entre start() et stop() ; les profils
+ * échantillonnés sont conservés en cache pour l'endpoint d'administration.
+ * Pour une réponse en flux (export CSV), LogRequests arrête le profil une
+ * fois le corps envoyé, afin d'inclure les requêtes exécutées pendant l'envoi.
+ */
+class QueryProfiler
+{
+    public const CACHE_KEY = 'query-profiles';
+
+    public const HISTORY_TTL_SECONDS = 86400;
+
+    protected bool $listening = false;
+
+    protected bool $active = false;
+
+    /**
+     * @var array<int, array{sql: string, time_ms: float}>
+     */
+    protected array $queries = [];
+
+    /**
+     * Profiler cette requête ? (activé dans la configuration et tiré au sort)
+     */
+    public function shouldSample(): bool
+    {
+        if (! config('profiling.enabled')) {
+            return false;
+        }
+
+        return mt_rand() / mt_getrandmax() < (float) config('profiling.sample_rate');
+    }
+
+    /**
+     * Commencer l'enregistrement des requêtes
+     */
+    public function start(): void
+    {
+        if (! $this->listening) {
+            DB::listen(function (QueryExecuted $query) {
+                if ($this->active) {
+                    $this->queries[] = ['sql' => $query->sql, 'time_ms' => (float) $query->time];
+                }
+            });
+            $this->listening = true;
+        }
+
+        $this->queries = [];
+        $this->active = true;
+    }
+
+    /**
+     * Arrêter l'enregistrement et renvoyer le profil
+     *
+     * @return array{query_count: int, query_time_ms: float, slowest: array, repeated: array}
+     */
+    public function stop(): array
+    {
+        $this->active = false;
+        $profile = $this->summarize($this->queries);
+        $this->queries = [];
+
+        return $profile;
+    }
+
+    /**
+     * Profiler l'exécution d'un bloc de code
+     *
+     * @return array{0: mixed, 1: array} Résultat du bloc et profil
+     */
+    public function measure(callable $callback): array
+    {
+        $this->start();
+
+        try {
+            $result = $callback();
+        } finally {
+            $profile = $this->stop();
+        }
+
+        return [$result, $profile];
+    }
+
+    /**
+     * Conserver un profil parmi les plus récents.
+     * Avec Redis, liste native (LPUSH + LTRIM) : ajout atomique, sans relire
+     * l'historique. Sinon, lecture-modification-écriture sous verrou ; le
+     * profil est abandonné si le verrou n'est pas obtenu rapidement.
+     */
+    public function store(array $profile): void
+    {
+        $size = (int) config('profiling.history_size', 200);
+        $store = Cache::getStore();
+
+        if ($store instanceof RedisStore) {
+            $key = $store->getPrefix() . self::CACHE_KEY;
+
+            $store->connection()->pipeline(function ($pipe) use ($key, $profile, $size) {
+                $pipe->lpush($key, json_encode($profile));
+                $pipe->ltrim($key, 0, $size - 1);
+                $pipe->expire($key, self::HISTORY_TTL_SECONDS);
+            });
+
+            return;
+        }
+
+        try {
+            Cache::lock(self::CACHE_KEY . ':lock', 5)->block(1, function () use ($profile, $size) {
+                $profiles = Cache::get(self::CACHE_KEY, []);
+                array_unshift($profiles, $profile);
+
+                Cache::put(self::CACHE_KEY, array_slice($profiles, 0, $size), self::HISTORY_TTL_SECONDS);
+            });
+        } catch (LockTimeoutException) {
+            // Profil échantillonné : sa perte est sans conséquence
+        }
+    }
+
+    /**
+     * Profils récents, du plus récent au plus ancien
+     */
+    public function recent(int $limit = 50): array
+    {
+        $store = Cache::getStore();
+
+        if ($store instanceof RedisStore) {
+            return array_map(
+                fn ($profile) => json_decode($profile, true),
+                $store->connection()->lrange($store->getPrefix() . self::CACHE_KEY, 0, $limit - 1)
+            );
+        }
+
+        return array_slice(Cache::get(self::CACHE_KEY, []), 0, $limit);
+    }
+
+    /**
+     * Supprimer les profils conservés
+     */
+    public function clear(): void
+    {
+        $store = Cache::getStore();
+
+        if ($store instanceof RedisStore) {
+            $store->connection()->del($store->getPrefix() . self::CACHE_KEY);
+
+            return;
+        }
+
+        Cache::forget(self::CACHE_KEY);
+    }
+
+    /**
+     * Résumé des requêtes enregistrées
+     */
+    protected function summarize(array $queries): array
+    {
+        $slowest = collect($queries)
+            ->sortByDesc('time_ms')
+            ->take((int) config('profiling.slowest_statements', 5))
+            ->values()
+            ->all();
+
+        // Requêtes identiques hors paramètres (les listes IN de tailles différentes sont regroupées)
+        $repeated = collect($queries)
+            ->groupBy(fn ($query) => $this->normalize($query['sql']))
+            ->filter(fn ($group) => $group->count() >= (int) config('profiling.repeated_query_threshold', 5))
+            ->map(fn ($group, $sql) => [
+                'sql' => $sql,
+                'count' => $group->count(),
+                'time_ms' => round($group->sum('time_ms'), 2),
+            ])
+            ->sortByDesc('count')
+            ->values()
+            ->all();
+
+        return [
+            'query_count' => count($queries),
+            'query_time_ms' => round(array_sum(array_column($queries, 'time_ms')), 2),
+            'slowest' => $slowest,
+            'repeated' => $repeated,
+        ];
+    }
+
+    /**
+     * Forme normalisée d'une requête SQL
+     */
+    protected function normalize(string $sql): string
+    {
+        $sql = preg_replace('/\s+/', ' ', trim($sql));
+
+        return preg_replace('/\(\s*\?(\s*,\s*\?)*\s*\)/', '(?)', $sql);
+    }
+}
@@ -2,118 +2,117 @@
 
 namespace App\Services;
 
-use App\Models\Budget;
 use App\Models\RecurringExpense;
+use Carbon\Carbon;
+use Illuminate\Support\Collection;
 use Illuminate\Support\Facades\Log;
 
 class RecurringExpenseService
 {
     /**
-     * Create expenses from all active recurring expenses for a budget.
+     * Active auto-created recurring expenses, grouped by user ID.
      *
-     * @param Budget $budget
+     * @param array $userIds
      *
-     * @return int Number of expenses created
+     * @return Collection<int, Collection<int, RecurringExpense>>
      */
-    public function createRecurringExpensesForBudget(Budget $budget): int
+    public function activeForUsers(array $userIds): Collection
     {
-        $user = $budget->user;
-        $month = $budget->month; // Carbon instance
-        $created = 0;
-
-        // Get all active recurring expenses for this user
-        $recurringExpenses = RecurringExpense::where('user_id', $user->id)
+        return RecurringExpense::whereIn('user_id', $userIds)
             ->where('is_active', true)
             ->where('auto_create', true)
             ->with('templateSubcategory.templateCategory')
-            ->get();
+            ->get()
+            ->groupBy('user_id');
+    }
+
+    /**
+     * An empty subcategory index, to be filled with addToIndex().
+     */
+    public static function emptyIndex(): array
+    {
+        return ['byCategory' => [], 'byName' => []];
+    }
+
+    /**
+     * Register a budget subcategory in the index (first entry wins).
+     */
+    public static function addToIndex(array &$index, string $categoryName, string $subcategoryName, int $subcategoryId): void
+    {
+        $index['byCategory'][$categoryName . "\x1F" . $subcategoryName] ??= $subcategoryId;
+        $index['byName'][$subcategoryName] ??= $subcategoryId;
+    }
+
+    /**
+     * Expense rows to insert for the given month, ready for a bulk insert.
+     * Matches each recurring expense to a budget subcategory through the index,
+     * by subcategory name and, when known, category name.
+     *
+     * @param iterable<RecurringExpense> $recurringExpenses
+     * @param int $budgetId
+     * @param Carbon $month
+     * @param array $subcategoryIndex
+     *
+     * @return array
+     */
+    public function expenseRowsForMonth(iterable $recurringExpenses, int $budgetId, Carbon $month, array $subcategoryIndex): array
+    {
+        $now = now();
+        $rows = [];
 
         foreach ($recurringExpenses as $recurring) {
             if (! $recurring->shouldCreateForMonth($month)) {
                 continue;
             }
 
-            // Find the target budget_subcategory_id
-            $budgetSubcategoryId = null;
-
-            if ($recurring->template_subcategory_id) {
-                // Match by name: find budget subcategory with same name as template subcategory
-                $templateSubcat = $recurring->templateSubcategory;
-
-                if ($templateSubcat) {
-                    $budgetSubcategoryId = $this->findMatchingBudgetSubcategory(
-                        $budget,
-                        $templateSubcat->name,
-                        $templateSubcat->templateCategory->name ?? null
-                    );
-                }
-            }
+            $budgetSubcategoryId = $this->matchSubcategory($recurring, $subcategoryIndex);
 
             // If no match found or no template_subcategory_id, skip
             if (! $budgetSubcategoryId) {
                 Log::warning('RecurringExpense: Could not find matching subcategory', [
                     'recurring_expense_id' => $recurring->id,
-                    'budget_id' => $budget->id,
+                    'budget_id' => $budgetId,
                     'template_subcategory_id' => $recurring->template_subcategory_id,
                 ]);
                 continue;
             }
 
-            // Create the expense
-            $expenseDate = $recurring->getExpenseDateForMonth($month);
-
-            $budget->expenses()->create([
+            $rows[] = [
+                'budget_id' => $budgetId,
                 'budget_subcategory_id' => $budgetSubcategoryId,
-                'date' => $expenseDate,
+                'date' => $recurring->getExpenseDateForMonth($month)->toDateString(),
                 'label' => $recurring->label,
                 'amount_cents' => $recurring->amount_cents,
                 'payment_method' => $recurring->payment_method,
                 'notes' => $recurring->notes ? $recurring->notes . ' (récurrent)' : 'Dépense récurrente',
-            ]);
-
-            $created++;
-
-            Log::info('RecurringExpense: Created expense', [
-                'recurring_expense_id' => $recurring->id,
-                'budget_id' => $budget->id,
-                'amount_cents' => $recurring->amount_cents,
-            ]);
+                'created_at' => $now,
+                'updated_at' => $now,
+            ];
         }
 
-        return $created;
+        return $rows;
     }
 
     /**
-     * Find budget subcategory matching template subcategory name.
-     * Matches by subcategory name and optionally category name for accuracy.
+     * Find the budget subcategory matching the template subcategory of a recurring expense.
      *
-     * @param Budget $budget
-     * @param string $subcategoryName
-     * @param string|null $categoryName
+     * @param RecurringExpense $recurring
+     * @param array $subcategoryIndex
      *
      * @return int|null budget_subcategory_id
      */
-    private function findMatchingBudgetSubcategory(
-        Budget $budget,
-        string $subcategoryName,
-        ?string $categoryName = null
-    ): ?int {
-        // Load all budget structure if not already loaded
-        $budget->load('categories.subcategories');
-
-        foreach ($budget->categories as $category) {
-            // If category name provided, match it first
-            if ($categoryName && $category->name !== $categoryName) {
-                continue;
-            }
+    private function matchSubcategory(RecurringExpense $recurring, array $subcategoryIndex): ?int
+    {
+        $templateSubcat = $recurring->templateSubcategory;
 
-            foreach ($category->subcategories as $subcategory) {
-                if ($subcategory->name === $subcategoryName) {
-                    return $subcategory->id;
-                }
-            }
+        if (! $templateSubcat) {
+            return null;
         }
 
-        return null;
+        $categoryName = $templateSubcat->templateCategory->name ?? null;
+
+        return $categoryName
+            ? ($subcategoryIndex['byCategory'][$categoryName . "\x1F" . $templateSubcat->name] ?? null)
+            : ($subcategoryIndex['byName'][$templateSubcat->name] ?? null);
     }
 }
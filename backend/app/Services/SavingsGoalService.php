@@ -5,10 +5,17 @@ namespace App\Services;
 use App\Models\Notification;
 use App\Models\NotificationSetting;
 use App\Models\SavingsGoal;
+use Carbon\Carbon;
+use Illuminate\Support\Collection;
+use Illuminate\Support\Facades\DB;
 use Illuminate\Support\Facades\Log;
 
 class SavingsGoalService
 {
+    public const CHUNK_SIZE = 500;
+
+    public const INSERT_CHUNK_SIZE = 500;
+
     /**
      * Vérifie et crée les notifications de jalons (25%, 50%, 75%, 100%)
      */
@@ -78,127 +85,254 @@ class SavingsGoalService
     }
 
     /**
-     * Vérifie si l'objectif est en retard (à mi-parcours)
+     * Vérifie les objectifs en retard à mi-parcours, par lots.
+     *
+     * Les objectifs sont filtrés en SQL : progression dans le temps entre 48% et
+     * 52% (tolérance pour ne pas rater le moment exact) et montant atteint
+     * inférieur à 50%, les deux progressions étant calculées dans la requête.
+     * Par lot : une requête pour les paramètres, une pour les alertes non lues
+     * existantes, une insertion groupée pour les nouvelles.
+     *
+     * @return array{goals: int, created: int, chunks: int}
      */
-    public function checkRiskNotifications(SavingsGoal $goal): void
+    public function sendRiskNotifications(?Carbon $now = null, int $chunkSize = self::CHUNK_SIZE): array
     {
-        if (!$goal->notify_risk || !$goal->target_date) {
-            return;
-        }
+        $now ??= now();
+        $timeProgress = $this->timeProgressSql();
+        $amountProgress = $this->amountProgressSql();
+        $stats = ['goals' => 0, 'created' => 0, 'chunks' => 0];
 
-        $user = $goal->user;
-        $settings = $user->notificationSettings ?? NotificationSetting::create(['user_id' => $user->id]);
+        SavingsGoal::query()
+            ->select('savings_goals.*')
+            ->selectRaw("{$timeProgress} as time_progress", [$now])
+            ->selectRaw("{$amountProgress} as amount_progress")
+            ->where('status', 'active')
+            ->where('notify_risk', true)
+            ->whereNotNull('target_date')
+            ->whereRaw("{$timeProgress} BETWEEN 48 AND 52", [$now])
+            ->whereRaw("{$amountProgress} < 50")
+            ->chunkById($chunkSize, function ($goals) use ($now, &$stats) {
+                $stats['chunks']++;
+                $stats['goals'] += $goals->count();
 
-        if (!$settings->savings_goal_risk_enabled) {
-            return;
-        }
+                $settings = $this->settingsForUsers($goals->pluck('user_id')->unique()->all());
+                $goals = $goals->filter(fn ($goal) => $settings->get($goal->user_id)?->savings_goal_risk_enabled);
+
+                // Une seule alerte non lue par objectif
+                $existing = $this->existingDedupKeys(
+                    $goals,
+                    fn ($goal) => self::riskKey($goal->id),
+                    true
+                );
+
+                $rows = [];
 
-        // Vérification à mi-parcours uniquement
-        $timeProgress = $goal->time_progress_percentage;
+                foreach ($goals as $goal) {
+                    $dedupKey = self::riskKey($goal->id);
 
-        // Si entre 48% et 52% du temps écoulé (tolérance pour ne pas rater le moment exact)
-        if ($timeProgress >= 48 && $timeProgress <= 52) {
-            $amountProgress = $goal->progress_percentage;
+                    if (isset($existing[$dedupKey])) {
+                        continue;
+                    }
 
-            // Si on n'a pas atteint 50% du montant
-            if ($amountProgress < 50) {
-                // Vérifier qu'on n'a pas déjà envoyé cette notification
-                $existing = Notification::where('user_id', $goal->user_id)
-                    ->where('type', 'savings_goal_risk')
-                    ->whereJsonContains('data->goal_id', $goal->id)
-                    ->where('read', false)
-                    ->first();
+                    $amountProgress = (float) $goal->amount_progress;
 
-                if (!$existing) {
-                    $this->createRiskNotification($goal);
+                    $rows[] = $this->notificationRow($goal, 'savings_goal_risk', $dedupKey, $now, [
+                        'title' => 'Objectif en retard : ' . $goal->name,
+                        'message' => sprintf(
+                            "Attention : vous n'avez atteint que %.1f%% de votre objectif alors que 50%% du délai est écoulé.",
+                            $amountProgress
+                        ),
+                        'data' => [
+                            'goal_id' => $goal->id,
+                            'current_amount_cents' => $goal->current_amount_cents,
+                            'target_amount_cents' => $goal->target_amount_cents,
+                            'progress_percentage' => $amountProgress,
+                            'time_progress_percentage' => (float) $goal->time_progress,
+                            'deficit_percentage' => 50 - $amountProgress,
+                        ],
+                    ]);
                 }
-            }
-        }
+
+                $stats['created'] += $this->insertNotifications($rows);
+            }, 'savings_goals.id', 'id');
+
+        Log::info('Savings goal risk notifications created', $stats);
+
+        return $stats;
     }
 
     /**
-     * Crée une notification de risque
+     * Envoie les rappels mensuels pour les objectifs actifs, par lots.
+     * Un rappel par objectif et par mois : relancer la commande le même jour
+     * ne crée pas de doublon.
+     *
+     * @return array{goals: int, created: int, chunks: int}
      */
-    protected function createRiskNotification(SavingsGoal $goal): void
+    public function sendMonthlyReminders(?Carbon $now = null, int $chunkSize = self::CHUNK_SIZE): array
     {
-        $deficit = 50 - $goal->progress_percentage;
+        $now ??= now();
+        $stats = ['goals' => 0, 'created' => 0, 'chunks' => 0];
 
-        Notification::create([
-            'user_id' => $goal->user_id,
-            'type' => 'savings_goal_risk',
-            'title' => 'Objectif en retard : ' . $goal->name,
-            'message' => sprintf(
-                "Attention : vous n'avez atteint que %.1f%% de votre objectif alors que 50%% du délai est écoulé.",
-                $goal->progress_percentage
-            ),
-            'data' => [
-                'goal_id' => $goal->id,
-                'current_amount_cents' => $goal->current_amount_cents,
-                'target_amount_cents' => $goal->target_amount_cents,
-                'progress_percentage' => $goal->progress_percentage,
-                'time_progress_percentage' => $goal->time_progress_percentage,
-                'deficit_percentage' => $deficit,
-            ],
-        ]);
+        // Objectifs actifs avec rappel activé pour ce jour
+        SavingsGoal::query()
+            ->where('status', 'active')
+            ->where('notify_reminder', true)
+            ->where('reminder_day_of_month', $now->day)
+            ->chunkById($chunkSize, function ($goals) use ($now, &$stats) {
+                $stats['chunks']++;
+                $stats['goals'] += $goals->count();
 
-        Log::info('Savings goal risk notification created', [
-            'goal_id' => $goal->id,
-            'progress' => $goal->progress_percentage,
-        ]);
+                $settings = $this->settingsForUsers($goals->pluck('user_id')->unique()->all());
+                $goals = $goals->filter(fn ($goal) => $settings->get($goal->user_id)?->savings_goal_reminder_enabled);
+
+                $existing = $this->existingDedupKeys(
+                    $goals,
+                    fn ($goal) => self::reminderKey($goal->id, $now),
+                    false
+                );
+
+                $rows = [];
+
+                foreach ($goals as $goal) {
+                    $dedupKey = self::reminderKey($goal->id, $now);
+
+                    if (isset($existing[$dedupKey])) {
+                        continue;
+                    }
+
+                    $suggested = $goal->suggested_monthly_amount_cents ?? $goal->calculateSuggestedMonthlyAmount();
+
+                    $rows[] = $this->notificationRow($goal, 'savings_goal_reminder', $dedupKey, $now, [
+                        'title' => 'Rappel d\'épargne : ' . $goal->name,
+                        'message' => sprintf(
+                            "N'oubliez pas de verser %s pour rester sur la bonne voie !",
+                            number_format($suggested / 100, 2, ',', ' ') . ' €'
+                        ),
+                        'data' => [
+                            'goal_id' => $goal->id,
+                            'suggested_amount_cents' => $suggested,
+                            'current_amount_cents' => $goal->current_amount_cents,
+                            'target_amount_cents' => $goal->target_amount_cents,
+                        ],
+                    ]);
+                }
+
+                $stats['created'] += $this->insertNotifications($rows);
+            });
+
+        Log::info('Monthly savings goal reminders sent', $stats);
+
+        return $stats;
     }
 
     /**
-     * Envoie les rappels mensuels pour les objectifs actifs
+     * Clé de déduplication d'une alerte de retard
      */
-    public function sendMonthlyReminders(): int
+    public static function riskKey(int $goalId): string
     {
-        $today = now();
-        $dayOfMonth = $today->day;
+        return "savings_goal_risk:{$goalId}";
+    }
 
-        // Récupérer tous les objectifs actifs avec rappel activé pour ce jour
-        $goals = SavingsGoal::where('status', 'active')
-            ->where('notify_reminder', true)
-            ->where('reminder_day_of_month', $dayOfMonth)
-            ->with('user.notificationSettings')
-            ->get();
+    /**
+     * Clé de déduplication d'un rappel mensuel
+     */
+    public static function reminderKey(int $goalId, Carbon $month): string
+    {
+        return "savings_goal_reminder:{$goalId}:{$month->format('Y-m')}";
+    }
+
+    /**
+     * Paramètres de notification des utilisateurs d'un lot, indexés par user_id.
+     * Les paramètres manquants sont créés avec les valeurs par défaut.
+     */
+    protected function settingsForUsers(array $userIds): Collection
+    {
+        $settings = NotificationSetting::whereIn('user_id', $userIds)->get()->keyBy('user_id');
+        $missing = array_values(array_diff($userIds, $settings->keys()->all()));
 
-        $sent = 0;
+        if (! empty($missing)) {
+            $now = now();
 
-        foreach ($goals as $goal) {
-            $settings = $goal->user->notificationSettings;
+            DB::table('notification_settings')->insertOrIgnore(array_map(fn ($userId) => [
+                'user_id' => $userId,
+                'created_at' => $now,
+                'updated_at' => $now,
+            ], $missing));
 
-            if ($settings && $settings->savings_goal_reminder_enabled) {
-                $this->createReminderNotification($goal);
-                $sent++;
-            }
+            $settings = $settings->union(
+                NotificationSetting::whereIn('user_id', $missing)->get()->keyBy('user_id')
+            );
         }
 
-        Log::info('Monthly savings goal reminders sent', ['count' => $sent]);
-
-        return $sent;
+        return $settings;
     }
 
     /**
-     * Crée une notification de rappel mensuel
+     * Clés de déduplication déjà présentes pour un lot d'objectifs
+     *
+     * @return array<string, true>
      */
-    protected function createReminderNotification(SavingsGoal $goal): void
+    protected function existingDedupKeys(Collection $goals, callable $key, bool $unreadOnly): array
     {
-        $suggested = $goal->suggested_monthly_amount_cents ?? $goal->calculateSuggestedMonthlyAmount();
+        if ($goals->isEmpty()) {
+            return [];
+        }
 
-        Notification::create([
+        return Notification::whereIn('user_id', $goals->pluck('user_id')->unique()->all())
+            ->whereIn('dedup_key', $goals->map($key)->all())
+            ->when($unreadOnly, fn ($query) => $query->where('read', false))
+            ->pluck('dedup_key')
+            ->flip()
+            ->map(fn () => true)
+            ->all();
+    }
+
+    /**
+     * Ligne de notification prête pour une insertion groupée
+     */
+    protected function notificationRow(SavingsGoal $goal, string $type, string $dedupKey, Carbon $now, array $content): array
+    {
+        return [
             'user_id' => $goal->user_id,
-            'type' => 'savings_goal_reminder',
-            'title' => 'Rappel d\'épargne : ' . $goal->name,
-            'message' => sprintf(
-                "N'oubliez pas de verser %s pour rester sur la bonne voie !",
-                number_format($suggested / 100, 2, ',', ' ') . ' €'
-            ),
-            'data' => [
-                'goal_id' => $goal->id,
-                'suggested_amount_cents' => $suggested,
-                'current_amount_cents' => $goal->current_amount_cents,
-                'target_amount_cents' => $goal->target_amount_cents,
-            ],
-        ]);
+            'type' => $type,
+            'dedup_key' => $dedupKey,
+            'title' => $content['title'],
+            'message' => $content['message'],
+            'data' => json_encode($content['data']),
+            'read' => false,
+            'created_at' => $now,
+            'updated_at' => $now,
+        ];
+    }
+
+    /**
+     * Insertion groupée des notifications d'un lot
+     */
+    protected function insertNotifications(array $rows): int
+    {
+        foreach (array_chunk($rows, self::INSERT_CHUNK_SIZE) as $chunk) {
+            DB::table('notifications')->insert($chunk);
+        }
+
+        return count($rows);
+    }
+
+    /**
+     * Progression dans le temps (%) calculée en SQL, comme time_progress_percentage.
+     * Attend la date courante en paramètre ; NULL si la durée est nulle.
+     */
+    protected function timeProgressSql(): string
+    {
+        return 'LEAST(TIMESTAMPDIFF(SECOND, savings_goals.start_date, ?) * 100'
+            . ' / NULLIF(TIMESTAMPDIFF(SECOND, savings_goals.start_date, savings_goals.target_date), 0), 100)';
+    }
+
+    /**
+     * Progression du montant (%) calculée en SQL, comme progress_percentage
+     */
+    protected function amountProgressSql(): string
+    {
+        return 'CASE WHEN savings_goals.target_amount_cents = 0 THEN 0'
+            . ' ELSE LEAST(savings_goals.current_amount_cents * 100 / savings_goals.target_amount_cents, 100) END';
     }
 }
@@ -0,0 +1,231 @@
+<?php
+
+namespace App\Services;
+
+use App\Models\BudgetCategory;
+use App\Models\BudgetSubcategory;
+use App\Models\Expense;
+use Illuminate\Support\Facades\DB;
+
+/**
+ * Maintient les agrégats de dépenses (spent_cents, expense_count) stockés sur
+ * les budgets, catégories et sous-catégories, afin que les statistiques
+ * n'aient plus à charger chaque dépense.
+ */
+class SpendRollupService
+{
+    /**
+     * Appliquer l'ajout d'une dépense aux agrégats
+     */
+    public function recordCreated(Expense $expense): void
+    {
+        $this->applyDelta(
+            $expense->budget_id,
+            $expense->budget_subcategory_id,
+            $expense->amount_cents,
+            1
+        );
+    }
+
+    /**
+     * Appliquer la modification d'une dépense (montant, sous-catégorie ou budget)
+     */
+    public function recordUpdated(Expense $expense): void
+    {
+        if (! $expense->wasChanged(['amount_cents', 'budget_subcategory_id', 'budget_id'])) {
+            return;
+        }
+
+        DB::transaction(function () use ($expense) {
+            $this->applyDelta(
+                (int) $expense->getOriginal('budget_id'),
+                (int) $expense->getOriginal('budget_subcategory_id'),
+                -(int) $expense->getOriginal('amount_cents'),
+                -1
+            );
+
+            $this->applyDelta(
+                $expense->budget_id,
+                $expense->budget_subcategory_id,
+                $expense->amount_cents,
+                1
+            );
+        });
+    }
+
+    /**
+     * Appliquer la suppression d'une dépense aux agrégats
+     */
+    public function recordDeleted(Expense $expense): void
+    {
+        $this->applyDelta(
+            $expense->budget_id,
+            $expense->budget_subcategory_id,
+            -$expense->amount_cents,
+            -1
+        );
+    }
+
+    /**
+     * Retirer les totaux d'une sous-catégorie avant sa suppression
+     * (ses dépenses sont supprimées en cascade par la base, sans événement)
+     */
+    public function forgetSubcategory(BudgetSubcategory $subcategory): void
+    {
+        $totals = DB::table('expenses')
+            ->where('budget_subcategory_id', $subcategory->id)
+            ->selectRaw('budget_id, COALESCE(SUM(amount_cents), 0) as spent_cents, COUNT(*) as expense_count')
+            ->groupBy('budget_id')
+            ->get();
+
+        DB::transaction(function () use ($subcategory, $totals) {
+            foreach ($totals as $row) {
+                DB::table('budgets')->where('id', $row->budget_id)->incrementEach([
+                    'spent_cents' => -(int) $row->spent_cents,
+                    'expense_count' => -(int) $row->expense_count,
+                ]);
+            }
+
+            DB::table('budget_categories')->where('id', $subcategory->budget_category_id)->incrementEach([
+                'spent_cents' => -(int) $totals->sum('spent_cents'),
+                'expense_count' => -(int) $totals->sum('expense_count'),
+            ]);
+        });
+    }
+
+    /**
+     * Retirer les totaux d'une catégorie du budget avant sa suppression
+     */
+    public function forgetCategory(BudgetCategory $category): void
+    {
+        $totals = DB::table('expenses')
+            ->join('budget_subcategories', 'budget_subcategories.id', '=', 'expenses.budget_subcategory_id')
+            ->where('budget_subcategories.budget_category_id', $category->id)
+            ->selectRaw('expenses.budget_id, COALESCE(SUM(expenses.amount_cents), 0) as spent_cents, COUNT(*) as expense_count')
+            ->groupBy('expenses.budget_id')
+            ->get();
+
+        DB::transaction(function () use ($totals) {
+            foreach ($totals as $row) {
+                DB::table('budgets')->where('id', $row->budget_id)->incrementEach([
+                    'spent_cents' => -(int) $row->spent_cents,
+                    'expense_count' => -(int) $row->expense_count,
+                ]);
+            }
+        });
+    }
+
+    /**
+     * Appliquer un delta de montant et de nombre aux trois niveaux d'agrégats
+     */
+    public function applyDelta(int $budgetId, int $subcategoryId, int $amountDelta, int $countDelta): void
+    {
+        $delta = [
+            'spent_cents' => $amountDelta,
+            'expense_count' => $countDelta,
+        ];
+
+        DB::transaction(function () use ($budgetId, $subcategoryId, $delta) {
+            DB::table('budget_subcategories')->where('id', $subcategoryId)->incrementEach($delta);
+
+            DB::table('budget_categories')
+                ->whereIn('id', DB::table('budget_subcategories')->select('budget_category_id')->where('id', $subcategoryId))
+                ->incrementEach($delta);
+
+            DB::table('budgets')->where('id', $budgetId)->incrementEach($delta);
+        });
+    }
+
+    /**
+     * Recalculer les agrégats depuis la table expenses (un budget ou tous)
+     *
+     * @param int|null $budgetId
+     *
+     * @return void
+     */
+    public function rebuild(?int $budgetId = null): void
+    {
+        $subcategoryScope = $budgetId
+            ? 'WHERE budget_category_id IN (SELECT id FROM budget_categories WHERE budget_id = ?)'
+            : '';
+        $categoryScope = $budgetId ? 'WHERE budget_id = ?' : '';
+        $budgetScope = $budgetId ? 'WHERE id = ?' : '';
+        $bindings = $budgetId ? [$budgetId] : [];
+
+        DB::transaction(function () use ($subcategoryScope, $categoryScope, $budgetScope, $bindings) {
+            DB::update("
+                UPDATE budget_subcategories SET
+                    spent_cents = (SELECT COALESCE(SUM(e.amount_cents), 0) FROM expenses e WHERE e.budget_subcategory_id = budget_subcategories.id),
+                    expense_count = (SELECT COUNT(*) FROM expenses e WHERE e.budget_subcategory_id = budget_subcategories.id)
+                {$subcategoryScope}
+            ", $bindings);
+
+            DB::update("
+                UPDATE budget_categories SET
+                    spent_cents = (SELECT COALESCE(SUM(s.spent_cents), 0) FROM budget_subcategories s WHERE s.budget_category_id = budget_categories.id),
+                    expense_count = (SELECT COALESCE(SUM(s.expense_count), 0) FROM budget_subcategories s WHERE s.budget_category_id = budget_categories.id)
+                {$categoryScope}
+            ", $bindings);
+
+            DB::update("
+                UPDATE budgets SET
+                    spent_cents = (SELECT COALESCE(SUM(e.amount_cents), 0) FROM expenses e WHERE e.budget_id = budgets.id),
+                    expense_count = (SELECT COUNT(*) FROM expenses e WHERE e.budget_id = budgets.id)
+                {$budgetScope}
+            ", $bindings);
+        });
+    }
+
+    /**
+     * Comparer les agrégats stockés avec les totaux réels des dépenses
+     *
+     * @param int|null $budgetId
+     *
+     * @return array Liste des écarts ['level', 'id', 'stored_cents', 'actual_cents', 'stored_count', 'actual_count']
+     */
+    public function verify(?int $budgetId = null): array
+    {
+        $drifts = [];
+
+        $subcategories = DB::table('budget_subcategories as s')
+            ->join('budget_categories as c', 'c.id', '=', 's.budget_category_id')
+            ->leftJoin('expenses as e', 'e.budget_subcategory_id', '=', 's.id')
+            ->when($budgetId, fn ($q) => $q->where('c.budget_id', $budgetId))
+            ->groupBy('s.id', 's.spent_cents', 's.expense_count')
+            ->selectRaw('s.id, s.spent_cents, s.expense_count, COALESCE(SUM(e.amount_cents), 0) as actual_cents, COUNT(e.id) as actual_count')
+            ->get();
+
+        $categories = DB::table('budget_categories as c')
+            ->leftJoin('budget_subcategories as s', 's.budget_category_id', '=', 'c.id')
+            ->leftJoin('expenses as e', 'e.budget_subcategory_id', '=', 's.id')
+            ->when($budgetId, fn ($q) => $q->where('c.budget_id', $budgetId))
+            ->groupBy('c.id', 'c.spent_cents', 'c.expense_count')
+            ->selectRaw('c.id, c.spent_cents, c.expense_count, COALESCE(SUM(e.amount_cents), 0) as actual_cents, COUNT(e.id) as actual_count')
+            ->get();
+
+        $budgets = DB::table('budgets as b')
+            ->leftJoin('expenses as e', 'e.budget_id', '=', 'b.id')
+            ->when($budgetId, fn ($q) => $q->where('b.id', $budgetId))
+            ->groupBy('b.id', 'b.spent_cents', 'b.expense_count')
+            ->selectRaw('b.id, b.spent_cents, b.expense_count, COALESCE(SUM(e.amount_cents), 0) as actual_cents, COUNT(e.id) as actual_count')
+            ->get();
+
+        foreach (['subcategory' => $subcategories, 'category' => $categories, 'budget' => $budgets] as $level => $rows) {
+            foreach ($rows as $row) {
+                if ((int) $row->spent_cents !== (int) $row->actual_cents
+                    || (int) $row->expense_count !== (int) $row->actual_count) {
+                    $drifts[] = [
+                        'level' => $level,
+                        'id' => $row->id,
+                        'stored_cents' => (int) $row->spent_cents,
+                        'actual_cents' => (int) $row->actual_cents,
+                        'stored_count' => (int) $row->expense_count,
+                        'actual_count' => (int) $row->actual_count,
+                    ];
+                }
+            }
+        }
+
+        return $drifts;
+    }
+}
@@ -0,0 +1,202 @@
+<?php
+
+namespace App\Services;
+
+use App\Models\Budget;
+use App\Models\User;
+use App\Models\WealthHistory;
+use Carbon\Carbon;
+
+/**
+ * Calculs des statistiques de budget, partagés par les endpoints unitaires
+ * de StatsController et par l'endpoint groupé du tableau de bord.
+ * Les montants réels proviennent des agrégats (spent_cents, expense_count).
+ */
+class StatsService
+{
+    protected TimeSeriesAnalyticsService $analytics;
+
+    public function __construct(TimeSeriesAnalyticsService $analytics)
+    {
+        $this->analytics = $analytics;
+    }
+
+    /**
+     * Résumé global d'un budget
+     */
+    public function summary(Budget $budget): array
+    {
+        $budget->loadMissing('categories');
+
+        $totalPlanned = $budget->categories->sum('planned_amount_cents');
+        $totalActual = $budget->spent_cents;
+        $variance = $totalActual - $totalPlanned;
+        $variancePercentage = $totalPlanned > 0 ? (($totalActual / $totalPlanned - 1) * 100) : null;
+
+        return [
+            'totalPlannedCents' => $totalPlanned,
+            'totalActualCents' => $totalActual,
+            'varianceCents' => $variance,
+            'variancePercentage' => $variancePercentage,
+            'expenseCount' => $budget->expense_count,
+        ];
+    }
+
+    /**
+     * Statistiques par catégorie
+     */
+    public function byCategory(Budget $budget): array
+    {
+        $budget->loadMissing('categories');
+
+        return $budget->categories->map(function ($category) {
+            $actualCents = $category->spent_cents;
+
+            $varianceCents = $actualCents - $category->planned_amount_cents;
+            $variancePercentage = $category->planned_amount_cents > 0
+                ? (($actualCents / $category->planned_amount_cents - 1) * 100)
+                : null;
+
+            return [
+                'id' => $category->id,
+                'name' => $category->name,
+                'plannedAmountCents' => $category->planned_amount_cents,
+                'actualAmountCents' => $actualCents,
+                'varianceCents' => $varianceCents,
+                'variancePercentage' => $variancePercentage,
+                'expenseCount' => $category->expense_count,
+            ];
+        })->values()->all();
+    }
+
+    /**
+     * Statistiques par sous-catégorie, éventuellement limitées à une catégorie
+     */
+    public function bySubcategory(Budget $budget, ?int $categoryId = null): array
+    {
+        $budget->loadMissing('categories.subcategories');
+
+        $categories = $categoryId
+            ? $budget->categories->where('id', $categoryId)
+            : $budget->categories;
+
+        $stats = [];
+
+        foreach ($categories as $category) {
+            foreach ($category->subcategories as $subcategory) {
+                $actualCents = $subcategory->spent_cents;
+                $varianceCents = $actualCents - $subcategory->planned_amount_cents;
+                $variancePercentage = $subcategory->planned_amount_cents > 0
+                    ? (($actualCents / $subcategory->planned_amount_cents - 1) * 100)
+                    : null;
+
+                $stats[] = [
+                    'id' => $subcategory->id,
+                    'name' => $subcategory->name,
+                    'categoryId' => $category->id,
+                    'categoryName' => $category->name,
+                    'plannedAmountCents' => $subcategory->planned_amount_cents,
+                    'actualAmountCents' => $actualCents,
+                    'varianceCents' => $varianceCents,
+                    'variancePercentage' => $variancePercentage,
+                    'expenseCount' => $subcategory->expense_count,
+                ];
+            }
+        }
+
+        return $stats;
+    }
+
+    /**
+     * Répartition des dépenses par catégorie (graphique circulaire)
+     */
+    public function expenseDistribution(Budget $budget): array
+    {
+        $budget->loadMissing('categories');
+
+        return $budget->categories->map(function ($category) {
+            return [
+                'label' => $category->name,
+                'value' => $category->spent_cents,
+            ];
+        })->filter(function ($item) {
+            return $item['value'] > 0; // Only include categories with expenses
+        })->values()->all();
+    }
+
+    /**
+     * Top N des catégories par montant dépensé
+     */
+    public function topCategories(Budget $budget, int $limit = 5): array
+    {
+        $budget->loadMissing('categories');
+
+        return $budget->categories->map(function ($category) {
+            $actualCents = $category->spent_cents;
+
+            return [
+                'id' => $category->id,
+                'name' => $category->name,
+                'actualCents' => $actualCents,
+                'plannedCents' => $category->planned_amount_cents,
+                'varianceCents' => $actualCents - $category->planned_amount_cents,
+                'expenseCount' => $category->expense_count,
+            ];
+        })
+            ->filter(fn ($cat) => $cat['actualCents'] > 0)
+            ->sortByDesc('actualCents')
+            ->take($limit)
+            ->values()
+            ->all();
+    }
+
+    /**
+     * Données du graphique d'évolution du patrimoine
+     */
+    public function wealthEvolution(User $user, ?string $from = null, ?string $to = null): array
+    {
+        $query = WealthHistory::where('user_id', $user->id)
+            ->orderBy('recorded_at', 'asc');
+
+        if ($from) {
+            $query->where('recorded_at', '>=', $from);
+        }
+
+        if ($to) {
+            $query->where('recorded_at', '<=', $to);
+        }
+
+        $history = $query->get();
+
+        return [
+            'labels' => $history->pluck('recorded_at')->map(fn ($date) => $date->format('Y-m-d'))->all(),
+            'datasets' => [
+                [
+                    'label' => 'Actifs',
+                    'data' => $history->pluck('total_assets_cents')->all(),
+                ],
+                [
+                    'label' => 'Passifs',
+                    'data' => $history->pluck('total_liabilities_cents')->all(),
+                ],
+                [
+                    'label' => 'Patrimoine Net',
+                    'data' => $history->pluck('net_worth_cents')->all(),
+                ],
+            ],
+        ];
+    }
+
+    /**
+     * Évolution du taux d'épargne (from/to au format Y-m, sinon les N derniers mois)
+     */
+    public function savingsRateEvolution(User $user, ?string $from = null, ?string $to = null, int $months = 12): array
+    {
+        return $this->analytics->savingsRate(
+            $user,
+            $from ? Carbon::parse($from . '-01') : null,
+            $to ? Carbon::parse($to . '-01') : null,
+            $months
+        );
+    }
+}
@@ -0,0 +1,312 @@
+<?php
+
+namespace App\Services;
+
+use App\Models\User;
+use Carbon\Carbon;
+use Illuminate\Support\Collection;
+use Illuminate\Support\Facades\DB;
+
+/**
+ * Séries temporelles mensuelles calculées par agrégation SQL groupée.
+ *
+ * Les totaux par mois et par catégorie proviennent des agrégats stockés
+ * (spent_cents, expense_count) : leur coût dépend du nombre de catégories et
+ * non du nombre de dépenses. Seules les ventilations par tag et par moyen de
+ * paiement parcourent la table expenses, en une requête GROUP BY.
+ */
+class TimeSeriesAnalyticsService
+{
+    public const DIMENSIONS = ['total', 'category', 'tag', 'payment_method'];
+
+    public const MAX_MONTHS = 120;
+
+    public const DEFAULT_ROLLING_WINDOW = 3;
+
+    /**
+     * Liste des mois (Y-m) entre deux dates, bornes incluses.
+     * Au-delà de MAX_MONTHS, seuls les mois les plus récents sont conservés,
+     * comme pour savingsRate().
+     *
+     * @return array<int, string>
+     */
+    public function months(Carbon $from, Carbon $to): array
+    {
+        $months = [];
+        $end = $to->copy()->startOfMonth();
+        $current = $from->copy()->startOfMonth()
+            ->max($end->copy()->subMonthsNoOverflow(self::MAX_MONTHS - 1));
+
+        while ($current <= $end) {
+            $months[] = $current->format('Y-m');
+            $current->addMonthNoOverflow();
+        }
+
+        return $months;
+    }
+
+    /**
+     * Séries mensuelles d'une dimension, avec variation sur un an et moyenne glissante
+     *
+     * @param User $user
+     * @param array $months Mois (Y-m) de la série, dans l'ordre
+     * @param string $dimension total, category, tag ou payment_method
+     * @param int $rollingWindow Nombre de mois de la moyenne glissante
+     *
+     * @return array
+     */
+    public function series(User $user, array $months, string $dimension = 'total', int $rollingWindow = self::DEFAULT_ROLLING_WINDOW): array
+    {
+        $positions = array_flip($months);
+        $series = [];
+
+        foreach ($this->monthlyTotals($user, $months, $dimension) as $row) {
+            $key = (string) $row->series_key;
+
+            if (! isset($series[$key])) {
+                $series[$key] = [
+                    'key' => $key,
+                    'label' => $row->series_label,
+                    'values' => array_fill(0, count($months), 0),
+                    'expenseCounts' => array_fill(0, count($months), 0),
+                ];
+            }
+
+            $position = $positions[substr($row->month, 0, 7)];
+            $series[$key]['values'][$position] += (int) $row->total_cents;
+            $series[$key]['expenseCounts'][$position] += (int) $row->expense_count;
+        }
+
+        $series = collect($series)
+            ->map(fn ($item) => $item + [
+                'totalCents' => array_sum($item['values']),
+                'yearOverYearPercent' => $this->yearOverYear($item['values']),
+                'rollingAverageCents' => $this->rollingAverage($item['values'], $rollingWindow),
+            ])
+            ->sortByDesc('totalCents')
+            ->values()
+            ->all();
+
+        return [
+            'dimension' => $dimension,
+            'months' => $months,
+            'rollingWindow' => $rollingWindow,
+            'series' => $series,
+        ];
+    }
+
+    /**
+     * Prévu et réel par mois et par nom de catégorie, depuis les agrégats
+     *
+     * @param User $user
+     * @param array $months Mois (Y-m)
+     *
+     * @return Collection Lignes (budget_id, month, name, planned_cents, actual_cents, expense_count)
+     */
+    public function categoryBreakdown(User $user, array $months): Collection
+    {
+        return DB::table('budget_categories')
+            ->join('budgets', 'budgets.id', '=', 'budget_categories.budget_id')
+            ->where('budgets.user_id', $user->id)
+            ->whereIn('budgets.month', $this->monthDates($months))
+            ->groupBy('budgets.id', 'budgets.month', 'budget_categories.name')
+            ->orderBy('budgets.month')
+            ->orderByRaw('MIN(budget_categories.sort_order)')
+            ->get([
+                'budgets.id as budget_id',
+                'budgets.month',
+                'budget_categories.name',
+                DB::raw('SUM(budget_categories.planned_amount_cents) as planned_cents'),
+                DB::raw('SUM(budget_categories.spent_cents) as actual_cents'),
+                DB::raw('SUM(budget_categories.expense_count) as expense_count'),
+            ]);
+    }
+
+    /**
+     * Évolution du taux d'épargne, lue uniquement dans la table budgets.
+     * Sans bornes, renvoie les N derniers budgets ayant un revenu.
+     *
+     * @param User $user
+     * @param Carbon|null $from
+     * @param Carbon|null $to
+     * @param int $limit
+     * @param int $rollingWindow
+     *
+     * @return array
+     */
+    public function savingsRate(
+        User $user,
+        ?Carbon $from = null,
+        ?Carbon $to = null,
+        int $limit = 12,
+        int $rollingWindow = self::DEFAULT_ROLLING_WINDOW
+    ): array {
+        $query = DB::table('budgets')
+            ->where('user_id', $user->id)
+            ->whereNotNull('revenue_cents')
+            ->orderBy('month', 'desc')
+            ->select(['month', 'revenue_cents', 'spent_cents']);
+
+        if ($from) {
+            $query->where('month', '>=', $from->copy()->startOfMonth()->toDateString());
+        }
+        if ($to) {
+            $query->where('month', '<=', $to->copy()->startOfMonth()->toDateString());
+        }
+
+        $query->limit(! $from && ! $to ? $limit : self::MAX_MONTHS);
+
+        $points = $query->get()->reverse()->values()->map(function ($row) {
+            $month = Carbon::parse($row->month);
+            $revenue = (int) $row->revenue_cents;
+            $expenses = (int) $row->spent_cents;
+            $savings = $revenue - $expenses;
+
+            return [
+                'month' => $month->format('Y-m'),
+                'monthLabel' => $month->translatedFormat('F Y'),
+                'revenueCents' => $revenue,
+                'expensesCents' => $expenses,
+                'savingsCents' => $savings,
+                'savingsRatePercent' => $revenue > 0 ? round(($savings / $revenue) * 100, 2) : null,
+            ];
+        })->all();
+
+        $rolling = $this->rollingAverage(array_column($points, 'savingsRatePercent'), $rollingWindow, 2);
+
+        foreach ($points as $i => $point) {
+            $points[$i]['rollingSavingsRatePercent'] = $rolling[$i];
+        }
+
+        return $points;
+    }
+
+    /**
+     * Variation en pourcentage par rapport au même mois de l'année précédente
+     *
+     * @param array $values Valeurs mensuelles consécutives
+     *
+     * @return array<int, float|null>
+     */
+    public function yearOverYear(array $values): array
+    {
+        $result = [];
+
+        foreach ($values as $i => $value) {
+            $previous = $values[$i - 12] ?? null;
+
+            $result[] = $previous !== null && $previous > 0
+                ? round((($value - $previous) / $previous) * 100, 2)
+                : null;
+        }
+
+        return $result;
+    }
+
+    /**
+     * Moyenne glissante sur $window mois (null tant que la fenêtre est incomplète
+     * ou qu'elle contient une valeur manquante)
+     *
+     * @param array $values
+     * @param int $window
+     * @param int|null $precision Arrondi décimal, ou entier (centimes) si null
+     *
+     * @return array<int, int|float|null>
+     */
+    public function rollingAverage(array $values, int $window, ?int $precision = null): array
+    {
+        $window = max(1, $window);
+        $values = array_values($values);
+        $result = [];
+
+        foreach ($values as $i => $value) {
+            $slice = $i + 1 >= $window ? array_slice($values, $i + 1 - $window, $window) : [];
+
+            if (empty($slice) || in_array(null, $slice, true)) {
+                $result[] = null;
+                continue;
+            }
+
+            $average = array_sum($slice) / $window;
+            $result[] = $precision === null ? (int) round($average) : round($average, $precision);
+        }
+
+        return $result;
+    }
+
+    /**
+     * Totaux mensuels groupés en SQL pour une dimension
+     *
+     * @return Collection Lignes (month, series_key, series_label, total_cents, expense_count)
+     */
+    private function monthlyTotals(User $user, array $months, string $dimension): Collection
+    {
+        $dates = $this->monthDates($months);
+
+        if (empty($dates)) {
+            return collect();
+        }
+
+        return match ($dimension) {
+            'category' => DB::table('budget_categories')
+                ->join('budgets', 'budgets.id', '=', 'budget_categories.budget_id')
+                ->where('budgets.user_id', $user->id)
+                ->whereIn('budgets.month', $dates)
+                ->groupBy('budgets.month', 'budget_categories.name')
+                ->get([
+                    'budgets.month',
+                    'budget_categories.name as series_key',
+                    'budget_categories.name as series_label',
+                    DB::raw('SUM(budget_categories.spent_cents) as total_cents'),
+                    DB::raw('SUM(budget_categories.expense_count) as expense_count'),
+                ]),
+
+            'tag' => DB::table('expenses')
+                ->join('budgets', 'budgets.id', '=', 'expenses.budget_id')
+                ->join('expense_tag', 'expense_tag.expense_id', '=', 'expenses.id')
+                ->join('tags', 'tags.id', '=', 'expense_tag.tag_id')
+                ->where('budgets.user_id', $user->id)
+                ->whereIn('budgets.month', $dates)
+                ->groupBy('budgets.month', 'tags.id', 'tags.name')
+                ->get([
+                    'budgets.month',
+                    'tags.id as series_key',
+                    'tags.name as series_label',
+                    DB::raw('SUM(expenses.amount_cents) as total_cents'),
+                    DB::raw('COUNT(*) as expense_count'),
+                ]),
+
+            'payment_method' => DB::table('expenses')
+                ->join('budgets', 'budgets.id', '=', 'expenses.budget_id')
+                ->where('budgets.user_id', $user->id)
+                ->whereIn('budgets.month', $dates)
+                ->groupBy('budgets.month', 'expenses.payment_method')
+                ->get([
+                    'budgets.month',
+                    DB::raw("COALESCE(expenses.payment_method, '') as series_key"),
+                    DB::raw("COALESCE(expenses.payment_method, 'Non renseigné') as series_label"),
+                    DB::raw('SUM(expenses.amount_cents) as total_cents'),
+                    DB::raw('COUNT(*) as expense_count'),
+                ]),
+
+            default => DB::table('budgets')
+                ->where('user_id', $user->id)
+                ->whereIn('month', $dates)
+                ->get([
+                    'month',
+                    DB::raw("'total' as series_key"),
+                    DB::raw("'Total' as series_label"),
+                    'spent_cents as total_cents',
+                    'expense_count',
+                ]),
+        };
+    }
+
+    /**
+     * Mois Y-m convertis en dates de début de mois (format de la colonne budgets.month)
+     */
+    private function monthDates(array $months): array
+    {
+        return array_map(fn ($month) => $month . '-01', $months);
+    }
+}
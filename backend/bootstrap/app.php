@@ -18,6 +18,7 @@ return Application::configure(basePath: dirname(__DIR__))
         $middleware->alias([
             'verified' => \Illuminate\Auth\Middleware\EnsureEmailIsVerified::class,
             'admin' => \App\Http\Middleware\EnsureUserIsAdmin::class,
+            'stats.etag' => \App\Http\Middleware\ConditionalStatsResponse::class,
         ]);
 
         //         Rate limiting désactivé temporairement pour le développement
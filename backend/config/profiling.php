@@ -0,0 +1,30 @@
+<?php
+
+return [
+
+    /*
+    |--------------------------------------------------------------------------
+    | Query Profiling
+    |--------------------------------------------------------------------------
+    |
+    | Per-request SQL profiling recorded by the LogRequests middleware: query
+    | count, total query time, slowest statements and repeated statements
+    | (N+1 patterns). Only a sample of the requests is profiled.
+    |
+    */
+
+    'enabled' => (bool) env('QUERY_PROFILING_ENABLED', false),
+
+    // Fraction of the requests that are profiled (0 to 1)
+    'sample_rate' => (float) env('QUERY_PROFILING_SAMPLE_RATE', 0.05),
+
+    // Number of slowest statements kept per request
+    'slowest_statements' => (int) env('QUERY_PROFILING_SLOWEST', 5),
+
+    // Same statement (bindings aside) executed at least this many times is reported as N+1
+    'repeated_query_threshold' => (int) env('QUERY_PROFILING_REPEATED_THRESHOLD', 5),
+
+    // Number of recent profiles kept in cache for the admin endpoint
+    'history_size' => (int) env('QUERY_PROFILING_HISTORY', 200),
+
+];
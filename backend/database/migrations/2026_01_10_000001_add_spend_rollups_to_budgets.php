@@ -0,0 +1,53 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Database\Schema\Blueprint;
+use Illuminate\Support\Facades\DB;
+use Illuminate\Support\Facades\Schema;
+
+return new class () extends Migration {
+    /**
+     * Run the migrations.
+     */
+    public function up(): void
+    {
+        foreach (['budgets', 'budget_categories', 'budget_subcategories'] as $tableName) {
+            Schema::table($tableName, function (Blueprint $table) {
+                // Agrégats maintenus par SpendRollupService (somme et nombre des dépenses)
+                $table->bigInteger('spent_cents')->default(0);
+                $table->unsignedInteger('expense_count')->default(0);
+            });
+        }
+
+        // Initialiser les agrégats à partir des dépenses existantes
+        DB::statement('
+            UPDATE budget_subcategories SET
+                spent_cents = (SELECT COALESCE(SUM(e.amount_cents), 0) FROM expenses e WHERE e.budget_subcategory_id = budget_subcategories.id),
+                expense_count = (SELECT COUNT(*) FROM expenses e WHERE e.budget_subcategory_id = budget_subcategories.id)
+        ');
+
+        DB::statement('
+            UPDATE budget_categories SET
+                spent_cents = (SELECT COALESCE(SUM(s.spent_cents), 0) FROM budget_subcategories s WHERE s.budget_category_id = budget_categories.id),
+                expense_count = (SELECT COALESCE(SUM(s.expense_count), 0) FROM budget_subcategories s WHERE s.budget_category_id = budget_categories.id)
+        ');
+
+        DB::statement('
+            UPDATE budgets SET
+                spent_cents = (SELECT COALESCE(SUM(e.amount_cents), 0) FROM expenses e WHERE e.budget_id = budgets.id),
+                expense_count = (SELECT COUNT(*) FROM expenses e WHERE e.budget_id = budgets.id)
+        ');
+    }
+
+    /**
+     * Reverse the migrations.
+     */
+    public function down(): void
+    {
+        foreach (['budgets', 'budget_categories', 'budget_subcategories'] as $tableName) {
+            Schema::table($tableName, function (Blueprint $table) {
+                $table->dropColumn(['spent_cents', 'expense_count']);
+            });
+        }
+    }
+};
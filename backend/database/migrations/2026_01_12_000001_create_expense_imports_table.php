@@ -0,0 +1,38 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Database\Schema\Blueprint;
+use Illuminate\Support\Facades\Schema;
+
+return new class () extends Migration {
+    /**
+     * Run the migrations.
+     */
+    public function up(): void
+    {
+        Schema::create('expense_imports', function (Blueprint $table) {
+            $table->id();
+            $table->foreignId('user_id')->constrained()->onDelete('cascade');
+            $table->foreignId('budget_id')->constrained()->onDelete('cascade');
+            $table->string('status')->default('pending'); // 'pending', 'processing', 'completed', 'failed'
+            $table->string('file_path');
+            $table->unsignedInteger('processed_rows')->default(0);
+            $table->unsignedInteger('imported_rows')->default(0);
+            $table->unsignedInteger('error_count')->default(0);
+            $table->json('errors')->nullable(); // Premières erreurs de ligne (liste limitée)
+            $table->timestamp('started_at')->nullable();
+            $table->timestamp('finished_at')->nullable();
+            $table->timestamps();
+
+            $table->index(['budget_id', 'created_at']);
+        });
+    }
+
+    /**
+     * Reverse the migrations.
+     */
+    public function down(): void
+    {
+        Schema::dropIfExists('expense_imports');
+    }
+};
@@ -0,0 +1,49 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Database\Schema\Blueprint;
+use Illuminate\Support\Facades\DB;
+use Illuminate\Support\Facades\Schema;
+
+return new class () extends Migration {
+    /**
+     * Run the migrations.
+     */
+    public function up(): void
+    {
+        Schema::table('notifications', function (Blueprint $table) {
+            // Clé de déduplication (ex. budget_exceeded:{budget}:{sous-catégorie}),
+            // remplace la recherche dans le JSON de data
+            $table->string('dedup_key', 191)->nullable()->after('type');
+
+            $table->index(['user_id', 'dedup_key', 'read']);
+        });
+
+        // Renseigner la clé des alertes de dépassement existantes
+        DB::table('notifications')
+            ->where('type', 'budget_exceeded')
+            ->orderBy('id')
+            ->chunkById(500, function ($notifications) {
+                foreach ($notifications as $notification) {
+                    $data = json_decode($notification->data ?? '', true) ?: [];
+
+                    if (isset($data['budget_id'], $data['subcategory_id'])) {
+                        DB::table('notifications')
+                            ->where('id', $notification->id)
+                            ->update(['dedup_key' => "budget_exceeded:{$data['budget_id']}:{$data['subcategory_id']}"]);
+                    }
+                }
+            });
+    }
+
+    /**
+     * Reverse the migrations.
+     */
+    public function down(): void
+    {
+        Schema::table('notifications', function (Blueprint $table) {
+            $table->dropIndex(['user_id', 'dedup_key', 'read']);
+            $table->dropColumn('dedup_key');
+        });
+    }
+};
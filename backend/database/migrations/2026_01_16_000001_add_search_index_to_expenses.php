@@ -0,0 +1,45 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Database\Schema\Blueprint;
+use Illuminate\Support\Facades\DB;
+use Illuminate\Support\Facades\Schema;
+
+return new class () extends Migration {
+    /**
+     * Run the migrations.
+     */
+    public function up(): void
+    {
+        Schema::table('expenses', function (Blueprint $table) {
+            // Clé de la pagination par curseur de la recherche, par budget
+            $table->index(['budget_id', 'date', 'id']);
+        });
+
+        // Index plein texte disponible uniquement sur MySQL / MariaDB (repli LIKE ailleurs).
+        // La commande expenses:search-index permet de le reconstruire et de l'optimiser.
+        if (! in_array(DB::connection()->getDriverName(), ['mysql', 'mariadb'], true)) {
+            return;
+        }
+
+        Schema::table('expenses', function (Blueprint $table) {
+            $table->fullText(['label', 'notes'], 'expenses_label_notes_fulltext');
+        });
+    }
+
+    /**
+     * Reverse the migrations.
+     */
+    public function down(): void
+    {
+        if (Schema::hasIndex('expenses', 'expenses_label_notes_fulltext')) {
+            Schema::table('expenses', function (Blueprint $table) {
+                $table->dropFullText('expenses_label_notes_fulltext');
+            });
+        }
+
+        Schema::table('expenses', function (Blueprint $table) {
+            $table->dropIndex(['budget_id', 'date', 'id']);
+        });
+    }
+};
@@ -0,0 +1,39 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Support\Facades\DB;
+
+return new class () extends Migration {
+    /**
+     * Run the migrations.
+     */
+    public function up(): void
+    {
+        // Renseigner la clé des alertes de retard existantes (savings_goal_risk:{objectif})
+        DB::table('notifications')
+            ->where('type', 'savings_goal_risk')
+            ->whereNull('dedup_key')
+            ->orderBy('id')
+            ->chunkById(500, function ($notifications) {
+                foreach ($notifications as $notification) {
+                    $data = json_decode($notification->data ?? '', true) ?: [];
+
+                    if (isset($data['goal_id'])) {
+                        DB::table('notifications')
+                            ->where('id', $notification->id)
+                            ->update(['dedup_key' => "savings_goal_risk:{$data['goal_id']}"]);
+                    }
+                }
+            });
+    }
+
+    /**
+     * Reverse the migrations.
+     */
+    public function down(): void
+    {
+        DB::table('notifications')
+            ->where('type', 'savings_goal_risk')
+            ->update(['dedup_key' => null]);
+    }
+};
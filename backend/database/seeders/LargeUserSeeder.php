@@ -0,0 +1,135 @@
+<?php
+
+namespace Database\Seeders;
+
+use App\Models\Budget;
+use App\Models\BudgetCategory;
+use App\Models\BudgetSubcategory;
+use App\Models\BudgetTemplate;
+use App\Models\Expense;
+use App\Models\Tag;
+use App\Models\TemplateCategory;
+use App\Models\TemplateSubcategory;
+use App\Models\User;
+use App\Services\SpendRollupService;
+use Carbon\Carbon;
+use Illuminate\Database\Seeder;
+use Illuminate\Support\Arr;
+use Illuminate\Support\Facades\DB;
+
+/**
+ * Utilisateur avec un long historique, pour les benchmarks et le profilage :
+ * un budget par mois sur plusieurs années (jusqu'au mois courant), chacun avec
+ * ses catégories, sous-catégories et dépenses, et un template par défaut.
+ *
+ * Les dépenses sont construites avec ExpenseFactory puis insérées par lots ;
+ * les agrégats de dépenses sont recalculés budget par budget.
+ *
+ * Taille : BENCHMARK_YEARS (10) et BENCHMARK_EXPENSES_PER_MONTH (500).
+ */
+class LargeUserSeeder extends Seeder
+{
+    public const CATEGORIES = 8;
+
+    public const SUBCATEGORIES_PER_CATEGORY = 4;
+
+    public const TAGGED_EXPENSE_RATIO = 10;
+
+    public const INSERT_CHUNK_SIZE = 1000;
+
+    public ?User $user = null;
+
+    public int $years;
+
+    public int $expensesPerMonth;
+
+    public function __construct(?int $years = null, ?int $expensesPerMonth = null)
+    {
+        $this->years = $years ?? (int) env('BENCHMARK_YEARS', 10);
+        $this->expensesPerMonth = $expensesPerMonth ?? (int) env('BENCHMARK_EXPENSES_PER_MONTH', 500);
+    }
+
+    public function run(): void
+    {
+        $this->user = User::factory()->create([
+            'email' => 'benchmark-' . uniqid() . '@budgetmanager.local',
+        ]);
+
+        $template = BudgetTemplate::factory()->for($this->user)->create(['is_default' => true]);
+        TemplateCategory::factory()
+            ->count(self::CATEGORIES)
+            ->for($template, 'budgetTemplate')
+            ->has(TemplateSubcategory::factory()->count(self::SUBCATEGORIES_PER_CATEGORY), 'subcategories')
+            ->create();
+
+        $tagIds = collect(['Vacances', 'Travaux', 'Santé', 'Cadeaux', 'Voiture'])
+            ->map(fn ($name) => Tag::create(['user_id' => $this->user->id, 'name' => $name, 'color' => '#3b82f6'])->id)
+            ->all();
+
+        $months = $this->years * 12;
+        $firstMonth = now()->startOfMonth()->subMonthsNoOverflow($months - 1);
+
+        for ($offset = 0; $offset < $months; $offset++) {
+            $this->seedMonth($firstMonth->copy()->addMonthsNoOverflow($offset), $tagIds);
+        }
+
+        $this->command?->info(sprintf(
+            'Seeded user #%d (%s): %d budgets, %d expenses.',
+            $this->user->id,
+            $this->user->email,
+            $months,
+            $months * $this->expensesPerMonth
+        ));
+    }
+
+    /**
+     * Budget d'un mois avec ses catégories, sous-catégories et dépenses
+     */
+    private function seedMonth(Carbon $month, array $tagIds): void
+    {
+        $budget = Budget::factory()->for($this->user)->create([
+            'month' => $month,
+            'name' => 'Budget ' . $month->isoFormat('MMMM YYYY'),
+            'revenue_cents' => fake()->numberBetween(250000, 450000),
+        ]);
+
+        $subcategoryIds = BudgetCategory::factory()
+            ->count(self::CATEGORIES)
+            ->for($budget)
+            ->has(BudgetSubcategory::factory()->count(self::SUBCATEGORIES_PER_CATEGORY), 'subcategories')
+            ->create()
+            ->flatMap(fn ($category) => $category->subcategories->pluck('id'))
+            ->all();
+
+        $now = now();
+        $rows = Expense::factory()
+            ->count($this->expensesPerMonth)
+            ->state(fn () => [
+                'budget_id' => $budget->id,
+                'budget_subcategory_id' => Arr::random($subcategoryIds),
+                'date' => $month->copy()->addDays(fake()->numberBetween(0, $month->daysInMonth - 1))->toDateString(),
+                'created_at' => $now,
+                'updated_at' => $now,
+            ])
+            ->raw();
+
+        foreach (array_chunk($rows, self::INSERT_CHUNK_SIZE) as $chunk) {
+            DB::table('expenses')->insert($chunk);
+        }
+
+        // Une dépense sur TAGGED_EXPENSE_RATIO porte un tag
+        $tagRows = DB::table('expenses')
+            ->where('budget_id', $budget->id)
+            ->pluck('id')
+            ->filter(fn ($id) => $id % self::TAGGED_EXPENSE_RATIO === 0)
+            ->map(fn ($id) => ['expense_id' => $id, 'tag_id' => Arr::random($tagIds)])
+            ->values()
+            ->all();
+
+        foreach (array_chunk($tagRows, self::INSERT_CHUNK_SIZE) as $chunk) {
+            DB::table('expense_tag')->insert($chunk);
+        }
+
+        app(SpendRollupService::class)->rebuild($budget->id);
+    }
+}
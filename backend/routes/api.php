@@ -1,5 +1,6 @@
 <?php
 
+use App\Http\Controllers\AdminQueryProfileController;
 use App\Http\Controllers\AdminUserController;
 use App\Http\Controllers\AssetController;
 use App\Http\Controllers\AuthController;
@@ -82,6 +83,7 @@ Route::middleware('auth:sanctum')->group(function () {
     Route::delete('budgets/{budget}/subcategories/{subcategory}', [BudgetSubcategoryController::class, 'destroy']);
 
     // Expenses
+    Route::get('expenses/search', [ExpenseController::class, 'search']);
     Route::get('budgets/{budget}/expenses', [ExpenseController::class, 'index']);
     Route::post('budgets/{budget}/expenses', [ExpenseController::class, 'store']);
     Route::put('expenses/{expense}', [ExpenseController::class, 'update']);
@@ -162,8 +164,12 @@ Route::middleware('auth:sanctum')->group(function () {
         // CSV Import/Export (file operations)
         Route::post('budgets/{budget}/expenses/import-csv', [ExpenseController::class, 'importCsv']);
         Route::get('budgets/{budget}/expenses/export-csv', [ExpenseController::class, 'exportCsv']);
+        Route::get('budgets/{budget}/expenses/imports/{expenseImport}', [ExpenseController::class, 'importStatus']);
+    });
 
-        // All statistics endpoints (database-intensive)
+    // All statistics endpoints (database-intensive)
+    // stats.etag : ETag versionné, une requête conditionnelle inchangée renvoie 304 sans calcul
+    Route::middleware(['throttle:100,1', 'stats.etag'])->group(function () {
         Route::get('budgets/{budget}/stats/summary', [StatsController::class, 'summary']);
         Route::get('budgets/{budget}/stats/by-category', [StatsController::class, 'byCategory']);
         Route::get('budgets/{budget}/stats/by-subcategory', [StatsController::class, 'bySubcategory']);
@@ -172,6 +178,9 @@ Route::middleware('auth:sanctum')->group(function () {
         Route::get('budgets/{budget}/stats/top-categories', [StatsController::class, 'topCategories']);
         Route::get('stats/wealth-evolution', [StatsController::class, 'wealthEvolution']);
         Route::get('stats/savings-rate-evolution', [StatsController::class, 'savingsRateEvolution']);
+        Route::get('stats/time-series', [StatsController::class, 'timeSeries']);
+        // Données groupées de tous les widgets du tableau de bord (cache + ETag)
+        Route::get('stats/dashboard', [StatsController::class, 'dashboard']);
     });
 });
 
@@ -183,4 +192,8 @@ Route::middleware(['auth:sanctum', 'admin'])->prefix('admin')->group(function ()
     Route::put('users/{user}/password', [AdminUserController::class, 'updatePassword']);
     Route::put('users/{user}/restore', [AdminUserController::class, 'restore'])->withTrashed();
     Route::delete('users/{user}', [AdminUserController::class, 'destroy']);
+
+    // Profils SQL des requêtes échantillonnées
+    Route::get('query-profiles', [AdminQueryProfileController::class, 'index']);
+    Route::delete('query-profiles', [AdminQueryProfileController::class, 'destroy']);
 });
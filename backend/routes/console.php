@@ -1,6 +1,7 @@
 <?php
 
 use App\Console\Commands\CheckSavingsGoalsStatus;
+use App\Console\Commands\CreateRecurringExpenses;
 use App\Models\Notification;
 use Illuminate\Foundation\Inspiring;
 use Illuminate\Support\Facades\Artisan;
@@ -22,3 +23,9 @@ Artisan::command('notifications:cleanup', function () {
 
 // Schedule savings goals status check
 Schedule::command(CheckSavingsGoalsStatus::class)->daily();
+
+// Génération des budgets du mois pour tous les utilisateurs, en un batch de jobs
+Schedule::command(CreateRecurringExpenses::class)
+    ->monthlyOn(1, '01:00')
+    ->withoutOverlapping()
+    ->onOneServer();
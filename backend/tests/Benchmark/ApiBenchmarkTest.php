@@ -0,0 +1,126 @@
+<?php
+
+use App\Services\QueryProfiler;
+use Database\Seeders\LargeUserSeeder;
+use Illuminate\Support\Facades\Cache;
+use Illuminate\Support\Facades\DB;
+
+/*
+| Benchmarks des endpoints coûteux sur un utilisateur avec un long historique
+| (BENCHMARK_YEARS ans, BENCHMARK_EXPENSES_PER_MONTH dépenses par mois).
+|
+| Lancement : ./vendor/bin/pest --testsuite=Benchmark
+| Enregistrer les seuils (thresholds.json, avec la description de
+| l'environnement) : BENCHMARK_RECORD=1 ./vendor/bin/pest --testsuite=Benchmark
+*/
+
+/**
+ * Latence médiane (cache vidé avant chaque exécution) et nombre maximal de requêtes SQL
+ */
+function benchmarkEndpoint(callable $call, int $runs): array
+{
+    $profiler = app(QueryProfiler::class);
+    $durations = [];
+    $queries = 0;
+
+    for ($run = 0; $run < $runs; $run++) {
+        Cache::flush();
+
+        $start = hrtime(true);
+        [, $profile] = $profiler->measure(fn () => $call($run));
+        $durations[] = (hrtime(true) - $start) / 1e6;
+
+        $queries = max($queries, $profile['query_count']);
+    }
+
+    sort($durations);
+
+    return [
+        'ms' => round($durations[intdiv(count($durations), 2)], 1),
+        'queries' => $queries,
+    ];
+}
+
+test('expensive endpoints stay within the recorded latency and query thresholds', function () {
+    $thresholdsPath = __DIR__ . '/thresholds.json';
+
+    // Les seuils sont produits par l'enregistrement sur l'environnement de référence, jamais écrits à la main
+    if (! env('BENCHMARK_RECORD') && ! file_exists($thresholdsPath)) {
+        $this->markTestSkipped('No recorded thresholds. Run BENCHMARK_RECORD=1 make benchmark on the reference environment and commit tests/Benchmark/thresholds.json.');
+    }
+
+    $seeder = new LargeUserSeeder();
+    $seeder->run();
+
+    $user = $seeder->user;
+    $months = $user->budgets()->orderBy('month')->pluck('month')->map(fn ($month) => $month->format('Y-m'));
+    $latest = $user->budgets()->orderByDesc('month')->first();
+
+    $this->actingAs($user, 'sanctum');
+
+    $endpoints = [
+        'budgets.show' => fn () => $this->getJson("/api/budgets/{$latest->id}")->assertOk(),
+        'stats.dashboard' => fn () => $this->getJson("/api/stats/dashboard?budgetId={$latest->id}")->assertOk(),
+        'stats.time_series' => fn () => $this->getJson('/api/stats/time-series?' . http_build_query([
+            'from' => $months->first(),
+            'to' => $months->last(),
+            'dimension' => 'category',
+        ]))->assertOk(),
+        'budgets.compare' => fn () => $this->getJson('/api/budgets/compare?' . http_build_query([
+            'months' => $months->slice(-12)->values()->all(),
+        ]))->assertOk(),
+        'expenses.export_csv' => fn () => $this->get("/api/budgets/{$latest->id}/expenses/export-csv")
+            ->assertOk()
+            ->streamedContent(),
+        // Un nouveau mois à chaque exécution
+        'budgets.generate' => fn (int $run) => $this->postJson('/api/budgets/generate', [
+            'month' => now()->startOfMonth()->addMonthsNoOverflow($run + 1)->format('Y-m'),
+        ])->assertCreated(),
+    ];
+
+    $runs = max(1, (int) env('BENCHMARK_RUNS', 5));
+    $results = array_map(fn ($call) => benchmarkEndpoint($call, $runs), $endpoints);
+
+    $dataset = ['years' => $seeder->years, 'expenses_per_month' => $seeder->expensesPerMonth];
+
+    if (env('BENCHMARK_RECORD')) {
+        // 50% de marge sur la latence, nombre de requêtes exact
+        $recorded = [
+            'environment' => [
+                'recorded_at' => now()->toIso8601String(),
+                'php' => PHP_VERSION,
+                'database' => DB::connection()->getDriverName() . ' ' . DB::selectOne('select version() as version')->version,
+                'dataset' => $dataset,
+                'runs' => $runs,
+            ],
+            'endpoints' => array_map(fn ($result) => [
+                'max_ms' => (int) ceil($result['ms'] * 1.5),
+                'max_queries' => $result['queries'],
+            ], $results),
+        ];
+
+        file_put_contents($thresholdsPath, json_encode($recorded, JSON_PRETTY_PRINT) . "\n");
+    }
+
+    $recorded = json_decode(file_get_contents($thresholdsPath), true);
+    $thresholds = $recorded['endpoints'];
+
+    expect($recorded['environment']['dataset'])->toBe($dataset, 'Thresholds were recorded on a different dataset size');
+
+    foreach ($results as $name => $result) {
+        fwrite(STDERR, sprintf(
+            "%-22s %8.1f ms (max %d) %4d queries (max %d)\n",
+            $name,
+            $result['ms'],
+            $thresholds[$name]['max_ms'] ?? 0,
+            $result['queries'],
+            $thresholds[$name]['max_queries'] ?? 0
+        ));
+    }
+
+    foreach ($results as $name => $result) {
+        expect($thresholds)->toHaveKey($name);
+        expect($result['queries'])->toBeLessThanOrEqual($thresholds[$name]['max_queries'], "{$name}: query count regression");
+        expect($result['ms'])->toBeLessThanOrEqual($thresholds[$name]['max_ms'], "{$name}: latency regression");
+    }
+});
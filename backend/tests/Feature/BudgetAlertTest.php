@@ -0,0 +1,77 @@
+<?php
+
+use App\Jobs\EvaluateBudgetAlerts;
+use App\Models\Budget;
+use App\Models\BudgetCategory;
+use App\Models\BudgetSubcategory;
+use App\Models\Notification;
+use App\Models\User;
+use App\Services\NotificationService;
+use Carbon\Carbon;
+use Illuminate\Support\Facades\Queue;
+
+function createAlertSubcategory(User $user, int $plannedCents = 10000): BudgetSubcategory
+{
+    $budget = Budget::factory()->for($user)->create();
+    $category = BudgetCategory::factory()->for($budget)->create();
+
+    return BudgetSubcategory::factory()->for($category, 'budgetCategory')->create([
+        'planned_amount_cents' => $plannedCents,
+    ]);
+}
+
+test('exceeding a subcategory creates a single deduplicated alert', function () {
+    $user = User::factory()->create();
+    $subcategory = createAlertSubcategory($user);
+    $budgetId = $subcategory->budgetCategory->budget_id;
+
+    foreach ([12000, 3000] as $amount) {
+        $this->actingAs($user, 'sanctum')
+            ->postJson("/api/budgets/{$budgetId}/expenses", [
+                'budget_subcategory_id' => $subcategory->id,
+                'date' => Carbon::now()->format('Y-m-d'),
+                'label' => 'Achat',
+                'amount_cents' => $amount,
+            ])
+            ->assertStatus(201);
+    }
+
+    // QUEUE_CONNECTION=sync : l'évaluation est exécutée après le commit
+    $notifications = Notification::where('user_id', $user->id)->where('type', 'budget_exceeded')->get();
+
+    expect($notifications)->toHaveCount(1);
+    expect($notifications->first()->dedup_key)
+        ->toBe(NotificationService::budgetExceededKey($budgetId, $subcategory->id));
+    expect($notifications->first()->data['actual_cents'])->toBe(15000);
+});
+
+test('a new alert is created once the previous one has been read', function () {
+    $user = User::factory()->create();
+    $subcategory = createAlertSubcategory($user);
+    $budgetId = $subcategory->budgetCategory->budget_id;
+    $subcategory->forceFill(['spent_cents' => 11000])->save();
+
+    $service = app(NotificationService::class);
+
+    expect($service->checkBudgetAlerts($budgetId))->toBe(1);
+    expect($service->checkBudgetAlerts($budgetId))->toBe(0);
+
+    Notification::where('user_id', $user->id)->update(['read' => true]);
+
+    expect($service->checkBudgetAlerts($budgetId))->toBe(1);
+});
+
+test('alert checks on the same subcategory are coalesced into one queued job', function () {
+    Queue::fake();
+
+    $user = User::factory()->create();
+    $subcategory = createAlertSubcategory($user);
+    $budgetId = $subcategory->budgetCategory->budget_id;
+
+    $service = app(NotificationService::class);
+    $service->scheduleBudgetAlertCheck($budgetId, $subcategory->id);
+    $service->scheduleBudgetAlertCheck($budgetId, $subcategory->id);
+    $service->scheduleBudgetAlertCheck($budgetId);
+
+    Queue::assertPushed(EvaluateBudgetAlerts::class, 2);
+});
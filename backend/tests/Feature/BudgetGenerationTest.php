@@ -0,0 +1,87 @@
+<?php
+
+use App\Models\Budget;
+use App\Models\BudgetTemplate;
+use App\Models\RecurringExpense;
+use App\Models\TemplateCategory;
+use App\Models\TemplateSubcategory;
+use App\Models\User;
+use App\Services\BudgetGenerationService;
+use Carbon\Carbon;
+
+function createTemplateWithRecurringExpense(User $user): BudgetTemplate
+{
+    $template = BudgetTemplate::factory()->for($user)->create(['is_default' => true]);
+    $logement = TemplateCategory::factory()->for($template, 'budgetTemplate')->create(['name' => 'Logement', 'sort_order' => 1]);
+    $loisirs = TemplateCategory::factory()->for($template, 'budgetTemplate')->create(['name' => 'Loisirs', 'sort_order' => 2]);
+
+    TemplateSubcategory::factory()->for($logement, 'templateCategory')->create([
+        'name' => 'Loyer',
+        'default_spent_cents' => 80000,
+        'sort_order' => 1,
+    ]);
+    // Même nom de sous-catégorie dans une autre catégorie : la catégorie doit départager
+    TemplateSubcategory::factory()->for($logement, 'templateCategory')->create(['name' => 'Abonnements', 'sort_order' => 2]);
+    $streaming = TemplateSubcategory::factory()->for($loisirs, 'templateCategory')->create(['name' => 'Abonnements', 'sort_order' => 1]);
+
+    RecurringExpense::factory()->for($user)->monthly()->create([
+        'template_subcategory_id' => $streaming->id,
+        'label' => 'Netflix',
+        'amount_cents' => 1499,
+        'day_of_month' => 5,
+        'start_date' => Carbon::parse('2020-01-01'),
+    ]);
+
+    return $template;
+}
+
+test('budget generation copies the template and attaches recurring expenses', function () {
+    $user = User::factory()->create();
+    createTemplateWithRecurringExpense($user);
+
+    $response = $this->actingAs($user, 'sanctum')
+        ->postJson('/api/budgets/generate', ['month' => '2026-03']);
+
+    $response->assertStatus(201);
+
+    $budget = Budget::with('categories.subcategories.expenses')->find($response->json('id'));
+
+    expect($budget->categories->pluck('name')->all())->toBe(['Logement', 'Loisirs']);
+    expect($budget->categories[0]->subcategories)->toHaveCount(2);
+
+    $streaming = $budget->categories[1]->subcategories->first();
+    expect($streaming->expenses->pluck('label')->all())->toBe(['Netflix']);
+    expect($streaming->expenses->first()->date->format('Y-m-d'))->toBe('2026-03-05');
+
+    expect($budget->spent_cents)->toBe(81499);
+    expect($budget->expense_count)->toBe(2);
+    expect($budget->categories[0]->subcategories[1]->expense_count)->toBe(0);
+});
+
+test('budget generation can create several months and skips existing ones', function () {
+    $user = User::factory()->create();
+    $template = createTemplateWithRecurringExpense($user);
+    Budget::factory()->for($user)->create(['month' => '2026-02-01']);
+
+    $budgets = app(BudgetGenerationService::class)
+        ->generateMonths($user, $template, Carbon::parse('2026-01-01'), 3);
+
+    expect($budgets->map(fn ($budget) => $budget->month->format('Y-m'))->all())->toBe(['2026-01', '2026-03']);
+    expect(Budget::where('user_id', $user->id)->count())->toBe(3);
+});
+
+test('monthly generation command is idempotent', function () {
+    $user = User::factory()->create();
+    createTemplateWithRecurringExpense($user);
+    $withoutTemplate = User::factory()->create();
+
+    $this->artisan('app:create-recurring-expenses', ['--month' => '2026-04', '--sync' => true])
+        ->assertSuccessful();
+    $this->artisan('app:create-recurring-expenses', ['--month' => '2026-04', '--sync' => true])
+        ->assertSuccessful();
+
+    $budget = Budget::where('user_id', $user->id)->sole();
+    expect($budget->month->format('Y-m'))->toBe('2026-04');
+    expect($budget->expense_count)->toBe(2);
+    expect(Budget::where('user_id', $withoutTemplate->id)->exists())->toBeFalse();
+});
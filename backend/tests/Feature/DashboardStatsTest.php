@@ -0,0 +1,134 @@
+<?php
+
+use App\Models\Budget;
+use App\Models\BudgetCategory;
+use App\Models\BudgetSubcategory;
+use App\Models\Expense;
+use App\Models\User;
+use App\Services\DashboardStatsService;
+use Carbon\Carbon;
+use Illuminate\Support\Facades\DB;
+
+test('dashboard stats endpoint returns every widget section', function () {
+    $user = User::factory()->create();
+    $budget = Budget::factory()->for($user)->create(['revenue_cents' => 200000]);
+    $category = BudgetCategory::factory()->for($budget)->create([
+        'name' => 'Alimentation',
+        'planned_amount_cents' => 50000,
+    ]);
+    $subcategory = BudgetSubcategory::factory()->for($category, 'budgetCategory')->create();
+    Expense::factory()->for($budget)->for($subcategory, 'budgetSubcategory')->create(['amount_cents' => 30000]);
+
+    $response = $this->actingAs($user, 'sanctum')
+        ->getJson("/api/stats/dashboard?budgetId={$budget->id}");
+
+    $response->assertStatus(200)
+        ->assertHeader('ETag')
+        ->assertJsonStructure([
+            'budgetId',
+            'summary' => ['totalPlannedCents', 'totalActualCents', 'expenseCount'],
+            'byCategory',
+            'topCategories',
+            'expenseDistribution',
+            'savingsRate',
+            'wealthEvolution' => ['labels', 'datasets'],
+        ]);
+
+    expect($response->json('summary.totalActualCents'))->toBe(30000);
+    expect($response->json('topCategories.0.name'))->toBe('Alimentation');
+    expect($response->json('savingsRate.0.expensesCents'))->toBe(30000);
+});
+
+test('dashboard stats return 304 when the etag still matches', function () {
+    $user = User::factory()->create();
+    $budget = Budget::factory()->for($user)->create();
+
+    $first = $this->actingAs($user, 'sanctum')
+        ->getJson("/api/stats/dashboard?budgetId={$budget->id}");
+    $etag = $first->headers->get('ETag');
+
+    $this->actingAs($user, 'sanctum')
+        ->getJson("/api/stats/dashboard?budgetId={$budget->id}", ['If-None-Match' => $etag])
+        ->assertStatus(304);
+});
+
+test('dashboard stats etag changes when an expense is added', function () {
+    $user = User::factory()->create();
+    $budget = Budget::factory()->for($user)->create();
+    $category = BudgetCategory::factory()->for($budget)->create();
+    $subcategory = BudgetSubcategory::factory()->for($category, 'budgetCategory')->create();
+
+    $first = $this->actingAs($user, 'sanctum')
+        ->getJson("/api/stats/dashboard?budgetId={$budget->id}");
+    $etag = $first->headers->get('ETag');
+
+    Expense::factory()->for($budget)->for($subcategory, 'budgetSubcategory')->create(['amount_cents' => 4200]);
+
+    $second = $this->actingAs($user, 'sanctum')
+        ->getJson("/api/stats/dashboard?budgetId={$budget->id}", ['If-None-Match' => $etag]);
+
+    $second->assertStatus(200);
+    expect($second->headers->get('ETag'))->not->toBe($etag);
+    expect($second->json('summary.totalActualCents'))->toBe(4200);
+});
+
+test('dashboard stats are recomputed when the month changes without any write', function () {
+    $this->travelTo(Carbon::parse('2026-01-31 23:50:00'));
+
+    $user = User::factory()->create();
+    $budget = Budget::factory()->for($user)->create();
+
+    $first = $this->actingAs($user, 'sanctum')
+        ->getJson("/api/stats/dashboard?budgetId={$budget->id}");
+    $etag = $first->headers->get('ETag');
+
+    $this->travelTo(Carbon::parse('2026-02-01 00:05:00'));
+
+    $second = $this->actingAs($user, 'sanctum')
+        ->getJson("/api/stats/dashboard?budgetId={$budget->id}", ['If-None-Match' => $etag]);
+
+    $second->assertStatus(200);
+    expect($second->headers->get('ETag'))->not->toBe($etag);
+});
+
+test('dashboard stats version is only bumped once the write is committed', function () {
+    $user = User::factory()->create();
+    $budget = Budget::factory()->for($user)->create();
+    $category = BudgetCategory::factory()->for($budget)->create();
+    $subcategory = BudgetSubcategory::factory()->for($category, 'budgetCategory')->create();
+
+    $dashboardStats = app(DashboardStatsService::class);
+    $before = $dashboardStats->version($user->id);
+    $etag = $this->actingAs($user, 'sanctum')
+        ->getJson("/api/stats/dashboard?budgetId={$budget->id}")
+        ->headers->get('ETag');
+
+    DB::transaction(function () use ($budget, $subcategory, $user, $dashboardStats, $before, $etag) {
+        Expense::factory()->for($budget)->for($subcategory, 'budgetSubcategory')->create(['amount_cents' => 4200]);
+
+        // Lecture avant le commit : la version (et donc l'ETag) ne change pas encore
+        expect($dashboardStats->version($user->id))->toBe($before);
+
+        $this->actingAs($user, 'sanctum')
+            ->getJson("/api/stats/dashboard?budgetId={$budget->id}", ['If-None-Match' => $etag])
+            ->assertStatus(304);
+    });
+
+    expect($dashboardStats->version($user->id))->toBeGreaterThan($before);
+
+    $after = $this->actingAs($user, 'sanctum')
+        ->getJson("/api/stats/dashboard?budgetId={$budget->id}", ['If-None-Match' => $etag]);
+
+    $after->assertStatus(200);
+    expect($after->json('summary.totalActualCents'))->toBe(4200);
+});
+
+test('user cannot get dashboard stats for another users budget', function () {
+    $owner = User::factory()->create();
+    $other = User::factory()->create();
+    $budget = Budget::factory()->for($owner)->create();
+
+    $this->actingAs($other, 'sanctum')
+        ->getJson("/api/stats/dashboard?budgetId={$budget->id}")
+        ->assertStatus(404);
+});
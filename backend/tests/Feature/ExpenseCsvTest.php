@@ -0,0 +1,134 @@
+<?php
+
+use App\Jobs\EvaluateBudgetAlerts;
+use App\Jobs\ImportExpensesCsv;
+use App\Models\Budget;
+use App\Models\BudgetCategory;
+use App\Models\BudgetSubcategory;
+use App\Models\Expense;
+use App\Models\ExpenseImport;
+use App\Models\User;
+use App\Services\CsvImportService;
+use Illuminate\Http\UploadedFile;
+use Illuminate\Support\Facades\Queue;
+use Illuminate\Support\Facades\Storage;
+
+test('csv import is queued and reports progress through the status endpoint', function () {
+    Storage::fake('local');
+
+    $user = User::factory()->create();
+    $budget = Budget::factory()->for($user)->create();
+    $category = BudgetCategory::factory()->for($budget)->create();
+    $subcategory = BudgetSubcategory::factory()->for($category, 'budgetCategory')->create(['name' => 'Courses']);
+
+    $csv = "date,label,amount_cents,subcategory,payment_method,notes\n";
+    for ($i = 1; $i <= 1200; $i++) {
+        $csv .= "2026-01-15,Achat {$i},100,Courses,CB,\n";
+    }
+    $csv .= "2026-01-15,Inconnu,100,Loisirs,CB,\n";
+
+    $response = $this->actingAs($user, 'sanctum')
+        ->post("/api/budgets/{$budget->id}/expenses/import-csv", [
+            'file' => UploadedFile::fake()->createWithContent('expenses.csv', $csv),
+        ], ['Accept' => 'application/json']);
+
+    $response->assertStatus(202);
+    $importId = $response->json('id');
+
+    // QUEUE_CONNECTION=sync : le job est déjà exécuté
+    $status = $this->actingAs($user, 'sanctum')
+        ->getJson("/api/budgets/{$budget->id}/expenses/imports/{$importId}");
+
+    $status->assertStatus(200)
+        ->assertJson([
+            'status' => ExpenseImport::STATUS_COMPLETED,
+            'processedRows' => 1201,
+            'importedRows' => 1200,
+            'errorCount' => 1,
+        ]);
+
+    expect(Expense::where('budget_id', $budget->id)->count())->toBe(1200);
+    expect($subcategory->fresh()->spent_cents)->toBe(120000);
+    expect($budget->fresh()->expense_count)->toBe(1200);
+});
+
+test('csv import schedules the budget alert check instead of running it inline', function () {
+    Storage::fake('local');
+
+    $user = User::factory()->create();
+    $budget = Budget::factory()->for($user)->create();
+    $category = BudgetCategory::factory()->for($budget)->create();
+    BudgetSubcategory::factory()->for($category, 'budgetCategory')->create(['name' => 'Courses']);
+
+    $import = ExpenseImport::create([
+        'user_id' => $user->id,
+        'budget_id' => $budget->id,
+        'status' => ExpenseImport::STATUS_PENDING,
+        'file_path' => 'imports/expenses.csv',
+    ]);
+    Storage::disk('local')->put(
+        $import->file_path,
+        "date,label,amount_cents,subcategory,payment_method,notes\n2026-01-15,Achat,100,Courses,CB,\n"
+    );
+
+    Queue::fake();
+
+    app()->call([new ImportExpensesCsv($import), 'handle']);
+
+    Queue::assertPushed(EvaluateBudgetAlerts::class, fn ($job) => $job->budgetId === $budget->id && $job->subcategoryId === null);
+    expect($import->fresh()->status)->toBe(ExpenseImport::STATUS_COMPLETED);
+});
+
+test('csv import rejects a file with an invalid header', function () {
+    Storage::fake('local');
+
+    $user = User::factory()->create();
+    $budget = Budget::factory()->for($user)->create();
+
+    $response = $this->actingAs($user, 'sanctum')
+        ->post("/api/budgets/{$budget->id}/expenses/import-csv", [
+            'file' => UploadedFile::fake()->createWithContent('expenses.csv', "foo,bar\n1,2\n"),
+        ], ['Accept' => 'application/json']);
+
+    $response->assertStatus(422);
+    expect(ExpenseImport::count())->toBe(0);
+});
+
+test('csv import rejects a file larger than the size limit', function () {
+    Storage::fake('local');
+
+    $user = User::factory()->create();
+    $budget = Budget::factory()->for($user)->create();
+
+    $response = $this->actingAs($user, 'sanctum')
+        ->post("/api/budgets/{$budget->id}/expenses/import-csv", [
+            'file' => UploadedFile::fake()->create('expenses.csv', CsvImportService::MAX_FILE_SIZE_KB + 1, 'text/csv'),
+        ], ['Accept' => 'application/json']);
+
+    $response->assertStatus(422)
+        ->assertJsonPath('errors.0', 'Le fichier est trop volumineux. Taille maximale : 2048 Ko');
+    expect(ExpenseImport::count())->toBe(0);
+    Storage::disk('local')->assertDirectoryEmpty('imports');
+});
+
+test('csv export streams every expense of the budget', function () {
+    $user = User::factory()->create();
+    $budget = Budget::factory()->for($user)->create();
+    $category = BudgetCategory::factory()->for($budget)->create(['name' => 'Maison']);
+    $subcategory = BudgetSubcategory::factory()->for($category, 'budgetCategory')->create(['name' => 'Loyer']);
+    Expense::factory()->for($budget)->for($subcategory, 'budgetSubcategory')->create([
+        'label' => 'Loyer "janvier"',
+        'amount_cents' => 80000,
+        'notes' => null,
+    ]);
+
+    $response = $this->actingAs($user, 'sanctum')
+        ->get("/api/budgets/{$budget->id}/expenses/export-csv");
+
+    $response->assertStatus(200);
+
+    $lines = explode("\n", trim($response->streamedContent()));
+    expect($lines)->toHaveCount(2);
+    expect($lines[0])->toBe('date,label,amount_cents,category,subcategory,payment_method,notes');
+    expect($lines[1])->toContain('"Loyer ""janvier""",80000,"Maison","Loyer"');
+});
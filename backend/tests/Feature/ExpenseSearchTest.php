@@ -0,0 +1,128 @@
+<?php
+
+use App\Models\Budget;
+use App\Models\BudgetCategory;
+use App\Models\BudgetSubcategory;
+use App\Models\Expense;
+use App\Models\Tag;
+use App\Models\User;
+use App\Services\ExpenseSearchService;
+use Carbon\Carbon;
+use Illuminate\Support\Facades\DB;
+
+function createSearchExpense(User $user, string $date, array $attributes = []): Expense
+{
+    $month = Carbon::parse($date)->startOfMonth();
+    $budget = Budget::where('user_id', $user->id)->where('month', $month->toDateString())->first()
+        ?? Budget::factory()->for($user)->create(['month' => $month]);
+    $category = BudgetCategory::factory()->for($budget)->create();
+    $subcategory = BudgetSubcategory::factory()->for($category, 'budgetCategory')->create();
+
+    return Expense::factory()->for($budget)->for($subcategory, 'budgetSubcategory')->create(array_merge([
+        'date' => $date,
+        'amount_cents' => 1000,
+        'payment_method' => 'CB',
+        'notes' => null,
+    ], $attributes));
+}
+
+test('search spans all budgets of the user and pages with a cursor on date and id', function () {
+    $user = User::factory()->create();
+    $otherUser = User::factory()->create();
+
+    $expected = collect([
+        createSearchExpense($user, '2025-03-10'),
+        createSearchExpense($user, '2024-11-02'),
+        createSearchExpense($user, '2024-11-02'),
+        createSearchExpense($user, '2023-01-20'),
+    ])->sortBy([['date', 'desc'], ['id', 'desc']])->pluck('id')->values()->all();
+    createSearchExpense($otherUser, '2025-03-10');
+
+    $first = $this->actingAs($user, 'sanctum')->getJson('/api/expenses/search?perPage=3');
+
+    $first->assertStatus(200)->assertJsonCount(3, 'data');
+    expect($first->json('nextCursor'))->not->toBeNull();
+
+    $second = $this->actingAs($user, 'sanctum')
+        ->getJson('/api/expenses/search?perPage=3&cursor=' . $first->json('nextCursor'));
+
+    $second->assertStatus(200)->assertJsonCount(1, 'data');
+    expect($second->json('nextCursor'))->toBeNull();
+
+    $ids = array_merge(array_column($first->json('data'), 'id'), array_column($second->json('data'), 'id'));
+    expect($ids)->toBe($expected);
+
+    // Retour à la page précédente
+    $previous = $this->actingAs($user, 'sanctum')
+        ->getJson('/api/expenses/search?perPage=3&cursor=' . $second->json('prevCursor'));
+
+    expect(array_column($previous->json('data'), 'id'))->toBe(array_slice($expected, 0, 3));
+});
+
+test('search falls back to a plain join on servers without lateral joins', function () {
+    app()->instance(ExpenseSearchService::class, new class () extends ExpenseSearchService {
+        protected function supportsLateralJoins(): bool
+        {
+            return false;
+        }
+    });
+
+    $user = User::factory()->create();
+    $expected = collect([
+        createSearchExpense($user, '2025-03-10'),
+        createSearchExpense($user, '2024-11-02'),
+        createSearchExpense($user, '2023-01-20'),
+    ])->sortBy([['date', 'desc'], ['id', 'desc']])->pluck('id')->values()->all();
+
+    $queries = [];
+    DB::listen(function ($query) use (&$queries) {
+        $queries[] = strtolower($query->sql);
+    });
+
+    $first = $this->actingAs($user, 'sanctum')->getJson('/api/expenses/search?perPage=2');
+    $second = $this->actingAs($user, 'sanctum')
+        ->getJson('/api/expenses/search?perPage=2&cursor=' . $first->json('nextCursor'));
+
+    $ids = array_merge(array_column($first->json('data'), 'id'), array_column($second->json('data'), 'id'));
+    expect($ids)->toBe($expected);
+    expect(collect($queries)->filter(fn ($sql) => str_contains($sql, 'lateral')))->toBeEmpty();
+});
+
+test('search filters by amount range, payment method, tag and date', function () {
+    $user = User::factory()->create();
+    $tag = Tag::create(['user_id' => $user->id, 'name' => 'Vacances', 'color' => '#ff0000']);
+
+    $match = createSearchExpense($user, '2024-07-14', ['amount_cents' => 25000, 'payment_method' => 'Virement']);
+    $match->tags()->attach($tag->id);
+    createSearchExpense($user, '2024-07-15', ['amount_cents' => 25000, 'payment_method' => 'CB'])->tags()->attach($tag->id);
+    createSearchExpense($user, '2024-07-16', ['amount_cents' => 500, 'payment_method' => 'Virement'])->tags()->attach($tag->id);
+    createSearchExpense($user, '2024-07-17', ['amount_cents' => 25000, 'payment_method' => 'Virement']);
+    createSearchExpense($user, '2023-07-14', ['amount_cents' => 25000, 'payment_method' => 'Virement'])->tags()->attach($tag->id);
+
+    $response = $this->actingAs($user, 'sanctum')->getJson('/api/expenses/search?' . http_build_query([
+        'minAmountCents' => 10000,
+        'maxAmountCents' => 30000,
+        'paymentMethod' => 'Virement',
+        'tagId' => $tag->id,
+        'from' => '2024-01-01',
+        'to' => '2024-12-31',
+    ]));
+
+    $response->assertStatus(200)
+        ->assertJsonCount(1, 'data')
+        ->assertJsonPath('data.0.id', $match->id);
+});
+
+test('search matches labels and notes', function () {
+    $user = User::factory()->create();
+    $label = createSearchExpense($user, '2024-02-01', ['label' => 'Facture EDF']);
+    $notes = createSearchExpense($user, '2024-03-01', ['label' => 'Prélèvement', 'notes' => 'EDF régularisation']);
+    createSearchExpense($user, '2024-04-01', ['label' => 'Courses']);
+
+    // Terme plus court que les mots indexés : recherche LIKE, indépendante de la
+    // visibilité de l'index plein texte (mis à jour au commit) dans les tests
+    $response = $this->actingAs($user, 'sanctum')->getJson('/api/expenses/search?q=ED');
+
+    $response->assertStatus(200)->assertJsonCount(2, 'data');
+    expect(array_column($response->json('data'), 'id'))->toBe([$notes->id, $label->id]);
+});
@@ -0,0 +1,82 @@
+<?php
+
+use App\Models\Budget;
+use App\Models\Role;
+use App\Models\User;
+use App\Services\QueryProfiler;
+use Illuminate\Support\Facades\DB;
+
+beforeEach(function () {
+    // Create roles if they don't exist
+    if (! Role::where('label', 'user')->exists()) {
+        Role::create(['label' => 'user']);
+    }
+    if (! Role::where('label', 'admin')->exists()) {
+        Role::create(['label' => 'admin']);
+    }
+});
+
+test('profiler reports repeated statements as n+1 patterns', function () {
+    config(['profiling.repeated_query_threshold' => 5, 'profiling.slowest_statements' => 3]);
+
+    $profiler = app(QueryProfiler::class);
+
+    [, $profile] = $profiler->measure(function () {
+        for ($id = 1; $id <= 6; $id++) {
+            DB::table('budgets')->where('id', $id)->first();
+        }
+        DB::table('budgets')->whereIn('id', [1, 2])->get();
+        DB::table('budgets')->whereIn('id', [1, 2, 3])->get();
+    });
+
+    expect($profile['query_count'])->toBe(8);
+    expect($profile['slowest'])->toHaveCount(3);
+    expect($profile['repeated'])->toHaveCount(1);
+    expect($profile['repeated'][0]['count'])->toBe(6);
+});
+
+test('sampled requests are profiled and listed on the admin endpoint', function () {
+    config(['profiling.enabled' => true, 'profiling.sample_rate' => 1]);
+
+    $user = User::factory()->create();
+    $budget = Budget::factory()->for($user)->create();
+    $admin = User::factory()->create(['role_id' => Role::where('label', 'admin')->first()->id]);
+
+    $this->actingAs($user, 'sanctum')->getJson("/api/budgets/{$budget->id}")->assertStatus(200);
+
+    $this->actingAs($user, 'sanctum')->getJson('/api/admin/query-profiles')->assertStatus(403);
+
+    $response = $this->actingAs($admin, 'sanctum')
+        ->getJson('/api/admin/query-profiles?path=budgets');
+
+    $response->assertStatus(200)
+        ->assertJsonPath('enabled', true)
+        ->assertJsonPath('profiles.0.path', "api/budgets/{$budget->id}")
+        ->assertJsonStructure([
+            'profiles' => [
+                '*' => ['method', 'path', 'status', 'durationMs', 'queryCount', 'queryTimeMs', 'slowest', 'repeated'],
+            ],
+        ]);
+
+    $this->actingAs($admin, 'sanctum')->deleteJson('/api/admin/query-profiles')->assertStatus(200);
+    expect(app(QueryProfiler::class)->recent())->toBe([]);
+});
+
+test('streamed responses are profiled once their body has been sent', function () {
+    config(['profiling.enabled' => true, 'profiling.sample_rate' => 1]);
+
+    $user = User::factory()->create();
+    $budget = Budget::factory()->for($user)->create();
+
+    $response = $this->actingAs($user, 'sanctum')
+        ->get("/api/budgets/{$budget->id}/expenses/export-csv");
+
+    // Le profil n'est enregistré qu'à la fin de l'envoi du flux
+    expect(app(QueryProfiler::class)->recent())->toBe([]);
+
+    $response->streamedContent();
+
+    $profile = app(QueryProfiler::class)->recent()[0];
+    expect($profile['path'])->toBe("api/budgets/{$budget->id}/expenses/export-csv");
+    expect($profile['query_count'])->toBeGreaterThan(0);
+});
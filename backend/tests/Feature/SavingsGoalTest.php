@@ -1,10 +1,13 @@
 <?php
 
 use App\Models\Asset;
+use App\Models\Notification;
+use App\Models\NotificationSetting;
 use App\Models\Role;
 use App\Models\SavingsGoal;
 use App\Models\SavingsGoalContribution;
 use App\Models\User;
+use App\Services\SavingsGoalService;
 use Carbon\Carbon;
 
 beforeEach(function () {
@@ -243,3 +246,58 @@ test('contribution amount must be positive', function () {
     $response->assertStatus(422)
         ->assertJsonValidationErrors(['amountCents']);
 });
+
+test('daily check creates a single risk notification for goals late at mid-term', function () {
+    $user = User::factory()->create();
+    $goalAttributes = [
+        'start_date' => Carbon::today()->subDays(50),
+        'target_date' => Carbon::today()->addDays(50),
+        'target_amount_cents' => 100000,
+        'notify_risk' => true,
+        'notify_reminder' => false,
+    ];
+
+    $late = SavingsGoal::factory()->for($user)->create($goalAttributes + ['current_amount_cents' => 10000]);
+    SavingsGoal::factory()->for($user)->create($goalAttributes + ['current_amount_cents' => 60000]);
+    SavingsGoal::factory()->for($user)->create(array_merge($goalAttributes, [
+        'start_date' => Carbon::today()->subDays(10),
+        'current_amount_cents' => 0,
+    ]));
+
+    $this->artisan('savings-goals:check-status')->assertSuccessful();
+    $this->artisan('savings-goals:check-status')->assertSuccessful();
+
+    $notifications = Notification::where('user_id', $user->id)->where('type', 'savings_goal_risk')->get();
+
+    expect($notifications)->toHaveCount(1);
+    expect($notifications->first()->dedup_key)->toBe(SavingsGoalService::riskKey($late->id));
+    expect($notifications->first()->data['progress_percentage'])->toEqual(10);
+
+    // Paramètres par défaut créés pour l'utilisateur
+    expect(NotificationSetting::where('user_id', $user->id)->exists())->toBeTrue();
+});
+
+test('monthly reminders are sent once per goal and month', function () {
+    $user = User::factory()->create();
+    $goal = SavingsGoal::factory()->for($user)->create([
+        'notify_risk' => false,
+        'notify_reminder' => true,
+        'reminder_day_of_month' => Carbon::now()->day,
+        'suggested_monthly_amount_cents' => 15000,
+    ]);
+    SavingsGoal::factory()->for($user)->create([
+        'notify_risk' => false,
+        'notify_reminder' => false,
+        'reminder_day_of_month' => Carbon::now()->day,
+    ]);
+
+    $service = app(SavingsGoalService::class);
+
+    expect($service->sendMonthlyReminders()['created'])->toBe(1);
+    expect($service->sendMonthlyReminders()['created'])->toBe(0);
+
+    $reminder = Notification::where('user_id', $user->id)->where('type', 'savings_goal_reminder')->sole();
+
+    expect($reminder->dedup_key)->toBe(SavingsGoalService::reminderKey($goal->id, Carbon::now()));
+    expect($reminder->data['suggested_amount_cents'])->toBe(15000);
+});
@@ -0,0 +1,101 @@
+<?php
+
+use App\Models\Budget;
+use App\Models\BudgetCategory;
+use App\Models\BudgetSubcategory;
+use App\Models\Expense;
+use App\Models\User;
+use Carbon\Carbon;
+use Illuminate\Support\Facades\DB;
+
+test('rollups are updated when expenses are created, updated and deleted', function () {
+    $user = User::factory()->create();
+    $budget = Budget::factory()->for($user)->create();
+    $category = BudgetCategory::factory()->for($budget)->create();
+    $subcategory = BudgetSubcategory::factory()->for($category, 'budgetCategory')->create();
+
+    $response = $this->actingAs($user, 'sanctum')
+        ->postJson("/api/budgets/{$budget->id}/expenses", [
+            'budget_subcategory_id' => $subcategory->id,
+            'date' => Carbon::now()->format('Y-m-d'),
+            'label' => 'Courses',
+            'amount_cents' => 5000,
+        ]);
+
+    $response->assertStatus(201);
+    $expenseId = $response->json('id');
+
+    expect($subcategory->fresh()->spent_cents)->toBe(5000);
+    expect($category->fresh()->spent_cents)->toBe(5000);
+    expect($budget->fresh()->spent_cents)->toBe(5000);
+    expect($budget->fresh()->expense_count)->toBe(1);
+
+    $this->actingAs($user, 'sanctum')
+        ->putJson("/api/expenses/{$expenseId}", ['amount_cents' => 7000])
+        ->assertStatus(200);
+
+    expect($subcategory->fresh()->spent_cents)->toBe(7000);
+    expect($budget->fresh()->spent_cents)->toBe(7000);
+    expect($budget->fresh()->expense_count)->toBe(1);
+
+    $this->actingAs($user, 'sanctum')
+        ->deleteJson("/api/expenses/{$expenseId}")
+        ->assertStatus(204);
+
+    expect($subcategory->fresh()->spent_cents)->toBe(0);
+    expect($category->fresh()->expense_count)->toBe(0);
+    expect($budget->fresh()->spent_cents)->toBe(0);
+});
+
+test('moving an expense to another subcategory moves its rollup', function () {
+    $user = User::factory()->create();
+    $budget = Budget::factory()->for($user)->create();
+    $categoryA = BudgetCategory::factory()->for($budget)->create();
+    $categoryB = BudgetCategory::factory()->for($budget)->create();
+    $subcategoryA = BudgetSubcategory::factory()->for($categoryA, 'budgetCategory')->create();
+    $subcategoryB = BudgetSubcategory::factory()->for($categoryB, 'budgetCategory')->create();
+    $expense = Expense::factory()->for($budget)->for($subcategoryA, 'budgetSubcategory')->create(['amount_cents' => 3000]);
+
+    $this->actingAs($user, 'sanctum')
+        ->putJson("/api/expenses/{$expense->id}", ['budget_subcategory_id' => $subcategoryB->id])
+        ->assertStatus(200);
+
+    expect($categoryA->fresh()->spent_cents)->toBe(0);
+    expect($categoryB->fresh()->spent_cents)->toBe(3000);
+    expect($budget->fresh()->spent_cents)->toBe(3000);
+});
+
+test('deleting a subcategory removes its expenses from the budget rollup', function () {
+    $user = User::factory()->create();
+    $budget = Budget::factory()->for($user)->create();
+    $category = BudgetCategory::factory()->for($budget)->create();
+    $kept = BudgetSubcategory::factory()->for($category, 'budgetCategory')->create();
+    $removed = BudgetSubcategory::factory()->for($category, 'budgetCategory')->create();
+    Expense::factory()->for($budget)->for($kept, 'budgetSubcategory')->create(['amount_cents' => 1000]);
+    Expense::factory()->for($budget)->for($removed, 'budgetSubcategory')->create(['amount_cents' => 4000]);
+
+    $this->actingAs($user, 'sanctum')
+        ->deleteJson("/api/budgets/{$budget->id}/subcategories/{$removed->id}")
+        ->assertStatus(204);
+
+    expect($category->fresh()->spent_cents)->toBe(1000);
+    expect($budget->fresh()->spent_cents)->toBe(1000);
+    expect($budget->fresh()->expense_count)->toBe(1);
+});
+
+test('rollups command detects and repairs drift', function () {
+    $user = User::factory()->create();
+    $budget = Budget::factory()->for($user)->create();
+    $category = BudgetCategory::factory()->for($budget)->create();
+    $subcategory = BudgetSubcategory::factory()->for($category, 'budgetCategory')->create();
+    Expense::factory()->for($budget)->for($subcategory, 'budgetSubcategory')->create(['amount_cents' => 2500]);
+
+    // Simuler une dérive (écriture hors Eloquent)
+    DB::table('budgets')->where('id', $budget->id)->update(['spent_cents' => 0]);
+
+    $this->artisan('budgets:rollups', ['--verify' => true])->assertExitCode(1);
+    $this->artisan('budgets:rollups')->assertExitCode(0);
+    $this->artisan('budgets:rollups', ['--verify' => true])->assertExitCode(0);
+
+    expect($budget->fresh()->spent_cents)->toBe(2500);
+});
@@ -0,0 +1,124 @@
+<?php
+
+use App\Models\Budget;
+use App\Models\BudgetCategory;
+use App\Models\BudgetSubcategory;
+use App\Models\Expense;
+use App\Models\Tag;
+use App\Models\User;
+use App\Services\TimeSeriesAnalyticsService;
+use Carbon\Carbon;
+
+function createMonthlyBudget(User $user, string $month, int $amountCents, ?string $paymentMethod = 'CB'): Expense
+{
+    $budget = Budget::factory()->for($user)->create([
+        'month' => Carbon::parse($month . '-01'),
+        'revenue_cents' => 200000,
+    ]);
+    $category = BudgetCategory::factory()->for($budget)->create([
+        'name' => 'Alimentation',
+        'planned_amount_cents' => 50000,
+    ]);
+    $subcategory = BudgetSubcategory::factory()->for($category, 'budgetCategory')->create();
+
+    return Expense::factory()->for($budget)->for($subcategory, 'budgetSubcategory')->create([
+        'amount_cents' => $amountCents,
+        'payment_method' => $paymentMethod,
+        'date' => Carbon::parse($month . '-10'),
+    ]);
+}
+
+test('time series returns monthly category totals with year over year and rolling average', function () {
+    $user = User::factory()->create();
+    createMonthlyBudget($user, '2024-01', 10000);
+    createMonthlyBudget($user, '2024-02', 20000);
+    createMonthlyBudget($user, '2024-03', 30000);
+    createMonthlyBudget($user, '2025-01', 15000);
+
+    $response = $this->actingAs($user, 'sanctum')
+        ->getJson('/api/stats/time-series?from=2024-01&to=2025-01&dimension=category&rollingWindow=3');
+
+    $response->assertStatus(200)
+        ->assertJsonPath('months.0', '2024-01')
+        ->assertJsonPath('months.12', '2025-01')
+        ->assertJsonPath('series.0.label', 'Alimentation')
+        ->assertJsonPath('series.0.totalCents', 75000);
+
+    $series = $response->json('series.0');
+    expect($series['values'][0])->toBe(10000);
+    expect($series['values'][4])->toBe(0);
+    expect($series['rollingAverageCents'][2])->toBe(20000);
+    expect($series['yearOverYearPercent'][12])->toEqual(50);
+});
+
+test('time series groups expenses by tag and payment method', function () {
+    $user = User::factory()->create();
+    $expense = createMonthlyBudget($user, '2025-06', 4200, null);
+    $tag = Tag::create(['user_id' => $user->id, 'name' => 'Vacances', 'color' => '#ff0000']);
+    $expense->tags()->attach($tag->id);
+
+    $byTag = $this->actingAs($user, 'sanctum')
+        ->getJson('/api/stats/time-series?from=2025-06&to=2025-06&dimension=tag');
+    $byTag->assertStatus(200)
+        ->assertJsonPath('series.0.label', 'Vacances')
+        ->assertJsonPath('series.0.values.0', 4200);
+
+    $byPaymentMethod = $this->actingAs($user, 'sanctum')
+        ->getJson('/api/stats/time-series?from=2025-06&to=2025-06&dimension=payment_method');
+    $byPaymentMethod->assertStatus(200)
+        ->assertJsonPath('series.0.label', 'Non renseigné')
+        ->assertJsonPath('series.0.values.0', 4200);
+});
+
+test('budget comparison accepts more than three months', function () {
+    $user = User::factory()->create();
+    foreach (['2025-01', '2025-02', '2025-03', '2025-04'] as $i => $month) {
+        createMonthlyBudget($user, $month, 10000 * ($i + 1));
+    }
+
+    $response = $this->actingAs($user, 'sanctum')
+        ->getJson('/api/budgets/compare?' . http_build_query(['months' => ['2025-01', '2025-02', '2025-03', '2025-04']]));
+
+    $response->assertStatus(200)
+        ->assertJsonCount(4, 'budgets')
+        ->assertJsonPath('budgets.3.stats.totalActualCents', 40000)
+        ->assertJsonPath('budgets.0.stats.byCategory.0.plannedCents', 50000)
+        ->assertJsonPath('comparison.evolution.0.categoryName', 'Alimentation')
+        ->assertJsonPath('comparison.evolution.0.values', [10000, 20000, 30000, 40000]);
+});
+
+test('savings rate evolution includes a rolling average', function () {
+    $user = User::factory()->create();
+    createMonthlyBudget($user, '2025-01', 100000);
+    createMonthlyBudget($user, '2025-02', 50000);
+    createMonthlyBudget($user, '2025-03', 150000);
+
+    $response = $this->actingAs($user, 'sanctum')
+        ->getJson('/api/stats/savings-rate-evolution?from=2025-01&to=2025-03');
+
+    $response->assertStatus(200)->assertJsonCount(3);
+    expect($response->json('1.savingsRatePercent'))->toEqual(75);
+    expect($response->json('1.rollingSavingsRatePercent'))->toBeNull();
+    expect($response->json('2.rollingSavingsRatePercent'))->toEqual(50);
+});
+
+test('time series rejects a range longer than the maximum number of months', function () {
+    $user = User::factory()->create();
+
+    $this->actingAs($user, 'sanctum')
+        ->getJson('/api/stats/time-series?from=2015-01&to=2025-01')
+        ->assertStatus(422)
+        ->assertJsonValidationErrors(['to']);
+
+    $this->actingAs($user, 'sanctum')
+        ->getJson('/api/stats/time-series?from=2015-02&to=2025-01')
+        ->assertStatus(200)
+        ->assertJsonCount(120, 'months')
+        ->assertJsonPath('months.119', '2025-01');
+
+    // Appel direct au-delà de la limite : les mois les plus récents sont conservés
+    $months = app(TimeSeriesAnalyticsService::class)->months(Carbon::parse('2015-01-01'), Carbon::parse('2025-01-01'));
+    expect($months)->toHaveCount(120);
+    expect($months[0])->toBe('2015-02');
+    expect(end($months))->toBe('2025-01');
+});
@@ -5,7 +5,7 @@ use Illuminate\Foundation\Testing\RefreshDatabase;
 uses(
     Tests\TestCase::class,
     RefreshDatabase::class
-)->in('Feature', 'Unit');
+)->in('Feature', 'Unit', 'Benchmark');
 
 expect()->extend('toBeOne', function () {
     return $this->toBe(1);
@@ -0,0 +1,49 @@
+<?php
+
+use App\Http\Serialization\CamelCaseJsonResponse;
+use App\Http\Serialization\KeyCase;
+use App\Models\Budget;
+use App\Models\User;
+
+test('keys are converted between snake case and camel case', function () {
+    expect(KeyCase::camel('budget_subcategory_id'))->toBe('budgetSubcategoryId');
+    expect(KeyCase::camel('label'))->toBe('label');
+    expect(KeyCase::snake('budgetSubcategoryId'))->toBe('budget_subcategory_id');
+    expect(KeyCase::snake('label'))->toBe('label');
+});
+
+test('camelize serializes models, collections and plain objects', function () {
+    $user = User::factory()->create();
+    $budget = Budget::factory()->for($user)->create(['revenue_cents' => 1000]);
+
+    $data = KeyCase::camelize([
+        'budget' => $budget->fresh(),
+        'rows' => collect([(object) ['amount_cents' => 5, 'nested_list' => [['sort_order' => 1]]]]),
+        'total_rows' => 1,
+    ]);
+
+    expect($data['budget'])->toHaveKeys(['revenueCents', 'userId', 'spentCents']);
+    expect($data['rows'][0])->toBe(['amountCents' => 5, 'nestedList' => [['sortOrder' => 1]]]);
+    expect($data['totalRows'])->toBe(1);
+});
+
+test('snakeKeys reports whether any key changed', function () {
+    $changed = false;
+    expect(KeyCase::snakeKeys(['label' => 'a', 'items' => [['date' => 'b']]], $changed))
+        ->toBe(['label' => 'a', 'items' => [['date' => 'b']]]);
+    expect($changed)->toBeFalse();
+
+    $changed = false;
+    expect(KeyCase::snakeKeys(['tagIds' => [1, 2]], $changed))->toBe(['tag_ids' => [1, 2]]);
+    expect($changed)->toBeTrue();
+});
+
+test('json responses are emitted in camel case without the middleware round trip', function () {
+    $user = User::factory()->create();
+    $budget = Budget::factory()->for($user)->create(['revenue_cents' => 1000]);
+
+    $response = $this->actingAs($user, 'sanctum')->getJson("/api/budgets/{$budget->id}");
+
+    $response->assertStatus(200)->assertJson(['id' => $budget->id, 'revenueCents' => 1000]);
+    expect($response->baseResponse)->toBeInstanceOf(CamelCaseJsonResponse::class);
+});
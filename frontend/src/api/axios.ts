@@ -1,4 +1,4 @@
-import axios from "axios";
+import axios, { type AxiosRequestConfig } from "axios";
 import { errorHandler } from "@/utils/errorHandler";
 
 const apiClient = axios.create({
@@ -58,4 +58,40 @@ apiClient.interceptors.response.use(
   }
 );
 
+// Cache des réponses conditionnelles (ETag) : clé = URL + paramètres
+const etagCache = new Map<string, { etag: string; data: unknown }>();
+
+/**
+ * GET conditionnel : envoie If-None-Match avec le dernier ETag reçu pour cette
+ * requête et réutilise les données en mémoire si le serveur répond 304.
+ */
+export async function getWithEtag<T>(url: string, config: AxiosRequestConfig = {}): Promise<T> {
+  const key = `${url}?${JSON.stringify(config.params ?? {})}`;
+  const cached = etagCache.get(key);
+
+  const response = await apiClient.get<T>(url, {
+    ...config,
+    headers: {
+      ...config.headers,
+      ...(cached ? { "If-None-Match": cached.etag } : {}),
+    },
+    validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
+  });
+
+  if (response.status === 304 && cached) {
+    return cached.data as T;
+  }
+
+  const etag = response.headers["etag"] as string | undefined;
+  if (etag) {
+    etagCache.set(key, { etag, data: response.data });
+  }
+
+  return response.data;
+}
+
+export function clearEtagCache() {
+  etagCache.clear();
+}
+
 export default apiClient;
@@ -1,5 +1,5 @@
-import api from "./axios";
-import type { DashboardLayout } from "@/types";
+import api, { getWithEtag } from "./axios";
+import type { DashboardLayout, DashboardStats, DashboardStatsParams } from "@/types";
 
 export const dashboardApi = {
   async getLayout(): Promise<DashboardLayout> {
@@ -17,4 +17,9 @@ export const dashboardApi = {
   async resetLayout(): Promise<void> {
     await api.delete("/dashboard/layout");
   },
+
+  // Requête conditionnelle : un 304 réutilise les données déjà reçues
+  async getStats(params: DashboardStatsParams): Promise<DashboardStats> {
+    return getWithEtag<DashboardStats>("/stats/dashboard", { params });
+  },
 };
@@ -1,5 +1,5 @@
 import api from "./axios";
-import type { Expense, PaginatedResponse } from "@/types";
+import type { CursorPaginatedResponse, Expense, ExpenseImport, PaginatedResponse } from "@/types";
 
 export interface ExpenseFilters {
   subcatId?: number;
@@ -10,6 +10,19 @@ export interface ExpenseFilters {
   page?: number;
 }
 
+export interface ExpenseSearchFilters {
+  q?: string;
+  budgetId?: number;
+  from?: string;
+  to?: string;
+  minAmountCents?: number;
+  maxAmountCents?: number;
+  tagId?: number;
+  paymentMethod?: string;
+  perPage?: number;
+  cursor?: string;
+}
+
 export interface CreateExpenseData {
   budget_subcategory_id: number;
   date: string;
@@ -28,6 +41,14 @@ export const expensesApi = {
     return response.data;
   },
 
+  // Recherche sur tous les budgets, paginée par curseur (nextCursor)
+  async search(filters: ExpenseSearchFilters): Promise<CursorPaginatedResponse<Expense>> {
+    const response = await api.get<CursorPaginatedResponse<Expense>>("/expenses/search", {
+      params: filters,
+    });
+    return response.data;
+  },
+
   async create(budgetId: number, data: CreateExpenseData): Promise<Expense> {
     const response = await api.post<Expense>(`/budgets/${budgetId}/expenses`, data);
     return response.data;
@@ -42,12 +63,24 @@ export const expensesApi = {
     await api.delete(`/expenses/${id}`);
   },
 
-  async importCsv(budgetId: number, file: File): Promise<{ imported: number; errors: string[] }> {
+  // L'import est traité en file d'attente : la réponse (202) donne l'import à suivre
+  async importCsv(budgetId: number, file: File): Promise<ExpenseImport> {
     const formData = new FormData();
     formData.append("file", file);
-    const response = await api.post(`/budgets/${budgetId}/expenses/import-csv`, formData, {
-      headers: { "Content-Type": "multipart/form-data" },
-    });
+    const response = await api.post<ExpenseImport>(
+      `/budgets/${budgetId}/expenses/import-csv`,
+      formData,
+      {
+        headers: { "Content-Type": "multipart/form-data" },
+      }
+    );
+    return response.data;
+  },
+
+  async importStatus(budgetId: number, importId: number): Promise<ExpenseImport> {
+    const response = await api.get<ExpenseImport>(
+      `/budgets/${budgetId}/expenses/imports/${importId}`
+    );
     return response.data;
   },
 
@@ -1,10 +1,12 @@
-import api from "./axios";
+import { getWithEtag } from "./axios";
 import type {
   BudgetStats,
   CategoryStats,
   TagStats,
   TopCategoryStats,
   SavingsRateDataPoint,
+  TimeSeries,
+  TimeSeriesDimension,
 } from "@/types";
 
 export interface WealthEvolutionData {
@@ -22,46 +24,39 @@ export interface ExpenseDistributionItem {
 
 export const statsApi = {
   async summary(budgetId: number): Promise<BudgetStats> {
-    const response = await api.get<BudgetStats>(`/budgets/${budgetId}/stats/summary`);
-    return response.data;
+    return getWithEtag<BudgetStats>(`/budgets/${budgetId}/stats/summary`);
   },
 
   async byCategory(budgetId: number): Promise<CategoryStats[]> {
-    const response = await api.get<CategoryStats[]>(`/budgets/${budgetId}/stats/by-category`);
-    return response.data;
+    return getWithEtag<CategoryStats[]>(`/budgets/${budgetId}/stats/by-category`);
   },
 
   async bySubcategory(budgetId: number, categoryId?: number): Promise<CategoryStats[]> {
     const params = categoryId ? { categoryId } : {};
-    const response = await api.get<CategoryStats[]>(`/budgets/${budgetId}/stats/by-subcategory`, {
+    return getWithEtag<CategoryStats[]>(`/budgets/${budgetId}/stats/by-subcategory`, {
       params,
     });
-    return response.data;
   },
 
   async wealthEvolution(params?: { from?: string; to?: string }): Promise<WealthEvolutionData> {
-    const response = await api.get<WealthEvolutionData>("/stats/wealth-evolution", { params });
-    return response.data;
+    return getWithEtag<WealthEvolutionData>("/stats/wealth-evolution", { params });
   },
 
   async expenseDistribution(budgetId: number): Promise<ExpenseDistributionItem[]> {
-    const response = await api.get<ExpenseDistributionItem[]>(
+    return getWithEtag<ExpenseDistributionItem[]>(
       `/budgets/${budgetId}/stats/expense-distribution`
     );
-    return response.data;
   },
 
   async byTag(budgetId: number): Promise<TagStats[]> {
-    const response = await api.get<TagStats[]>(`/budgets/${budgetId}/stats/by-tag`);
-    return response.data;
+    return getWithEtag<TagStats[]>(`/budgets/${budgetId}/stats/by-tag`);
   },
 
   async topCategories(budgetId: number, limit: number = 5): Promise<TopCategoryStats[]> {
-    const response = await api.get<TopCategoryStats[]>(
+    return getWithEtag<TopCategoryStats[]>(
       `/budgets/${budgetId}/stats/top-categories`,
       { params: { limit } }
     );
-    return response.data;
   },
 
   async savingsRateEvolution(params?: {
@@ -69,9 +64,17 @@ export const statsApi = {
     to?: string;
     months?: number;
   }): Promise<SavingsRateDataPoint[]> {
-    const response = await api.get<SavingsRateDataPoint[]>("/stats/savings-rate-evolution", {
+    return getWithEtag<SavingsRateDataPoint[]>("/stats/savings-rate-evolution", {
       params,
     });
-    return response.data;
+  },
+
+  async timeSeries(params: {
+    from: string;
+    to: string;
+    dimension?: TimeSeriesDimension;
+    rollingWindow?: number;
+  }): Promise<TimeSeries> {
+    return getWithEtag<TimeSeries>("/stats/time-series", { params });
   },
 };
@@ -1,6 +1,7 @@
 import { defineStore } from "pinia";
 import { ref, computed } from "vue";
 import { authApi } from "@/api/auth";
+import { clearEtagCache } from "@/api/axios";
 import type { User, LoginCredentials, RegisterData } from "@/types";
 
 export const useAuthStore = defineStore("auth", () => {
@@ -66,6 +67,7 @@ export const useAuthStore = defineStore("auth", () => {
       token.value = null;
       user.value = null;
       localStorage.removeItem("token");
+      clearEtagCache();
     }
   }
 
@@ -2,7 +2,13 @@ import { defineStore } from "pinia";
 import { ref } from "vue";
 import { dashboardApi } from "@/api/dashboard";
 import { executeStoreAction } from "@/composables/useStoreAction";
-import type { WidgetLayoutItem, WidgetSettings, WidgetConfig } from "@/types";
+import type {
+  WidgetLayoutItem,
+  WidgetSettings,
+  WidgetConfig,
+  DashboardStats,
+  DashboardStatsParams,
+} from "@/types";
 
 export const useDashboardStore = defineStore("dashboard", () => {
   const layout = ref<WidgetLayoutItem[]>([]);
@@ -10,6 +16,8 @@ export const useDashboardStore = defineStore("dashboard", () => {
   const loading = ref(false);
   const error = ref<string | null>(null);
   const hasUnsavedChanges = ref(false);
+  const stats = ref<DashboardStats | null>(null);
+  const statsLoading = ref(false);
 
   async function fetchLayout() {
     return await executeStoreAction(
@@ -55,6 +63,18 @@ export const useDashboardStore = defineStore("dashboard", () => {
     );
   }
 
+  async function fetchStats(params: DashboardStatsParams) {
+    return await executeStoreAction(
+      async () => {
+        stats.value = await dashboardApi.getStats(params);
+        return stats.value;
+      },
+      statsLoading,
+      error,
+      { errorMessage: "Erreur lors du chargement des statistiques" }
+    );
+  }
+
   function updateLayout(newLayout: WidgetLayoutItem[]) {
     layout.value = newLayout;
     hasUnsavedChanges.value = true;
@@ -74,7 +94,10 @@ export const useDashboardStore = defineStore("dashboard", () => {
     loading,
     error,
     hasUnsavedChanges,
+    stats,
+    statsLoading,
     fetchLayout,
+    fetchStats,
     saveLayout,
     resetLayout,
     updateLayout,
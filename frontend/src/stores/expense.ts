@@ -3,6 +3,8 @@ import { ref } from "vue";
 import { expensesApi, type CreateExpenseData, type ExpenseFilters } from "@/api/expenses";
 import type { Expense } from "@/types";
 
+const IMPORT_POLL_INTERVAL_MS = 2000;
+
 export const useExpenseStore = defineStore("expense", () => {
   const expenses = ref<Expense[]>([]);
   const currentBudgetId = ref<number | null>(null);
@@ -80,12 +82,25 @@ export const useExpenseStore = defineStore("expense", () => {
     loading.value = true;
     error.value = null;
     try {
-      const result = await expensesApi.importCsv(budgetId, file);
+      let importStatus = await expensesApi.importCsv(budgetId, file);
+
+      // Suivre la progression de l'import jusqu'à sa fin
+      while (importStatus.status === "pending" || importStatus.status === "processing") {
+        await new Promise((resolve) => setTimeout(resolve, IMPORT_POLL_INTERVAL_MS));
+        importStatus = await expensesApi.importStatus(budgetId, importStatus.id);
+      }
+
       // Refresh expenses after import
-      if (result.imported > 0) {
+      if (importStatus.importedRows > 0) {
         await fetchExpenses(budgetId);
       }
-      return result;
+      return {
+        imported: importStatus.importedRows,
+        errors: importStatus.errors ?? [],
+        totalRows: importStatus.processedRows,
+        errorCount: importStatus.errorCount,
+        failed: importStatus.status === "failed",
+      };
     } catch (err) {
       error.value = "Erreur lors de l'import CSV";
       console.error(err as Error);
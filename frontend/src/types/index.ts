@@ -108,6 +108,19 @@ export interface Expense {
   updatedAt: string;
 }
 
+// Import CSV traité en arrière-plan
+export interface ExpenseImport {
+  id: number;
+  budgetId: number;
+  status: "pending" | "processing" | "completed" | "failed";
+  processedRows: number;
+  importedRows: number;
+  errorCount: number;
+  errors: string[] | null;
+  startedAt: string | null;
+  finishedAt: string | null;
+}
+
 export type RecurringFrequency = "monthly" | "weekly" | "yearly";
 
 export type DayOfWeek =
@@ -218,6 +231,13 @@ export interface PaginatedResponse<T> {
   total: number;
 }
 
+export interface CursorPaginatedResponse<T> {
+  data: T[];
+  perPage: number;
+  nextCursor: string | null;
+  prevCursor: string | null;
+}
+
 export interface WealthHistory {
   id: number;
   userId: number;
@@ -452,6 +472,49 @@ export interface SavingsRateDataPoint {
   expensesCents: number;
   savingsCents: number;
   savingsRatePercent: number | null;
+  rollingSavingsRatePercent: number | null;
+}
+
+// Séries temporelles mensuelles (stats/time-series)
+export type TimeSeriesDimension = "total" | "category" | "tag" | "payment_method";
+
+export interface TimeSeriesItem {
+  key: string;
+  label: string;
+  values: number[];
+  expenseCounts: number[];
+  totalCents: number;
+  yearOverYearPercent: (number | null)[];
+  rollingAverageCents: (number | null)[];
+}
+
+export interface TimeSeries {
+  dimension: TimeSeriesDimension;
+  months: string[];
+  rollingWindow: number;
+  series: TimeSeriesItem[];
+}
+
+// Dashboard stats (tous les widgets en une seule réponse)
+export interface DashboardStats {
+  budgetId: number | null;
+  summary: BudgetStats | null;
+  byCategory: CategoryStats[];
+  topCategories: TopCategoryStats[];
+  expenseDistribution: { label: string; value: number }[];
+  savingsRate: SavingsRateDataPoint[];
+  wealthEvolution: {
+    labels: string[];
+    datasets: { label: string; data: number[] }[];
+  };
+}
+
+export interface DashboardStatsParams {
+  budgetId?: number | null;
+  topLimit?: number;
+  savingsMonths?: number;
+  wealthFrom?: string;
+  wealthTo?: string;
 }
 
 // Widget Props Base